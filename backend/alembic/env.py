@@ -0,0 +1,69 @@
+"""Alembic migration environment"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.config import settings
+from app.db.base import Base
+from app.db.search import include_object
+import app.models  # noqa: F401 - registers every table on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def configure_online(connection) -> None:
+    """Configure a run on a connection, committing each migration on its own
+    
+    Indexes built concurrently (see app.db.indexes) commit the migration's
+    earlier work, so migrations must not share one transaction.
+    """
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        transaction_per_migration=True
+    )
+
+
+def run_migrations_online() -> None:
+    """Run migrations on a connection passed in by the caller or on a new engine"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure_online(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    
+    engine = create_engine(get_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        configure_online(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,148 @@
+"""Initial schema
+
+Tables as previously created by Base.metadata.create_all. Databases that were
+created that way can be brought under migration control with
+``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+user_role = sa.Enum("ADMIN", "DOCTOR", "NURSE", "PHARMACIST", "PATIENT", name="userrole")
+blood_type = sa.Enum(
+    "O_NEGATIVE", "O_POSITIVE", "A_NEGATIVE", "A_POSITIVE",
+    "B_NEGATIVE", "B_POSITIVE", "AB_NEGATIVE", "AB_POSITIVE",
+    name="bloodtype"
+)
+consultation_status = sa.Enum(
+    "SCHEDULED", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="consultationstatus"
+)
+prescription_status = sa.Enum("ACTIVE", "COMPLETED", "CANCELLED", "EXPIRED", name="prescriptionstatus")
+audit_action = sa.Enum(
+    "CREATE", "READ", "UPDATE", "DELETE", "LOGIN", "LOGOUT", "EXPORT", "SHARE",
+    name="auditaction"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=True),
+        sa.Column("license_number", sa.String(100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("last_login", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    
+    op.create_table(
+        "patients",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False, unique=True),
+        sa.Column("date_of_birth", sa.DateTime(), nullable=True),
+        sa.Column("gender", sa.String(20), nullable=True),
+        sa.Column("blood_type", blood_type, nullable=True),
+        sa.Column("address", sa.String(500), nullable=True),
+        sa.Column("city", sa.String(100), nullable=True),
+        sa.Column("postal_code", sa.String(20), nullable=True),
+        sa.Column("country", sa.String(100), nullable=True),
+        sa.Column("emergency_contact_name", sa.String(255), nullable=True),
+        sa.Column("emergency_contact_phone", sa.String(20), nullable=True),
+        sa.Column("allergies", sa.Text(), nullable=True),
+        sa.Column("chronic_conditions", sa.Text(), nullable=True),
+        sa.Column("family_history", sa.Text(), nullable=True),
+        sa.Column("insurance_number", sa.String(100), nullable=True),
+        sa.Column("insurance_provider", sa.String(255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    
+    op.create_table(
+        "consultations",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("patients.id"), nullable=False),
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("consultation_date", sa.DateTime(), nullable=False),
+        sa.Column("status", consultation_status, nullable=False),
+        sa.Column("reason", sa.String(500), nullable=True),
+        sa.Column("chief_complaint", sa.Text(), nullable=True),
+        sa.Column("diagnosis", sa.Text(), nullable=True),
+        sa.Column("clinical_notes", sa.Text(), nullable=True),
+        sa.Column("vital_signs", sa.Text(), nullable=True),
+        sa.Column("physical_examination", sa.Text(), nullable=True),
+        sa.Column("treatment_plan", sa.Text(), nullable=True),
+        sa.Column("follow_up_date", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    
+    op.create_table(
+        "prescriptions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("patients.id"), nullable=False),
+        sa.Column("consultation_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("consultations.id"), nullable=True),
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("medication_name", sa.String(255), nullable=False),
+        sa.Column("dosage", sa.String(100), nullable=False),
+        sa.Column("frequency", sa.String(100), nullable=False),
+        sa.Column("duration", sa.String(100), nullable=False),
+        sa.Column("route", sa.String(50), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=True),
+        sa.Column("refills", sa.Integer(), nullable=False),
+        sa.Column("status", prescription_status, nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("contraindications", sa.Text(), nullable=True),
+        sa.Column("side_effects", sa.Text(), nullable=True),
+        sa.Column("prescribed_date", sa.DateTime(), nullable=False),
+        sa.Column("expiry_date", sa.DateTime(), nullable=True),
+        sa.Column("dispensed_date", sa.DateTime(), nullable=True),
+        sa.Column("dispensed_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("action", audit_action, nullable=False),
+        sa.Column("resource_type", sa.String(100), nullable=False),
+        sa.Column("resource_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("ip_address", sa.String(50), nullable=True),
+        sa.Column("user_agent", sa.String(500), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_audit_logs_timestamp", "audit_logs", ["timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_table("audit_logs")
+    op.drop_table("prescriptions")
+    op.drop_table("consultations")
+    op.drop_table("patients")
+    op.drop_table("users")
+    
+    bind = op.get_bind()
+    for enum in (audit_action, prescription_status, consultation_status, blood_type, user_role):
+        enum.drop(bind, checkfirst=True)
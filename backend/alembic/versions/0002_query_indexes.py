@@ -0,0 +1,44 @@
+"""Index foreign keys, filter columns and keyset pagination order
+
+Composite indexes lead with the filter column and end with the (sort, id)
+keyset order so a filtered page is a single index range scan. Creation is
+idempotent because create_all may already have built some of them. On
+PostgreSQL the indexes are built concurrently, so writes to the tables
+continue meanwhile (see app.db.indexes).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:30:00
+"""
+from app.db.indexes import create_index_online, drop_index_online
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+    ("ix_patients_created_at_id", "patients", ["created_at", "id"]),
+    ("ix_consultations_created_at_id", "consultations", ["created_at", "id"]),
+    ("ix_consultations_patient_id_created_at_id", "consultations", ["patient_id", "created_at", "id"]),
+    ("ix_consultations_doctor_id", "consultations", ["doctor_id"]),
+    ("ix_prescriptions_created_at_id", "prescriptions", ["created_at", "id"]),
+    ("ix_prescriptions_patient_id_created_at_id", "prescriptions", ["patient_id", "created_at", "id"]),
+    ("ix_prescriptions_status_created_at_id", "prescriptions", ["status", "created_at", "id"]),
+    ("ix_prescriptions_doctor_id", "prescriptions", ["doctor_id"]),
+    ("ix_prescriptions_consultation_id", "prescriptions", ["consultation_id"]),
+    ("ix_audit_logs_timestamp_id", "audit_logs", ["timestamp", "id"]),
+    ("ix_audit_logs_user_id_timestamp_id", "audit_logs", ["user_id", "timestamp", "id"]),
+    ("ix_audit_logs_resource_timestamp_id", "audit_logs", ["resource_type", "resource_id", "timestamp", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
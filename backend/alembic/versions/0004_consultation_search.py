@@ -0,0 +1,50 @@
+"""Full-text search over consultation clinical text
+
+PostgreSQL gets the generated search_vector column and its GIN index; adding
+a stored generated column rewrites the consultations table under an
+exclusive lock, so run this upgrade in a maintenance window on large
+databases. SQLite gets the FTS5 table and its triggers, then indexes the
+existing consultations. Skipped where create_all built them already.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.db.search import (
+    FTS_TABLE,
+    FTS_TRIGGERS,
+    SEARCH_INDEX,
+    SEARCH_VECTOR,
+    postgresql_search_ddl,
+    sqlite_search_backfill,
+    sqlite_search_ddl,
+)
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for statement in postgresql_search_ddl():
+            op.execute(statement)
+    elif bind.dialect.name == "sqlite" and FTS_TABLE not in sa.inspect(bind).get_table_names():
+        for statement in sqlite_search_ddl():
+            op.execute(statement)
+        op.execute(sqlite_search_backfill())
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+        op.execute(f"ALTER TABLE consultations DROP COLUMN IF EXISTS {SEARCH_VECTOR}")
+    elif bind.dialect.name == "sqlite":
+        for trigger in FTS_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,41 @@
+"""Indexes for the patient typeahead
+
+Names and emails get pg_trgm GIN indexes for substring matches, phone and
+insurance numbers pattern btree indexes for prefix matches. Building the GIN
+indexes takes a while on large user tables; on PostgreSQL they are built
+concurrently, so writes continue meanwhile (see app.db.indexes). Idempotent
+because create_all may already have built them.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 13:00:00
+"""
+from alembic import op
+from app.db.indexes import create_index_online, drop_index_online
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+TRIGRAM = {"postgresql_using": "gin"}
+
+INDEXES = [
+    ("ix_users_full_name_trgm", "users", "full_name", {**TRIGRAM, "postgresql_ops": {"full_name": "gin_trgm_ops"}}),
+    ("ix_users_email_trgm", "users", "email", {**TRIGRAM, "postgresql_ops": {"email": "gin_trgm_ops"}}),
+    ("ix_users_phone", "users", "phone", {"postgresql_ops": {"phone": "varchar_pattern_ops"}}),
+    ("ix_patients_insurance_number", "patients", "insurance_number",
+     {"postgresql_ops": {"insurance_number": "varchar_pattern_ops"}}),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column, options in INDEXES:
+        create_index_online(name, table, [column], **options)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        drop_index_online(name, table)
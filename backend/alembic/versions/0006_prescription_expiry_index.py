@@ -0,0 +1,24 @@
+"""Index active prescriptions by expiry date for the expiry sweeper
+
+Built concurrently on PostgreSQL so prescription writes continue meanwhile
+(see app.db.indexes). Idempotent because create_all may already have built
+it.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 14:00:00
+"""
+from app.db.indexes import create_index_online, drop_index_online
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_online("ix_prescriptions_status_expiry_date", "prescriptions", ["status", "expiry_date"])
+
+
+def downgrade() -> None:
+    drop_index_online("ix_prescriptions_status_expiry_date", "prescriptions")
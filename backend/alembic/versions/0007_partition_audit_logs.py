@@ -0,0 +1,99 @@
+"""Partition audit_logs by month on PostgreSQL
+
+The existing table becomes the partition audit_logs_legacy, covering every
+row before the start of next month; monthly partitions follow. Its primary
+key is rebuilt as (id, timestamp) and attaching it scans it once to check
+the bound, both while audit writes wait (the audit writer keeps them
+spooled), so expect that pause to grow with the table's size. Its indexes
+are kept and attached to the partitioned ones.
+
+Other databases keep the plain table: the composite primary key only
+matters to PostgreSQL partitioning.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 09:00:00
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.db.partitions import LEGACY_PARTITION, add_months, ensure_partitions, is_partitioned, month_start
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_audit_logs_timestamp", ["timestamp"]),
+    ("ix_audit_logs_timestamp_id", ["timestamp", "id"]),
+    ("ix_audit_logs_user_id_timestamp_id", ["user_id", "timestamp", "id"]),
+    ("ix_audit_logs_resource_timestamp_id", ["resource_type", "resource_id", "timestamp", "id"]),
+]
+
+COLUMNS = (
+    "id, user_id, action, resource_type, resource_id, description, ip_address, user_agent, "
+    "status, error_message, timestamp"
+)
+
+
+def create_audit_table(primary_key: tuple, **options) -> None:
+    """Create audit_logs as declared by 0001, with the given primary key"""
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("action", postgresql.ENUM(name="auditaction", create_type=False), nullable=False),
+        sa.Column("resource_type", sa.String(100), nullable=False),
+        sa.Column("resource_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("ip_address", sa.String(50), nullable=True),
+        sa.Column("user_agent", sa.String(500), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **options
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, "audit_logs", columns)
+
+
+def rename_audit_table(new_name: str, index_suffix: str) -> None:
+    """Move audit_logs and its index names aside so the replacement can take them"""
+    op.execute(f"ALTER TABLE audit_logs RENAME TO {new_name}")
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT audit_logs_pkey TO {new_name}_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_{index_suffix}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or is_partitioned(bind):
+        ensure_partitions(bind)
+        return
+    
+    rename_audit_table(LEGACY_PARTITION, "legacy")
+    op.execute(
+        f"ALTER TABLE {LEGACY_PARTITION} DROP CONSTRAINT {LEGACY_PARTITION}_pkey, ADD PRIMARY KEY (id, timestamp)"
+    )
+    
+    create_audit_table(("id", "timestamp"), postgresql_partition_by="RANGE (timestamp)")
+    boundary = add_months(month_start(datetime.utcnow()), 1)
+    op.execute(
+        f"ALTER TABLE audit_logs ATTACH PARTITION {LEGACY_PARTITION} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')"
+    )
+    ensure_partitions(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not is_partitioned(bind):
+        return
+    
+    rename_audit_table("audit_logs_partitioned", "partitioned")
+    create_audit_table(("id",))
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
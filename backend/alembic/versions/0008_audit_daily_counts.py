@@ -0,0 +1,64 @@
+"""Daily audit event counts for the audit statistics API
+
+The counts of events already logged are computed once from audit_logs, in
+a single scan while the migration runs; from then on the audit writers keep
+them up to date. Skipped when the table exists already, as it does in
+databases built by create_all before they came under migration control.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 15:00:00
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# NO_USER of app.models.audit_log
+NO_USER = uuid.UUID(int=0)
+
+audit_action = postgresql.ENUM(
+    "CREATE", "READ", "UPDATE", "DELETE", "LOGIN", "LOGOUT", "EXPORT", "SHARE",
+    name="auditaction", create_type=False
+)
+
+
+def upgrade() -> None:
+    if "audit_daily_counts" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    
+    daily_counts = op.create_table(
+        "audit_daily_counts",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("action", audit_action, nullable=False),
+        sa.Column("resource_type", sa.String(100), nullable=False),
+        sa.Column("events", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "user_id", "action", "resource_type"),
+    )
+    op.create_index("ix_audit_daily_counts_user_id_day", "audit_daily_counts", ["user_id", "day"])
+    
+    audit_logs = sa.table(
+        "audit_logs",
+        sa.column("timestamp", sa.DateTime()),
+        sa.column("user_id", postgresql.UUID(as_uuid=True)),
+        sa.column("action", audit_action),
+        sa.column("resource_type", sa.String()),
+    )
+    day = sa.func.date(audit_logs.c.timestamp)
+    user_id = sa.func.coalesce(audit_logs.c.user_id, sa.literal(NO_USER, postgresql.UUID(as_uuid=True)))
+    op.execute(daily_counts.insert().from_select(
+        ["day", "user_id", "action", "resource_type", "events"],
+        sa.select(day, user_id, audit_logs.c.action, audit_logs.c.resource_type, sa.func.count())
+        .group_by(day, audit_logs.c.user_id, audit_logs.c.action, audit_logs.c.resource_type)
+    ))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_daily_counts_user_id_day", table_name="audit_daily_counts")
+    op.drop_table("audit_daily_counts")
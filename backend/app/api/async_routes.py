@@ -0,0 +1,67 @@
+"""Async variants of the API routers
+
+In async mode every request gets an ``AsyncSession`` instead of a sync
+``Session``. The sync handlers are wrapped into ``async def`` endpoints that
+run their body through ``AsyncSession.run_sync``, so the ORM code executes on
+the event loop over the async driver instead of occupying a threadpool slot.
+Their other blocking I/O, the read cache and the audit spool, is handed to
+the executor through ``app.core.concurrency.off_loop``; handlers without a
+session run in the threadpool as FastAPI would run them.
+"""
+import functools
+import inspect
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def asyncify_endpoint(endpoint):
+    """Wrap a sync handler so it runs on the request's AsyncSession"""
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        names = [name for name, value in kwargs.items() if isinstance(value, AsyncSession)]
+        if not names:
+            return await run_in_threadpool(endpoint, **kwargs)
+        
+        def call(sync_session):
+            return endpoint(**{**kwargs, **{name: sync_session for name in names}})
+        
+        return await kwargs[names[0]].run_sync(call)
+    
+    wrapper.__signature__ = inspect.signature(endpoint)
+    return wrapper
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """Build a copy of a router whose handlers run on AsyncSession"""
+    async_router = APIRouter()
+    
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        
+        async_router.add_api_route(
+            route.path,
+            asyncify_endpoint(route.endpoint),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name
+        )
+    
+    return async_router
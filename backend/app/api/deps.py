@@ -1,21 +1,27 @@
 """API dependencies"""
+from dataclasses import replace
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from uuid import UUID
+from app.db.session import get_db, open_read_session
 from app.core.security import decode_token
+from app.core.principals import Principal, principal_cache
+from app.core.permissions import Permission, permission_mask
 from app.models.user import User
-from app.models.user import UserRole
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    token = credentials.credentials
+def authenticate_token(token: str) -> tuple:
+    """Decode a token and get its subject's id and cached principal, if any
+    
+    Both steps may wait on Redis (token revocations and principal
+    invalidations), so get_current_user runs this in the threadpool rather
+    than on the event loop.
+    """
     payload = decode_token(token)
     
     if not payload:
@@ -25,22 +31,50 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("sub")
-    if not user_id:
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    return payload, user_id, principal_cache.get(user_id)
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Get the current authenticated user
+    
+    Returns a cached snapshot of the user so repeated requests with the same
+    token subject skip the users lookup.
+    """
+    payload, user_id, user = await run_in_threadpool(authenticate_token, credentials.credentials)
     
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        if isinstance(db, AsyncSession):
+            db_user = await db.get(User, user_id)
+        else:
+            db_user = await run_in_threadpool(db.query(User).filter(User.id == user_id).first)
+        
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user = Principal.from_user(db_user)
+        principal_cache.set(user)
+    
+    # A token may carry a narrower permission mask than the user's role; the
+    # role still caps it so a demotion applies to tokens already issued
+    scoped = payload.get("perms")
+    if isinstance(scoped, int) and scoped & user.permissions != user.permissions:
+        user = replace(user, permissions=scoped & user.permissions)
     
     if not user.is_active:
         raise HTTPException(
@@ -48,40 +82,35 @@ async def get_current_user(
             detail="User is inactive"
         )
     
+    # Commits on this session count as the user's writes for replica routing
+    db.info["principal_id"] = user.id
+    
     return user
 
 
-async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Get the current user and verify they are an admin"""
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    return current_user
-
-
-async def get_current_doctor(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Get the current user and verify they are a doctor"""
-    if current_user.role not in [UserRole.DOCTOR, UserRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Doctor access required"
-        )
-    return current_user
+def get_read_db(current_user: Principal = Depends(get_current_user)):
+    """Dependency for a read-only handler's session
+    
+    Reads go to a replica unless none is fresh enough for the current user's
+    recent writes; anything written on it goes to the primary.
+    """
+    db = open_read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
 
 
-async def get_current_pharmacist(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Get the current user and verify they are a pharmacist"""
-    if current_user.role not in [UserRole.PHARMACIST, UserRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Pharmacist access required"
-        )
-    return current_user
+def require(*permissions: Permission):
+    """Build a dependency that returns the current user if they hold every permission"""
+    mask = permission_mask(*permissions)
+    
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> Principal:
+        if current_user.permissions & mask != mask:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission required: {', '.join(permission.value for permission in permissions)}"
+            )
+        return current_user
+    
+    return dependency
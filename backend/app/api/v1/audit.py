@@ -0,0 +1,117 @@
+"""Audit log routes"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import Optional
+from datetime import date, datetime
+from app.api.deps import get_read_db, require
+from app.core.audit import AUDIT_COUNT_GROUPS, get_audit_counts, get_audit_logs, log_audit
+from app.core.pagination import TRUNCATED_HEADER, set_next_cursor
+from app.core.permissions import Permission
+from app.core.principals import Principal
+from app.core.responses import rows_response, schema_columns
+from app.models.audit_log import AuditAction, AuditLog
+from app.schemas.audit import AuditCountResponse, AuditLogResponse
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+def count_groups(
+    group_by: str = Query("day", description=f"Comma-separated subset of {', '.join(AUDIT_COUNT_GROUPS)}")
+) -> list:
+    """Parse ``?group_by=`` into names of audit count groups"""
+    requested = {name.strip() for name in group_by.split(",")} - {""}
+    unknown = sorted(requested - set(AUDIT_COUNT_GROUPS))
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown groups: {', '.join(unknown)}" if unknown else "No groups requested"
+        )
+    return [name for name in AUDIT_COUNT_GROUPS if name in requested]
+
+
+@router.get("/logs", response_model=list[AuditLogResponse])
+def list_audit_logs(
+    since: Optional[datetime] = Query(None, description="Earliest timestamp, inclusive"),
+    until: Optional[datetime] = Query(None, description="Latest timestamp, exclusive"),
+    user_id: Optional[UUID] = None,
+    action: Optional[AuditAction] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.READ_AUDIT_LOG))
+):
+    """List audit events newest first (admin only)"""
+    columns = schema_columns(AuditLog, AuditLogResponse)
+    logs = get_audit_logs(
+        db,
+        user_id=user_id,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        limit=limit,
+        cursor=cursor,
+        since=since,
+        until=until,
+        columns=columns
+    )
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.READ,
+        resource_type="audit_log",
+        description=f"Listed {len(logs)} audit events"
+    )
+    
+    response = rows_response(logs, AuditLogResponse)
+    set_next_cursor(response, logs, limit, sort_attr="timestamp")
+    return response
+
+
+@router.get("/counts", response_model=list[AuditCountResponse])
+def count_audit_events(
+    group_by: list = Depends(count_groups),
+    since: Optional[date] = Query(None, description="First day, inclusive"),
+    until: Optional[date] = Query(None, description="Last day, exclusive"),
+    user_id: Optional[UUID] = None,
+    action: Optional[AuditAction] = None,
+    resource_type: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.READ_AUDIT_LOG))
+):
+    """Count audit events per day, user, action or resource type (admin only)
+    
+    Counts come from daily rollups, so any time range costs the same. When
+    more than limit groups match, the first limit are returned with an
+    X-Truncated header.
+    """
+    # One extra group tells whether the result was cut short
+    counts = get_audit_counts(
+        db,
+        group_by,
+        user_id=user_id,
+        action=action,
+        resource_type=resource_type,
+        since=since,
+        until=until,
+        limit=limit + 1
+    )
+    truncated = len(counts) > limit
+    counts = counts[:limit]
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.READ,
+        resource_type="audit_log",
+        description=f"Counted audit events by {', '.join(group_by)}"
+    )
+    
+    response = rows_response(counts, AuditCountResponse, group_by + ["count"])
+    if truncated:
+        response.headers[TRUNCATED_HEADER] = "true"
+    return response
@@ -1,18 +1,40 @@
 """Authentication routes"""
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from uuid import UUID
+from app.config import settings
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, Token, UserResponse
-from app.core.security import hash_password, verify_password, create_access_token
+from app.schemas.user import UserCreate, UserLogin, Token, TokenRefresh, UserResponse
+from app.core.security import hash_password, verify_password, create_access_token, decode_token, revoke_token
 from app.core.audit import log_audit
+from app.core.permissions import role_mask
+from app.core.principals import Principal, principal_cache
+from app.core.refresh import (
+    RefreshTokenInvalid, RefreshTokenReused, issue_refresh_token, revoke_refresh_family, rotate_refresh_token
+)
 from app.models.audit_log import AuditAction
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, security
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def token_response(user, family_id: UUID, refresh_token: str) -> dict:
+    """Mint an access token for a user's session and pair it with its refresh token"""
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role.value, "perms": role_mask(user.role), "sid": str(family_id)},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
@@ -57,7 +79,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    """Login user and return access token"""
+    """Login user and return an access token and a refresh token"""
     user = db.query(User).filter(User.email == credentials.email).first()
     
     if not user or not verify_password(credentials.password, user.hashed_password):
@@ -72,12 +94,9 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="User account is inactive"
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=30)
-    access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role.value},
-        expires_delta=access_token_expires
-    )
+    refresh_token, family_id = issue_refresh_token(db, user.id)
+    tokens = token_response(user, family_id, refresh_token)
+    db.commit()
     
     # Log audit
     log_audit(
@@ -89,16 +108,71 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
         description=f"User logged in: {user.email}"
     )
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "expires_in": 30 * 60  # 30 minutes in seconds
-    }
+    return tokens
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(request: TokenRefresh, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token"""
+    try:
+        record, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    except RefreshTokenReused as exc:
+        log_audit(
+            db=db,
+            user_id=exc.record.user_id,
+            action=AuditAction.LOGIN,
+            resource_type="user",
+            resource_id=exc.record.user_id,
+            description="Refresh token reused, session revoked",
+            status="failure",
+            error_message=str(exc)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    except RefreshTokenInvalid as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc)
+        )
+    
+    user = principal_cache.get(record.user_id)
+    if not user:
+        db_user = db.query(User).filter(User.id == record.user_id).first()
+        if db_user is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        user = Principal.from_user(db_user)
+        principal_cache.set(user)
+    
+    if not user.is_active:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    
+    db.commit()
+    return token_response(user, record.family_id, refresh_token)
 
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Logout user"""
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Logout user, revoking their access token and their session's refresh tokens"""
+    payload = decode_token(credentials.credentials)
+    revoke_token(credentials.credentials)
+    if payload and payload.get("sid"):
+        revoke_refresh_family(db, UUID(payload["sid"]))
+        db.commit()
+    
     # Log audit
     log_audit(
         db=db,
@@ -113,6 +187,6 @@ def logout(current_user: User = Depends(get_current_user), db: Session = Depends
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get current user information"""
-    return current_user
+    return db.query(User).filter(User.id == current_user.id).first()
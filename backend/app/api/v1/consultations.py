@@ -1,14 +1,28 @@
 """Consultation management routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.orm import Session
+import uuid
 from uuid import UUID
+from typing import Optional
+from datetime import datetime
 from app.db.session import get_db
+from app.db.loading import CONSULTATION_FOR_DELETE, CONSULTATION_WITH_PATIENT, refresh_with_text
+from app.db.search import match_consultations
 from app.models.user import User
 from app.models.consultation import Consultation
 from app.models.patient import Patient
-from app.schemas.consultation import ConsultationCreate, ConsultationUpdate, ConsultationResponse
-from app.api.deps import get_current_user, get_current_doctor
-from app.core.audit import log_audit
+from app.schemas.consultation import ConsultationCreate, ConsultationUpdate, ConsultationBulkUpdate, ConsultationResponse, ConsultationCacheEntry, ConsultationSearchResult
+from app.schemas.bulk import BulkItemResult, BulkItemStatus, BulkResponse
+from app.api.deps import get_current_user, get_read_db, require
+from app.core.audit import log_audit, log_audit_batch
+from app.core.cache import read_cache
+from app.core.bulk import bulk_response, check_bulk_size, failed_item, find_missing_references
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fields_response, rows_response, schema_columns, sparse_fields
+from app.core.export import ExportFormat, export_response
+from app.core.permissions import Permission
+from app.core.principals import Principal
 from app.models.audit_log import AuditAction
 
 router = APIRouter(prefix="/consultations", tags=["consultations"])
@@ -18,7 +32,7 @@ router = APIRouter(prefix="/consultations", tags=["consultations"])
 def create_consultation(
     consultation_data: ConsultationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_CONSULTATION))
 ):
     """Create a new consultation (doctors only)"""
     # Verify patient exists
@@ -40,7 +54,7 @@ def create_consultation(
     consultation = Consultation(**consultation_data.dict())
     db.add(consultation)
     db.commit()
-    db.refresh(consultation)
+    refresh_with_text(db, consultation)
     
     log_audit(
         db=db,
@@ -54,21 +68,116 @@ def create_consultation(
     return consultation
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_create_consultations(
+    consultations_data: list[ConsultationCreate],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require(Permission.CREATE_CONSULTATION))
+):
+    """Create many consultations in one transaction (doctors only)"""
+    check_bulk_size(consultations_data)
+    
+    errors = find_missing_references(db, consultations_data, [
+        ("patient_id", Patient.id, "Patient not found"),
+        ("doctor_id", User.id, "Doctor not found"),
+    ])
+    
+    rows = []
+    results = []
+    for index, (item, error) in enumerate(zip(consultations_data, errors)):
+        if error:
+            results.append(failed_item(index, error))
+            continue
+        row = {"id": uuid.uuid4(), **item.dict()}
+        rows.append(row)
+        results.append(BulkItemResult(index=index, id=row["id"], status=BulkItemStatus.CREATED))
+    
+    if rows:
+        db.execute(insert(Consultation), rows)
+        db.commit()
+        
+        log_audit_batch(db, [
+            dict(
+                user_id=current_user.id,
+                action=AuditAction.CREATE,
+                resource_type="consultation",
+                resource_id=row["id"],
+                description=f"Created consultation for patient: {row['patient_id']}"
+            )
+            for row in rows
+        ])
+    
+    return bulk_response(results)
+
+
+@router.put("/bulk", response_model=BulkResponse)
+def bulk_update_consultations(
+    consultations_data: list[ConsultationBulkUpdate],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require(Permission.CREATE_CONSULTATION))
+):
+    """Update many consultations in one transaction (doctors only)"""
+    check_bulk_size(consultations_data)
+    
+    owners = dict(
+        db.query(Consultation.id, Consultation.doctor_id)
+        .filter(Consultation.id.in_({item.id for item in consultations_data}))
+        .all()
+    )
+    
+    rows = []
+    results = []
+    now = datetime.utcnow()
+    for index, item in enumerate(consultations_data):
+        if item.id not in owners:
+            results.append(failed_item(index, "Consultation not found", item.id))
+            continue
+        # Only the doctor who created it or admin can update
+        if current_user.id != owners[item.id] and not current_user.can(Permission.UPDATE_CONSULTATION):
+            results.append(failed_item(index, "Not authorized to update this consultation", item.id))
+            continue
+        rows.append({**item.dict(exclude_unset=True), "id": item.id, "updated_at": now})
+        results.append(BulkItemResult(index=index, id=item.id, status=BulkItemStatus.UPDATED))
+    
+    if rows:
+        db.execute(update(Consultation), rows)
+        db.commit()
+        read_cache.invalidate("consultation", *[row["id"] for row in rows])
+        
+        log_audit_batch(db, [
+            dict(
+                user_id=current_user.id,
+                action=AuditAction.UPDATE,
+                resource_type="consultation",
+                resource_id=row["id"],
+                description=f"Updated consultation: {row['id']}"
+            )
+            for row in rows
+        ])
+    
+    return bulk_response(results)
+
+
 @router.get("/", response_model=list[ConsultationResponse])
 def list_consultations(
     patient_id: UUID = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: str = None,
+    fields: Optional[list] = Depends(sparse_fields(ConsultationResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """List consultations with optional patient filter"""
-    query = db.query(Consultation)
+    columns = schema_columns(Consultation, ConsultationResponse, fields, required=("created_at", "id"))
+    query = db.query(*columns)
     
     if patient_id:
         query = query.filter(Consultation.patient_id == patient_id)
     
-    consultations = query.offset(skip).limit(limit).all()
+    consultations = paginate(
+        query, Consultation.created_at, Consultation.id, cursor, skip, limit
+    ).all()
     
     log_audit(
         db=db,
@@ -78,29 +187,121 @@ def list_consultations(
         description=f"Listed {len(consultations)} consultations"
     )
     
-    return consultations
+    response = rows_response(consultations, ConsultationResponse, fields)
+    set_next_cursor(response, consultations, limit)
+    return response
+
+
+@router.get("/export")
+def export_consultations(
+    patient_id: UUID = None,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.EXPORT_RECORDS))
+):
+    """Stream consultations as NDJSON or CSV (admin only)"""
+    fields = list(ConsultationResponse.model_fields)
+    statement = select(*[getattr(Consultation, field) for field in fields])
+    
+    if patient_id:
+        statement = statement.where(Consultation.patient_id == patient_id)
+    
+    statement = statement.order_by(Consultation.created_at, Consultation.id)
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.EXPORT,
+        resource_type="consultation",
+        description=f"Exported consultations as {export_format.value}, patient filter: {patient_id}"
+    )
+    
+    return export_response(db, statement, fields, export_format, filename="consultations")
+
+
+@router.get("/search", response_model=list[ConsultationSearchResult])
+def search_consultations(
+    q: str = Query(..., min_length=2, max_length=200, description="Words to find in the clinical text"),
+    patient_id: UUID = None,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Search consultation clinical text, best matches first"""
+    if not any(character.isalnum() for character in q):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no words"
+        )
+    
+    query, rank = match_consultations(
+        db.query(Consultation), db.get_bind().dialect.name, q
+    )
+    
+    if patient_id:
+        query = query.filter(Consultation.patient_id == patient_id)
+    
+    # Same access as get_consultation: the patient, the doctor, or READ_CONSULTATION
+    if not current_user.can(Permission.READ_CONSULTATION):
+        own_patients = select(Patient.id).where(Patient.user_id == current_user.id)
+        query = query.filter(or_(
+            Consultation.doctor_id == current_user.id,
+            Consultation.patient_id.in_(own_patients)
+        ))
+    
+    columns = schema_columns(Consultation, ConsultationResponse) + [rank.label("rank")]
+    consultations = (
+        query.with_entities(*columns)
+        .order_by(rank.desc(), Consultation.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    
+    # The search text can hold patient details, so it is not logged
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.READ,
+        resource_type="consultation",
+        description=f"Searched consultations, {len(consultations)} results, patient filter: {patient_id}"
+    )
+    
+    return rows_response(consultations, ConsultationSearchResult)
 
 
 @router.get("/{consultation_id}", response_model=ConsultationResponse)
 def get_consultation(
     consultation_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[list] = Depends(sparse_fields(ConsultationResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get consultation by ID"""
-    consultation = db.query(Consultation).filter(Consultation.id == consultation_id).first()
+    consultation = read_cache.get("consultation", consultation_id, ConsultationCacheEntry)
     
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Consultation not found"
+    if consultation is None:
+        record = (
+            db.query(Consultation)
+            .options(*CONSULTATION_WITH_PATIENT)
+            .filter(Consultation.id == consultation_id)
+            .first()
         )
+        
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consultation not found"
+            )
+        
+        consultation = ConsultationCacheEntry.from_consultation(record)
+        read_cache.set("consultation", consultation_id, consultation)
     
     # Verify access permissions
-    patient = consultation.patient
-    if (current_user.id != patient.user_id and 
+    if (current_user.id != consultation.patient_user_id and 
         current_user.id != consultation.doctor_id and 
-        current_user.role.value not in ["admin"]):
+        not current_user.can(Permission.READ_CONSULTATION)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this consultation"
@@ -115,7 +316,7 @@ def get_consultation(
         description=f"Viewed consultation: {consultation_id}"
     )
     
-    return consultation
+    return fields_response(consultation, fields)
 
 
 @router.put("/{consultation_id}", response_model=ConsultationResponse)
@@ -123,7 +324,7 @@ def update_consultation(
     consultation_id: UUID,
     consultation_data: ConsultationUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_CONSULTATION))
 ):
     """Update consultation (doctors only)"""
     consultation = db.query(Consultation).filter(Consultation.id == consultation_id).first()
@@ -135,7 +336,7 @@ def update_consultation(
         )
     
     # Only the doctor who created it or admin can update
-    if current_user.id != consultation.doctor_id and current_user.role.value != "admin":
+    if current_user.id != consultation.doctor_id and not current_user.can(Permission.UPDATE_CONSULTATION):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this consultation"
@@ -147,7 +348,8 @@ def update_consultation(
     
     db.add(consultation)
     db.commit()
-    db.refresh(consultation)
+    refresh_with_text(db, consultation)
+    read_cache.invalidate("consultation", consultation_id)
     
     log_audit(
         db=db,
@@ -165,10 +367,15 @@ def update_consultation(
 def delete_consultation(
     consultation_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_CONSULTATION))
 ):
     """Delete consultation (doctors and admins only)"""
-    consultation = db.query(Consultation).filter(Consultation.id == consultation_id).first()
+    consultation = (
+        db.query(Consultation)
+        .options(*CONSULTATION_FOR_DELETE)
+        .filter(Consultation.id == consultation_id)
+        .first()
+    )
     
     if not consultation:
         raise HTTPException(
@@ -177,14 +384,18 @@ def delete_consultation(
         )
     
     # Only the doctor who created it or admin can delete
-    if current_user.id != consultation.doctor_id and current_user.role.value != "admin":
+    if current_user.id != consultation.doctor_id and not current_user.can(Permission.DELETE_CONSULTATION):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this consultation"
         )
     
+    prescription_ids = [prescription.id for prescription in consultation.prescriptions]
+    
     db.delete(consultation)
     db.commit()
+    read_cache.invalidate("consultation", consultation_id)
+    read_cache.invalidate("prescription", *prescription_ids)
     
     log_audit(
         db=db,
@@ -1,13 +1,24 @@
 """Patient management routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from uuid import UUID
+from typing import Optional
+from datetime import datetime
 from app.db.session import get_db
+from app.db.loading import PATIENT_FOR_DELETE, WITH_TEXT, patient_chart_options, refresh_with_text
+from app.db.typeahead import MIN_QUERY_LENGTH, patient_typeahead
 from app.models.user import User
 from app.models.patient import Patient
-from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
-from app.api.deps import get_current_user, get_current_doctor
+from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse, PatientChartResponse, PatientSearchResult
+from app.api.deps import get_current_user, get_read_db, require
 from app.core.audit import log_audit
+from app.core.cache import read_cache
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fields_response, rows_response, schema_columns, sparse_fields
+from app.core.export import ExportFormat, export_response
+from app.core.permissions import Permission
+from app.core.principals import Principal
 from app.models.audit_log import AuditAction
 
 router = APIRouter(prefix="/patients", tags=["patients"])
@@ -17,7 +28,7 @@ router = APIRouter(prefix="/patients", tags=["patients"])
 def create_patient(
     patient_data: PatientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new patient record"""
     # Check if user exists
@@ -39,7 +50,7 @@ def create_patient(
     patient = Patient(**patient_data.dict())
     db.add(patient)
     db.commit()
-    db.refresh(patient)
+    refresh_with_text(db, patient)
     
     log_audit(
         db=db,
@@ -57,11 +68,14 @@ def create_patient(
 def list_patients(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    cursor: str = None,
+    fields: Optional[list] = Depends(sparse_fields(PatientResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.LIST_PATIENTS))
 ):
     """List all patients (doctors and admins only)"""
-    patients = db.query(Patient).offset(skip).limit(limit).all()
+    columns = schema_columns(Patient, PatientResponse, fields, required=("created_at", "id"))
+    patients = paginate(db.query(*columns), Patient.created_at, Patient.id, cursor, skip, limit).all()
     
     log_audit(
         db=db,
@@ -71,17 +85,117 @@ def list_patients(
         description=f"Listed {len(patients)} patients"
     )
     
-    return patients
+    response = rows_response(patients, PatientResponse, fields)
+    set_next_cursor(response, patients, limit)
+    return response
+
+
+@router.get("/export")
+def export_patients(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.EXPORT_RECORDS))
+):
+    """Stream all patients as NDJSON or CSV (admin only)"""
+    fields = list(PatientResponse.model_fields)
+    statement = select(*[getattr(Patient, field) for field in fields]).order_by(
+        Patient.created_at, Patient.id
+    )
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.EXPORT,
+        resource_type="patient",
+        description=f"Exported patients as {export_format.value}"
+    )
+    
+    return export_response(db, statement, fields, export_format, filename="patients")
+
+
+@router.get("/search", response_model=list[PatientSearchResult])
+def search_patients(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=100,
+                   description="Part of a name or email, or the start of a phone or insurance number"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.LIST_PATIENTS))
+):
+    """Find patients as staff type (doctors and admins only)"""
+    columns = [
+        Patient.id, Patient.user_id, User.full_name, User.email, User.phone,
+        Patient.date_of_birth, Patient.insurance_number
+    ]
+    patients = db.execute(patient_typeahead(columns, q, limit)).all()
+    
+    # The search text identifies a patient, so it is not logged
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.READ,
+        resource_type="patient",
+        description=f"Searched patients, {len(patients)} results"
+    )
+    
+    return rows_response(patients, PatientSearchResult)
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
 def get_patient(
     patient_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[list] = Depends(sparse_fields(PatientResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get patient by ID"""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = read_cache.get("patient", patient_id, PatientResponse)
+    
+    if patient is None:
+        record = db.query(Patient).options(*WITH_TEXT).filter(Patient.id == patient_id).first()
+        
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient not found"
+            )
+        
+        patient = PatientResponse.model_validate(record)
+        read_cache.set("patient", patient_id, patient)
+    
+    # Patients can only view their own record unless they are doctor/admin
+    if current_user.id != patient.user_id and not current_user.can(Permission.READ_PATIENT):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this patient record"
+        )
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.READ,
+        resource_type="patient",
+        resource_id=patient_id,
+        description=f"Viewed patient record: {patient_id}"
+    )
+    
+    return fields_response(patient, fields)
+
+
+@router.get("/{patient_id}/chart", response_model=PatientChartResponse)
+def get_patient_chart(
+    patient_id: UUID,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get a patient record with their consultations and prescriptions"""
+    patient = (
+        db.query(Patient)
+        .options(*patient_chart_options(since, until))
+        .filter(Patient.id == patient_id)
+        .first()
+    )
     
     if not patient:
         raise HTTPException(
@@ -89,8 +203,8 @@ def get_patient(
             detail="Patient not found"
         )
     
-    # Patients can only view their own record unless they are doctor/admin
-    if current_user.id != patient.user_id and current_user.role.value not in ["doctor", "nurse", "admin"]:
+    # Same access rules as the patient record itself
+    if current_user.id != patient.user_id and not current_user.can(Permission.READ_PATIENT):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this patient record"
@@ -102,7 +216,7 @@ def get_patient(
         action=AuditAction.READ,
         resource_type="patient",
         resource_id=patient_id,
-        description=f"Viewed patient record: {patient_id}"
+        description=f"Viewed patient chart: {patient_id}"
     )
     
     return patient
@@ -113,7 +227,7 @@ def update_patient(
     patient_id: UUID,
     patient_data: PatientUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update patient information"""
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
@@ -125,7 +239,7 @@ def update_patient(
         )
     
     # Patients can only update their own record unless they are doctor/admin
-    if current_user.id != patient.user_id and current_user.role.value not in ["doctor", "admin"]:
+    if current_user.id != patient.user_id and not current_user.can(Permission.UPDATE_PATIENT):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this patient record"
@@ -137,7 +251,8 @@ def update_patient(
     
     db.add(patient)
     db.commit()
-    db.refresh(patient)
+    refresh_with_text(db, patient)
+    read_cache.invalidate("patient", patient_id)
     
     log_audit(
         db=db,
@@ -155,10 +270,10 @@ def update_patient(
 def delete_patient(
     patient_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.DELETE_PATIENT))
 ):
     """Delete patient record (doctors and admins only)"""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = db.query(Patient).options(*PATIENT_FOR_DELETE).filter(Patient.id == patient_id).first()
     
     if not patient:
         raise HTTPException(
@@ -166,8 +281,14 @@ def delete_patient(
             detail="Patient not found"
         )
     
+    consultation_ids = [consultation.id for consultation in patient.consultations]
+    prescription_ids = [prescription.id for prescription in patient.prescriptions]
+    
     db.delete(patient)
     db.commit()
+    read_cache.invalidate("patient", patient_id)
+    read_cache.invalidate("consultation", *consultation_ids)
+    read_cache.invalidate("prescription", *prescription_ids)
     
     log_audit(
         db=db,
@@ -1,15 +1,28 @@
 """Prescription management routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+import uuid
 from uuid import UUID
+from typing import Optional
 from datetime import datetime
 from app.db.session import get_db
+from app.db.loading import PRESCRIPTION_WITH_PATIENT, refresh_with_text
 from app.models.user import User
-from app.models.prescription import Prescription
+from app.models.prescription import Prescription, PrescriptionStatus
 from app.models.patient import Patient
-from app.schemas.prescription import PrescriptionCreate, PrescriptionUpdate, PrescriptionDispense, PrescriptionResponse
-from app.api.deps import get_current_user, get_current_doctor, get_current_pharmacist
-from app.core.audit import log_audit
+from app.models.consultation import Consultation
+from app.schemas.prescription import PrescriptionCreate, PrescriptionUpdate, PrescriptionBulkUpdate, PrescriptionDispense, PrescriptionResponse, PrescriptionCacheEntry
+from app.schemas.bulk import BulkItemResult, BulkItemStatus, BulkResponse
+from app.api.deps import get_current_user, get_read_db, require
+from app.core.audit import log_audit, log_audit_batch
+from app.core.cache import read_cache
+from app.core.bulk import bulk_response, check_bulk_size, failed_item, find_missing_references
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fields_response, rows_response, schema_columns, sparse_fields
+from app.core.export import ExportFormat, export_response
+from app.core.permissions import Permission
+from app.core.principals import Principal
 from app.models.audit_log import AuditAction
 
 router = APIRouter(prefix="/prescriptions", tags=["prescriptions"])
@@ -19,7 +32,7 @@ router = APIRouter(prefix="/prescriptions", tags=["prescriptions"])
 def create_prescription(
     prescription_data: PrescriptionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_PRESCRIPTION))
 ):
     """Create a new prescription (doctors only)"""
     # Verify patient exists
@@ -41,7 +54,7 @@ def create_prescription(
     prescription = Prescription(**prescription_data.dict())
     db.add(prescription)
     db.commit()
-    db.refresh(prescription)
+    refresh_with_text(db, prescription)
     
     log_audit(
         db=db,
@@ -55,17 +68,111 @@ def create_prescription(
     return prescription
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_create_prescriptions(
+    prescriptions_data: list[PrescriptionCreate],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require(Permission.CREATE_PRESCRIPTION))
+):
+    """Create many prescriptions in one transaction (doctors only)"""
+    check_bulk_size(prescriptions_data)
+    
+    errors = find_missing_references(db, prescriptions_data, [
+        ("patient_id", Patient.id, "Patient not found"),
+        ("doctor_id", User.id, "Doctor not found"),
+        ("consultation_id", Consultation.id, "Consultation not found"),
+    ])
+    
+    rows = []
+    results = []
+    for index, (item, error) in enumerate(zip(prescriptions_data, errors)):
+        if error:
+            results.append(failed_item(index, error))
+            continue
+        row = {"id": uuid.uuid4(), **item.dict()}
+        rows.append(row)
+        results.append(BulkItemResult(index=index, id=row["id"], status=BulkItemStatus.CREATED))
+    
+    if rows:
+        db.execute(insert(Prescription), rows)
+        db.commit()
+        
+        log_audit_batch(db, [
+            dict(
+                user_id=current_user.id,
+                action=AuditAction.CREATE,
+                resource_type="prescription",
+                resource_id=row["id"],
+                description=f"Created prescription for patient: {row['patient_id']}, medication: {row['medication_name']}"
+            )
+            for row in rows
+        ])
+    
+    return bulk_response(results)
+
+
+@router.put("/bulk", response_model=BulkResponse)
+def bulk_update_prescriptions(
+    prescriptions_data: list[PrescriptionBulkUpdate],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require(Permission.CREATE_PRESCRIPTION))
+):
+    """Update many prescriptions in one transaction (doctors only)"""
+    check_bulk_size(prescriptions_data)
+    
+    owners = dict(
+        db.query(Prescription.id, Prescription.doctor_id)
+        .filter(Prescription.id.in_({item.id for item in prescriptions_data}))
+        .all()
+    )
+    
+    rows = []
+    results = []
+    now = datetime.utcnow()
+    for index, item in enumerate(prescriptions_data):
+        if item.id not in owners:
+            results.append(failed_item(index, "Prescription not found", item.id))
+            continue
+        # Only the doctor who created it or admin can update
+        if current_user.id != owners[item.id] and not current_user.can(Permission.UPDATE_PRESCRIPTION):
+            results.append(failed_item(index, "Not authorized to update this prescription", item.id))
+            continue
+        rows.append({**item.dict(exclude_unset=True), "id": item.id, "updated_at": now})
+        results.append(BulkItemResult(index=index, id=item.id, status=BulkItemStatus.UPDATED))
+    
+    if rows:
+        db.execute(update(Prescription), rows)
+        db.commit()
+        read_cache.invalidate("prescription", *[row["id"] for row in rows])
+        
+        log_audit_batch(db, [
+            dict(
+                user_id=current_user.id,
+                action=AuditAction.UPDATE,
+                resource_type="prescription",
+                resource_id=row["id"],
+                description=f"Updated prescription: {row['id']}"
+            )
+            for row in rows
+        ])
+    
+    return bulk_response(results)
+
+
 @router.get("/", response_model=list[PrescriptionResponse])
 def list_prescriptions(
     patient_id: UUID = None,
     status_filter: str = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: str = None,
+    fields: Optional[list] = Depends(sparse_fields(PrescriptionResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """List prescriptions with optional filters"""
-    query = db.query(Prescription)
+    columns = schema_columns(Prescription, PrescriptionResponse, fields, required=("created_at", "id"))
+    query = db.query(*columns)
     
     if patient_id:
         query = query.filter(Prescription.patient_id == patient_id)
@@ -73,7 +180,9 @@ def list_prescriptions(
     if status_filter:
         query = query.filter(Prescription.status == status_filter)
     
-    prescriptions = query.offset(skip).limit(limit).all()
+    prescriptions = paginate(
+        query, Prescription.created_at, Prescription.id, cursor, skip, limit
+    ).all()
     
     log_audit(
         db=db,
@@ -83,29 +192,73 @@ def list_prescriptions(
         description=f"Listed {len(prescriptions)} prescriptions"
     )
     
-    return prescriptions
+    response = rows_response(prescriptions, PrescriptionResponse, fields)
+    set_next_cursor(response, prescriptions, limit)
+    return response
+
+
+@router.get("/export")
+def export_prescriptions(
+    patient_id: UUID = None,
+    status_filter: str = None,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.EXPORT_RECORDS))
+):
+    """Stream prescriptions as NDJSON or CSV (admin only)"""
+    fields = list(PrescriptionResponse.model_fields)
+    statement = select(*[getattr(Prescription, field) for field in fields])
+    
+    if patient_id:
+        statement = statement.where(Prescription.patient_id == patient_id)
+    
+    if status_filter:
+        statement = statement.where(Prescription.status == status_filter)
+    
+    statement = statement.order_by(Prescription.created_at, Prescription.id)
+    
+    log_audit(
+        db=db,
+        user_id=current_user.id,
+        action=AuditAction.EXPORT,
+        resource_type="prescription",
+        description=f"Exported prescriptions as {export_format.value}, patient filter: {patient_id}"
+    )
+    
+    return export_response(db, statement, fields, export_format, filename="prescriptions")
 
 
 @router.get("/{prescription_id}", response_model=PrescriptionResponse)
 def get_prescription(
     prescription_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[list] = Depends(sparse_fields(PrescriptionResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get prescription by ID"""
-    prescription = db.query(Prescription).filter(Prescription.id == prescription_id).first()
+    prescription = read_cache.get("prescription", prescription_id, PrescriptionCacheEntry)
     
-    if not prescription:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Prescription not found"
+    if prescription is None:
+        record = (
+            db.query(Prescription)
+            .options(*PRESCRIPTION_WITH_PATIENT)
+            .filter(Prescription.id == prescription_id)
+            .first()
         )
+        
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prescription not found"
+            )
+        
+        prescription = PrescriptionCacheEntry.from_prescription(record)
+        read_cache.set("prescription", prescription_id, prescription)
     
     # Verify access permissions
-    patient = prescription.patient
-    if (current_user.id != patient.user_id and 
+    if (current_user.id != prescription.patient_user_id and 
         current_user.id != prescription.doctor_id and 
-        current_user.role.value not in ["pharmacist", "admin"]):
+        not current_user.can(Permission.READ_PRESCRIPTION)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this prescription"
@@ -120,7 +273,7 @@ def get_prescription(
         description=f"Viewed prescription: {prescription_id}"
     )
     
-    return prescription
+    return fields_response(prescription, fields)
 
 
 @router.put("/{prescription_id}", response_model=PrescriptionResponse)
@@ -128,7 +281,7 @@ def update_prescription(
     prescription_id: UUID,
     prescription_data: PrescriptionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_PRESCRIPTION))
 ):
     """Update prescription (doctors only)"""
     prescription = db.query(Prescription).filter(Prescription.id == prescription_id).first()
@@ -140,7 +293,7 @@ def update_prescription(
         )
     
     # Only the doctor who created it or admin can update
-    if current_user.id != prescription.doctor_id and current_user.role.value != "admin":
+    if current_user.id != prescription.doctor_id and not current_user.can(Permission.UPDATE_PRESCRIPTION):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this prescription"
@@ -152,7 +305,8 @@ def update_prescription(
     
     db.add(prescription)
     db.commit()
-    db.refresh(prescription)
+    refresh_with_text(db, prescription)
+    read_cache.invalidate("prescription", prescription_id)
     
     log_audit(
         db=db,
@@ -171,7 +325,7 @@ def dispense_prescription(
     prescription_id: UUID,
     dispense_data: PrescriptionDispense,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_pharmacist)
+    current_user: Principal = Depends(require(Permission.DISPENSE_PRESCRIPTION))
 ):
     """Dispense prescription (pharmacists only)"""
     prescription = db.query(Prescription).filter(Prescription.id == prescription_id).first()
@@ -192,16 +346,17 @@ def dispense_prescription(
     
     prescription.dispensed_date = datetime.utcnow()
     prescription.dispensed_by = dispense_data.dispensed_by
-    prescription.status = "completed"
+    prescription.status = PrescriptionStatus.COMPLETED
     
     db.add(prescription)
     db.commit()
-    db.refresh(prescription)
+    refresh_with_text(db, prescription)
+    read_cache.invalidate("prescription", prescription_id)
     
     log_audit(
         db=db,
         user_id=current_user.id,
-        action=AuditAction.DISPENSE_PRESCRIPTION,
+        action=AuditAction.UPDATE,
         resource_type="prescription",
         resource_id=prescription_id,
         description=f"Dispensed prescription: {prescription_id}, medication: {prescription.medication_name}"
@@ -214,7 +369,7 @@ def dispense_prescription(
 def delete_prescription(
     prescription_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_doctor)
+    current_user: Principal = Depends(require(Permission.CREATE_PRESCRIPTION))
 ):
     """Delete prescription (doctors and admins only)"""
     prescription = db.query(Prescription).filter(Prescription.id == prescription_id).first()
@@ -226,7 +381,7 @@ def delete_prescription(
         )
     
     # Only the doctor who created it or admin can delete
-    if current_user.id != prescription.doctor_id and current_user.role.value != "admin":
+    if current_user.id != prescription.doctor_id and not current_user.can(Permission.DELETE_PRESCRIPTION):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this prescription"
@@ -234,6 +389,7 @@ def delete_prescription(
     
     db.delete(prescription)
     db.commit()
+    read_cache.invalidate("prescription", prescription_id)
     
     log_audit(
         db=db,
@@ -2,11 +2,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from uuid import UUID
+from typing import Optional
 from app.db.session import get_db
 from app.models.user import User
+from app.models.refresh_token import RefreshToken
 from app.schemas.user import UserResponse, UserUpdate
-from app.api.deps import get_current_user, get_current_admin
+from app.api.deps import get_current_user, get_read_db, require
 from app.core.audit import log_audit
+from app.core.cache import read_cache
+from app.core.pagination import paginate, set_next_cursor
+from app.core.responses import fields_response, rows_response, schema_columns, sparse_fields
+from app.core.permissions import Permission
+from app.core.principals import Principal, principal_cache
 from app.models.audit_log import AuditAction
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -16,11 +23,14 @@ router = APIRouter(prefix="/users", tags=["users"])
 def list_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    cursor: str = None,
+    fields: Optional[list] = Depends(sparse_fields(UserResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require(Permission.READ_USER))
 ):
     """List all users (admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    columns = schema_columns(User, UserResponse, fields, required=("created_at", "id"))
+    users = paginate(db.query(*columns), User.created_at, User.id, cursor, skip, limit).all()
     
     log_audit(
         db=db,
@@ -30,30 +40,39 @@ def list_users(
         description=f"Listed {len(users)} users"
     )
     
-    return users
+    response = rows_response(users, UserResponse, fields)
+    set_next_cursor(response, users, limit)
+    return response
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[list] = Depends(sparse_fields(UserResponse)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user by ID"""
     # Users can only view their own profile unless they are admin
-    if current_user.id != user_id and current_user.role.value != "admin":
+    if current_user.id != user_id and not current_user.can(Permission.READ_USER):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this user"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = read_cache.get("user", user_id, UserResponse)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    if user is None:
+        record = db.query(User).filter(User.id == user_id).first()
+        
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        user = UserResponse.model_validate(record)
+        read_cache.set("user", user_id, user)
     
     log_audit(
         db=db,
@@ -64,7 +83,7 @@ def get_user(
         description=f"Viewed user: {user.email}"
     )
     
-    return user
+    return fields_response(user, fields)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -72,11 +91,11 @@ def update_user(
     user_id: UUID,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update user information"""
     # Users can only update their own profile unless they are admin
-    if current_user.id != user_id and current_user.role.value != "admin":
+    if current_user.id != user_id and not current_user.can(Permission.UPDATE_USER):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this user"
@@ -98,6 +117,8 @@ def update_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user_id)
+    read_cache.invalidate("user", user_id)
     
     log_audit(
         db=db,
@@ -115,7 +136,7 @@ def update_user(
 def delete_user(
     user_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(require(Permission.DELETE_USER))
 ):
     """Delete user (admin only)"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -126,8 +147,11 @@ def delete_user(
             detail="User not found"
         )
     
+    db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete(synchronize_session=False)
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(user_id)
+    read_cache.invalidate("user", user_id)
     
     log_audit(
         db=db,
@@ -1,13 +1,399 @@
 """Audit logging utilities"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from sqlalchemy import BigInteger, cast, func, insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from app.models.audit_log import AuditLog, AuditAction
+from app.config import settings
+from app.core.concurrency import off_loop
+from app.db.partitions import create_partitions_for, is_missing_partition
+from app.models.audit_log import NO_USER, AuditDailyCount, AuditLog, AuditAction
+from app.core.metrics import AUDIT_BATCH_SECONDS, audit_timer
+from app.core.pagination import paginate
 from uuid import UUID
-from typing import Optional
-from datetime import datetime
+from typing import Callable, Optional
+from datetime import date, datetime
 
+logger = logging.getLogger(__name__)
 
-def log_audit(
-    db: Session,
+_UUID_FIELDS = ("id", "user_id", "resource_id")
+
+# audit-<pid>.jsonl and audit-<pid>-<ns>-<seq>.segment
+_SPOOL_NAME = re.compile(r"audit-(\d+)(?:\.jsonl|-\d+-\d+\.segment)$")
+
+# Insert errors caused by a segment's rows, which retrying cannot fix
+_REJECTED_ERRORS = (IntegrityError, DataError)
+
+# Columns audit counts can be grouped by
+AUDIT_COUNT_GROUPS = ("day", "user_id", "action", "resource_type")
+
+
+def _to_spool_record(row: dict) -> dict:
+    """Convert an audit row into a JSON-serializable spool record"""
+    record = dict(row)
+    for field in _UUID_FIELDS:
+        if record[field] is not None:
+            record[field] = str(record[field])
+    record["action"] = record["action"].value
+    record["timestamp"] = record["timestamp"].isoformat()
+    return record
+
+
+def _spool_owner(name: str) -> Optional[int]:
+    """Get the pid that wrote a spool file, or None if it cannot be told"""
+    match = _SPOOL_NAME.match(name)
+    return int(match.group(1)) if match else None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _from_spool_record(record: dict) -> dict:
+    """Convert a spool record back into an insertable audit row"""
+    row = dict(record)
+    for field in _UUID_FIELDS:
+        if row[field] is not None:
+            row[field] = UUID(row[field])
+    row["action"] = AuditAction(row["action"])
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+def _dialect_insert(db: Session):
+    """Get the insert construct of the session's database, which supports ON CONFLICT"""
+    return postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def _execute_insert(db: Session, statement, rows: list, savepoint: bool = True):
+    """Execute an audit insert, creating missing partitions and retrying once
+    
+    On PostgreSQL, where the partitions live, the insert runs in a savepoint
+    unless the session holds nothing else, so a failure for want of a
+    partition leaves the rest of the caller's transaction intact.
+    """
+    savepoint = savepoint and db.get_bind().dialect.name == "postgresql"
+    try:
+        if not savepoint:
+            return db.execute(statement, rows)
+        with db.begin_nested():
+            return db.execute(statement, rows)
+    except IntegrityError as error:
+        if not is_missing_partition(error):
+            raise
+        if not savepoint:
+            db.rollback()
+    create_partitions_for(db.get_bind(), [row["timestamp"] for row in rows])
+    return db.execute(statement, rows)
+
+
+def _read_segment(path: str) -> list:
+    """Decode a spool segment, skipping lines a crash truncated or corrupted"""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(_from_spool_record(json.loads(line)))
+            except (ValueError, KeyError, TypeError):
+                # The line may hold patient data, so only its position is logged
+                logger.error("Skipped undecodable line %d of audit spool %s", number, path)
+    return rows
+
+
+class AuditWriter:
+    """Background writer that batches audit events into multi-row inserts
+    
+    Every event is appended to a local spool file before it is acknowledged.
+    On flush the spool is rotated into a segment, the batch is inserted in a
+    single statement and the segment is removed once the insert commits.
+    Segments left behind by a crash or a failed insert are replayed on the
+    next start or flush.
+    
+    Each process spools to files named after its pid, so workers sharing a
+    spool directory never rotate each other's files. On start a worker adopts
+    the files of processes that are no longer running.
+    
+    Replays skip rows already written, so a crash between an insert's commit
+    and the removal of its segment does not block the spool. A segment whose
+    rows the database rejects max_replay_attempts times is renamed to
+    ``.quarantine`` for an operator to inspect, and replay moves on.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        spool_dir: str = settings.AUDIT_SPOOL_DIR,
+        max_replay_attempts: int = 3
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = spool_dir
+        self.max_replay_attempts = max_replay_attempts
+        self._rejections: dict = {}
+        self._pending: list = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._spool = None
+        self._segment_seq = 0
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background worker is accepting events"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Replay leftover spool segments and start the background worker"""
+        if self.is_running:
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with self._lock:
+            self._rotate_spool()
+            self._adopt_orphans()
+            self._spool = open(self._spool_path, "a", encoding="utf-8")
+        self._replay_segments()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Flush pending events and stop the background worker"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        with self._lock:
+            self._spool.close()
+            self._spool = None
+            if os.path.getsize(self._spool_path) == 0:
+                os.remove(self._spool_path)
+    
+    def enqueue(self, row: dict) -> None:
+        """Spool an audit row and queue it for the next batch insert"""
+        self.enqueue_many([row])
+    
+    def enqueue_many(self, rows: list) -> None:
+        """Spool audit rows and queue them for the next batch insert"""
+        lines = "".join(json.dumps(_to_spool_record(row)) + "\n" for row in rows)
+        off_loop(self._spool_rows, lines, rows)
+    
+    def _spool_rows(self, lines: str, rows: list) -> None:
+        """Append rows to the spool and the pending batch, waiting out a flush's rotation"""
+        with self._lock:
+            self._spool.write(lines)
+            self._spool.flush()
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+    
+    def flush(self) -> int:
+        """Insert all pending events and return how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = []
+                segment = None
+                if batch:
+                    segment = self._rotate_spool()
+                    self._spool = open(self._spool_path, "a", encoding="utf-8")
+            
+            written = self._replay_segments(exclude=segment)
+            if batch and self._insert(batch):
+                os.remove(segment)
+                written += len(batch)
+            return written
+    
+    @property
+    def _spool_path(self) -> str:
+        return os.path.join(self.spool_dir, f"audit-{os.getpid()}.jsonl")
+    
+    def _new_segment_path(self) -> str:
+        self._segment_seq += 1
+        return os.path.join(
+            self.spool_dir,
+            f"audit-{os.getpid()}-{time.time_ns()}-{self._segment_seq}.segment"
+        )
+    
+    def _rotate_spool(self) -> Optional[str]:
+        """Move the active spool file aside as a segment (caller holds the lock)"""
+        if self._spool is not None:
+            self._spool.close()
+        if not os.path.exists(self._spool_path) or os.path.getsize(self._spool_path) == 0:
+            return None
+        segment = self._new_segment_path()
+        os.replace(self._spool_path, segment)
+        return segment
+    
+    def _adopt_orphans(self) -> None:
+        """Claim spool files and segments of processes that are no longer running"""
+        for name in os.listdir(self.spool_dir):
+            if not name.endswith((".jsonl", ".segment")):
+                continue
+            owner = _spool_owner(name)
+            if owner == os.getpid() or (owner is not None and _pid_alive(owner)):
+                continue
+            try:
+                os.replace(os.path.join(self.spool_dir, name), self._new_segment_path())
+            except FileNotFoundError:
+                # Another worker claimed it first
+                continue
+    
+    def _replay_segments(self, exclude: Optional[str] = None) -> int:
+        """Insert spool segments left over from earlier failures or crashes"""
+        written = 0
+        prefix = f"audit-{os.getpid()}-"
+        segments = sorted(
+            os.path.join(self.spool_dir, name)
+            for name in os.listdir(self.spool_dir)
+            if name.startswith(prefix) and name.endswith(".segment")
+        )
+        for segment in segments:
+            if segment == exclude:
+                continue
+            rows = _read_segment(segment)
+            try:
+                if rows:
+                    written += self._write(rows)
+            except _REJECTED_ERRORS:
+                logger.exception("Database rejected audit spool %s", segment)
+                self._reject(segment)
+                continue
+            except Exception:
+                logger.exception("Failed to replay audit spool %s; kept for retry", segment)
+                break
+            os.remove(segment)
+            self._rejections.pop(segment, None)
+        return written
+    
+    def _reject(self, segment: str) -> None:
+        """Count a rejected replay, quarantining the segment once it keeps being rejected"""
+        attempts = self._rejections.get(segment, 0) + 1
+        if attempts < self.max_replay_attempts:
+            self._rejections[segment] = attempts
+            return
+        self._rejections.pop(segment, None)
+        quarantine = segment[:-len(".segment")] + ".quarantine"
+        os.replace(segment, quarantine)
+        logger.error("Quarantined audit spool %s after %d rejected replays", quarantine, attempts)
+    
+    def _insert(self, rows: list) -> bool:
+        """Write rows, keeping them spooled on failure"""
+        try:
+            self._write(rows)
+            return True
+        except Exception:
+            logger.exception("Failed to write %d audit events; kept in spool", len(rows))
+            return False
+    
+    def _write(self, rows: list) -> int:
+        """Insert the rows not written yet with one multi-row INSERT and return how many were"""
+        factory = self.session_factory
+        if factory is None:
+            from app.db.session import SessionLocal
+            factory = SessionLocal
+        
+        db = factory()
+        try:
+            with AUDIT_BATCH_SECONDS.time():
+                # No conflict target: the primary key is (id, timestamp) on
+                # partitioned PostgreSQL and on create_all schemas but (id) on
+                # other migrated databases, and it is the only unique key
+                statement = (
+                    _dialect_insert(db)(AuditLog)
+                    .on_conflict_do_nothing()
+                    .returning(AuditLog.id)
+                )
+                inserted = set(_execute_insert(db, statement, rows, savepoint=False).scalars())
+                add_daily_counts(db, [row for row in rows if row["id"] in inserted])
+                db.commit()
+            return len(inserted)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed")
+
+
+audit_writer = AuditWriter()
+
+
+def add_daily_counts(db: Session, rows: list) -> None:
+    """Add inserted audit rows to audit_daily_counts; the caller commits
+    
+    Rows are summed per key first, so one upsert statement covers a whole
+    batch, and keys are written in order so concurrent batches cannot
+    deadlock on them. Committing with the audit rows keeps the counts exact
+    when a failed batch is replayed from the spool.
+    """
+    counts = Counter(
+        (row["timestamp"].date(), row["user_id"] or NO_USER, row["action"], row["resource_type"])
+        for row in rows
+    )
+    if not counts:
+        return
+    
+    values = [
+        dict(day=day, user_id=user_id, action=action, resource_type=resource_type, events=events)
+        for (day, user_id, action, resource_type), events in sorted(counts.items())
+    ]
+    statement = _dialect_insert(db)(AuditDailyCount).values(values)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["day", "user_id", "action", "resource_type"],
+        set_={"events": AuditDailyCount.events + statement.excluded.events}
+    ))
+
+
+def _count_committed(db: Session, rows: list) -> None:
+    """Add audit rows committed on a request's session to the daily counts
+    
+    The counts are updated in a short transaction of their own, so requests
+    logging the same day, user and action only wait on each other's counter
+    row for the upsert itself, never for the rest of a request's
+    transaction. The counts miss the rows if that update fails.
+    """
+    with Session(bind=db.get_bind()) as counts_db:
+        try:
+            add_daily_counts(counts_db, rows)
+            counts_db.commit()
+        except Exception:
+            counts_db.rollback()
+            logger.exception("Failed to add %d audit events to the daily counts", len(rows))
+
+
+def _audit_row(
     user_id: Optional[UUID],
     action: AuditAction,
     resource_type: str,
@@ -17,9 +403,10 @@ def log_audit(
     user_agent: Optional[str] = None,
     status: str = "success",
     error_message: Optional[str] = None
-) -> AuditLog:
-    """Log an audit event"""
-    audit_log = AuditLog(
+) -> dict:
+    """Build an insertable audit row"""
+    return dict(
+        id=uuid.uuid4(),
         user_id=user_id,
         action=action,
         resource_type=resource_type,
@@ -31,30 +418,153 @@ def log_audit(
         error_message=error_message,
         timestamp=datetime.utcnow()
     )
-    db.add(audit_log)
-    db.commit()
-    db.refresh(audit_log)
-    return audit_log
+
+
+def log_audit(
+    db: Session,
+    user_id: Optional[UUID],
+    action: AuditAction,
+    resource_type: str,
+    resource_id: Optional[UUID] = None,
+    description: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    status: str = "success",
+    error_message: Optional[str] = None
+) -> AuditLog:
+    """Log an audit event
+    
+    When the background writer is running the event is spooled and batched
+    instead of being committed on the request's session.
+    """
+    with audit_timer():
+        row = _audit_row(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            description=description,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            status=status,
+            error_message=error_message
+        )
+        
+        if audit_writer.is_running:
+            audit_writer.enqueue(row)
+            return AuditLog(**row)
+        
+        _execute_insert(db, insert(AuditLog), [row])
+        db.commit()
+        _count_committed(db, [row])
+        return AuditLog(**row)
+
+
+def log_audit_batch(db: Session, events: list) -> None:
+    """Log many audit events at once
+    
+    Each event is a dict of log_audit keyword arguments. Without the
+    background writer the events are committed with a single multi-row insert.
+    """
+    with audit_timer():
+        rows = [_audit_row(**event) for event in events]
+        
+        if audit_writer.is_running:
+            audit_writer.enqueue_many(rows)
+            return
+        
+        _execute_insert(db, insert(AuditLog), rows)
+        db.commit()
+        _count_committed(db, rows)
 
 
 def get_audit_logs(
     db: Session,
     user_id: Optional[UUID] = None,
+    action: Optional[AuditAction] = None,
     resource_type: Optional[str] = None,
     resource_id: Optional[UUID] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    columns: Optional[list] = None
 ) -> list:
-    """Get audit logs with optional filters"""
-    query = db.query(AuditLog)
+    """Get audit logs with optional filters, newest first
+    
+    Pass the cursor of the previous page (see pagination.next_cursor with
+    ``sort_attr="timestamp"``) to page by keyset instead of offset. since
+    (inclusive) and until (exclusive) bound the time range; on PostgreSQL
+    only the monthly partitions overlapping it are scanned. Pass columns to
+    get row tuples instead of AuditLog instances.
+    """
+    query = db.query(*columns) if columns else db.query(AuditLog)
+    
+    if since:
+        query = query.filter(AuditLog.timestamp >= since)
+    
+    if until:
+        query = query.filter(AuditLog.timestamp < until)
     
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
     
+    if action:
+        query = query.filter(AuditLog.action == action)
+    
     if resource_type:
         query = query.filter(AuditLog.resource_type == resource_type)
     
     if resource_id:
         query = query.filter(AuditLog.resource_id == resource_id)
     
-    return query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit).all()
+    return paginate(
+        query, AuditLog.timestamp, AuditLog.id, cursor, offset, limit, descending=True
+    ).all()
+
+
+def get_audit_counts(
+    db: Session,
+    group_by: list,
+    user_id: Optional[UUID] = None,
+    action: Optional[AuditAction] = None,
+    resource_type: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    limit: int = 1000
+) -> list:
+    """Count audit events per group from audit_daily_counts
+    
+    group_by holds names from AUDIT_COUNT_GROUPS; rows are the group's values
+    in that order followed by the count, ordered by group. since (inclusive)
+    and until (exclusive) are days. Events without a user are grouped under
+    a user_id of None.
+    """
+    groups = [getattr(AuditDailyCount, name) for name in group_by]
+    total = cast(func.coalesce(func.sum(AuditDailyCount.events), 0), BigInteger)
+    statement = select(*groups, total).group_by(*groups).order_by(*groups).limit(limit)
+    
+    if since:
+        statement = statement.where(AuditDailyCount.day >= since)
+    
+    if until:
+        statement = statement.where(AuditDailyCount.day < until)
+    
+    if user_id:
+        statement = statement.where(AuditDailyCount.user_id == user_id)
+    
+    if action:
+        statement = statement.where(AuditDailyCount.action == action)
+    
+    if resource_type:
+        statement = statement.where(AuditDailyCount.resource_type == resource_type)
+    
+    rows = db.execute(statement).all()
+    if "user_id" not in group_by:
+        return rows
+    position = group_by.index("user_id")
+    return [
+        tuple(None if index == position and value == NO_USER else value for index, value in enumerate(row))
+        for row in rows
+    ]
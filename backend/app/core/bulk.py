@@ -0,0 +1,47 @@
+"""Bulk create/update utilities"""
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.schemas.bulk import BulkItemResult, BulkItemStatus, BulkResponse
+
+
+def check_bulk_size(items: list) -> None:
+    """Reject empty or oversized bulk requests"""
+    if not items or len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk requests must contain between 1 and {settings.BULK_MAX_ITEMS} items"
+        )
+
+
+def find_missing_references(db: Session, items: list, references: list) -> list:
+    """Get the first missing reference error for each item
+    
+    ``references`` is a list of ``(field, column, error)`` tuples. Each
+    reference is checked for all items at once with a single IN query.
+    """
+    errors: list[Optional[str]] = [None] * len(items)
+    
+    for field, column, error in references:
+        wanted = {getattr(item, field) for item in items} - {None}
+        if not wanted:
+            continue
+        found = {row[0] for row in db.query(column).filter(column.in_(wanted))}
+        for index, item in enumerate(items):
+            value = getattr(item, field)
+            if errors[index] is None and value is not None and value not in found:
+                errors[index] = error
+    
+    return errors
+
+
+def bulk_response(results: list) -> BulkResponse:
+    """Summarize per-item results"""
+    failed = sum(1 for result in results if result.status == BulkItemStatus.FAILED)
+    return BulkResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+def failed_item(index: int, error: str, item_id=None) -> BulkItemResult:
+    """Build a failed item result"""
+    return BulkItemResult(index=index, id=item_id, status=BulkItemStatus.FAILED, error=error)
@@ -0,0 +1,198 @@
+"""Read-through cache for single-record responses
+
+Handlers cache the serialized response of a record keyed by resource type and
+id, and invalidate it after every write to that record. Access checks and
+audit logging stay in the handlers, so they run on hits as well as misses.
+Backend calls run off the event loop in async mode.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Type, TypeVar
+from uuid import UUID
+from pydantic import BaseModel
+from app.config import settings
+from app.core.concurrency import off_loop
+
+logger = logging.getLogger(__name__)
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# Left in place of an invalidated record while reads may still return the old version
+TOMBSTONE = b""
+
+# Shortest tombstone, covering reads that loaded a record just before it was written
+MIN_TOMBSTONE_SECONDS = 5
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend, for tests and single-process development"""
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value if present and not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value for ttl seconds"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def add(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value for ttl seconds unless the key already holds one"""
+        if self.get(key) is None:
+            self.set(key, value, ttl)
+    
+    def delete(self, *keys: str) -> None:
+        """Remove values"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all values"""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Backend shared by all workers through the configured Redis"""
+    
+    def __init__(self, url: str = settings.REDIS_URL):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value if present"""
+        return self.client.get(key)
+    
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value for ttl seconds"""
+        self.client.set(key, value, ex=ttl)
+    
+    def add(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value for ttl seconds unless the key already holds one"""
+        self.client.set(key, value, ex=ttl, nx=True)
+    
+    def delete(self, *keys: str) -> None:
+        """Remove values"""
+        self.client.delete(*keys)
+
+
+def create_backend(name: str = settings.READ_CACHE_BACKEND):
+    """Build the backend named in settings, or None when caching is disabled"""
+    if name == "redis":
+        return RedisCacheBackend()
+    if name == "memory":
+        return MemoryCacheBackend()
+    return None
+
+
+class ReadCache:
+    """Cache of serialized record responses
+    
+    A backend error is logged and treated as a miss so an unavailable cache
+    never fails a request; entries expire after the TTL either way.
+    
+    An invalidated record is replaced by a tombstone rather than deleted, so
+    a read that loaded the old version before the write cannot put it back
+    (stores only add missing keys). The tombstone lasts stale_window seconds:
+    with read replicas the replica lag limit plus one lag check, otherwise
+    MIN_TOMBSTONE_SECONDS.
+    """
+    
+    def __init__(
+        self,
+        backend=None,
+        ttl: int = settings.READ_CACHE_TTL_SECONDS,
+        prefix: str = "read:v1",
+        stale_window: int = math.ceil(
+            settings.DB_REPLICA_MAX_LAG_SECONDS + settings.DB_REPLICA_LAG_CHECK_SECONDS
+        ) if settings.DATABASE_REPLICA_URLS else MIN_TOMBSTONE_SECONDS
+    ):
+        self._backend = backend
+        self._backend_created = backend is not None
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stale_window = max(stale_window, MIN_TOMBSTONE_SECONDS)
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def backend(self):
+        """Backend in use, created from settings on first access"""
+        if not self._backend_created:
+            self._backend = create_backend()
+            self._backend_created = True
+        return self._backend
+    
+    @backend.setter
+    def backend(self, backend) -> None:
+        self._backend = backend
+        self._backend_created = True
+    
+    def _key(self, resource_type: str, resource_id: UUID) -> str:
+        return f"{self.prefix}:{resource_type}:{resource_id}"
+    
+    def get(self, resource_type: str, resource_id: UUID, schema: Type[Model]) -> Optional[Model]:
+        """Get a cached record as an instance of schema"""
+        if self.backend is None:
+            return None
+        try:
+            raw = off_loop(self.backend.get, self._key(resource_type, resource_id))
+        except Exception:
+            logger.warning("Read cache lookup failed for %s %s", resource_type, resource_id, exc_info=True)
+            raw = None
+        
+        if raw is None or raw == TOMBSTONE:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return schema.model_validate_json(raw)
+    
+    def set(self, resource_type: str, resource_id: UUID, value: BaseModel) -> None:
+        """Cache a record's serialized response"""
+        if self.backend is None:
+            return
+        try:
+            off_loop(self.backend.add, self._key(resource_type, resource_id), value.model_dump_json().encode(), self.ttl)
+        except Exception:
+            logger.warning("Read cache store failed for %s %s", resource_type, resource_id, exc_info=True)
+    
+    def invalidate(self, resource_type: str, *resource_ids: UUID) -> None:
+        """Drop cached records after they were written"""
+        if self.backend is None or not resource_ids:
+            return
+        keys = [self._key(resource_type, resource_id) for resource_id in resource_ids]
+        try:
+            off_loop(self._tombstone, keys)
+        except Exception:
+            logger.error("Read cache invalidation failed for %s %s", resource_type, resource_ids, exc_info=True)
+    
+    def _tombstone(self, keys: list) -> None:
+        for key in keys:
+            self.backend.set(key, TOMBSTONE, self.stale_window)
+    
+    def stats(self) -> dict:
+        """Get hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+read_cache = ReadCache()
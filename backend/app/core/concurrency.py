@@ -0,0 +1,27 @@
+"""Blocking calls from handlers that may run on the event loop
+
+In async mode sync handlers run inside ``AsyncSession.run_sync``, on the
+event loop thread (see ``app.api.async_routes``). Network and file I/O they
+do outside the database, such as the Redis read cache or the audit spool,
+would stall every other request meanwhile, so it goes through ``off_loop``.
+"""
+import asyncio
+import functools
+from typing import Callable, TypeVar
+from sqlalchemy.util import await_only
+
+Result = TypeVar("Result")
+
+
+def off_loop(function: Callable[..., Result], *args, **kwargs) -> Result:
+    """Call a blocking function, in the default executor when on the event loop
+    
+    Called from a worker thread, as in sync mode, the function runs right
+    away. On the loop thread the caller must be inside ``run_sync``, whose
+    greenlet waits for the executor without blocking the loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return function(*args, **kwargs)
+    return await_only(loop.run_in_executor(None, functools.partial(function, *args, **kwargs)))
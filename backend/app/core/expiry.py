@@ -0,0 +1,126 @@
+"""Prescription expiry sweeper
+
+Moves active prescriptions whose expiry_date has passed to EXPIRED. Each
+batch is one ``UPDATE ... WHERE id IN (SELECT ... LIMIT n)`` committed on its
+own, so row locks are held for one batch at a time; on PostgreSQL the
+selection skips rows another transaction holds, so sweepers running in
+several workers never wait on each other or on a pharmacist dispensing.
+Every batch writes one summarized audit event and drops the expired
+prescriptions from the read cache.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.audit import log_audit
+from app.core.cache import read_cache
+from app.core.metrics import PRESCRIPTION_EXPIRY_SECONDS, PRESCRIPTIONS_EXPIRED
+from app.models.audit_log import AuditAction
+from app.models.prescription import Prescription, PrescriptionStatus
+
+logger = logging.getLogger(__name__)
+
+
+def expire_batch(db: Session, now: datetime, batch_size: int) -> list:
+    """Expire up to batch_size prescriptions past their expiry date and return their ids"""
+    overdue = (
+        select(Prescription.id)
+        .where(Prescription.status == PrescriptionStatus.ACTIVE, Prescription.expiry_date < now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    ids = db.execute(
+        update(Prescription)
+        .where(Prescription.id.in_(overdue))
+        .values(status=PrescriptionStatus.EXPIRED, updated_at=now)
+        .returning(Prescription.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return ids
+
+
+class PrescriptionExpirySweeper:
+    """Background worker expiring overdue prescriptions every interval"""
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        interval: float = settings.PRESCRIPTION_EXPIRY_INTERVAL_SECONDS,
+        batch_size: int = settings.PRESCRIPTION_EXPIRY_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background worker is sweeping"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start sweeping, first right away and then every interval"""
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="prescription-expiry", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background worker once its current batch commits"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self._stopping.clear()
+    
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Expire every prescription overdue at now, batch by batch, and return how many"""
+        factory = self.session_factory
+        if factory is None:
+            from app.db.session import SessionLocal
+            factory = SessionLocal
+        
+        now = now or datetime.utcnow()
+        expired = 0
+        db = factory()
+        try:
+            with PRESCRIPTION_EXPIRY_SECONDS.time():
+                while not self._stopping.is_set():
+                    ids = expire_batch(db, now, self.batch_size)
+                    if not ids:
+                        break
+                    expired += len(ids)
+                    PRESCRIPTIONS_EXPIRED.inc(len(ids))
+                    read_cache.invalidate("prescription", *ids)
+                    log_audit(
+                        db=db,
+                        user_id=None,
+                        action=AuditAction.UPDATE,
+                        resource_type="prescription",
+                        description=f"Expired {len(ids)} prescriptions past their expiry date as of {now.isoformat()}"
+                    )
+                    if len(ids) < self.batch_size:
+                        break
+        finally:
+            db.close()
+        return expired
+    
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                expired = self.sweep()
+                if expired:
+                    logger.info("Expired %d prescriptions", expired)
+            except Exception:
+                logger.exception("Prescription expiry sweep failed")
+            self._stopping.wait(self.interval)
+
+
+prescription_expiry = PrescriptionExpirySweeper()
@@ -0,0 +1,91 @@
+"""Streaming bulk export utilities"""
+import csv
+import io
+import json
+from enum import Enum
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from uuid import UUID
+from datetime import datetime
+from app.db.session import engine
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    """Export formats"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _encode_value(value):
+    """Convert a column value into a JSON/CSV friendly scalar"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _encode_ndjson(rows, fields: list) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, map(_encode_value, row)))) + "\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows, fields: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        ["" if value is None else _encode_value(value) for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def stream_rows(bind, statement: Select, fields: list, export_format: ExportFormat):
+    """Yield encoded chunks of a column select, one server-side batch at a time"""
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(fields)
+        yield buffer.getvalue()
+    
+    encode = _encode_csv if export_format == ExportFormat.CSV else _encode_ndjson
+    
+    with Session(bind=bind) as session:
+        result = session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield encode(batch, fields)
+
+
+def export_response(
+    db: Session,
+    statement: Select,
+    fields: list,
+    export_format: ExportFormat,
+    filename: str
+) -> StreamingResponse:
+    """Build a streaming response for an export
+    
+    Rows are read on a session of their own because the stream outlives the
+    request's session.
+    """
+    bind = db.get_bind()
+    if bind.dialect.is_async:
+        # Async mode sessions cannot be used outside the handler's greenlet
+        bind = engine
+    
+    return StreamingResponse(
+        stream_rows(bind, statement, fields, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
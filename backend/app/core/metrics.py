@@ -0,0 +1,176 @@
+"""Request metrics and slow-request log
+
+``MetricsMiddleware`` records, per route, each request's latency, response
+size, database queries and database time (counted by cursor events on the
+instrumented engines) and time spent writing audit events. ``/metrics``
+serves them in the Prometheus text format; under gunicorn the workers share
+them through PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py).
+
+Requests slower than SLOW_REQUEST_SECONDS are logged with the SQL they ran.
+Statement parameters are never logged since they carry patient data.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Route label of requests no route matched, so unknown paths cannot inflate label sets
+UNMATCHED_ROUTE = "unmatched"
+
+# Statements kept per request for the slow-request log
+MAX_LOGGED_STATEMENTS = 50
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency", ["method", "route", "status"]
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries run by a request", ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds", "Time a request spent in database queries", ["method", "route"]
+)
+REQUEST_AUDIT_SECONDS = Histogram(
+    "http_request_audit_duration_seconds", "Time a request spent writing or queueing audit events",
+    ["method", "route"]
+)
+AUDIT_BATCH_SECONDS = Histogram(
+    "audit_batch_write_duration_seconds", "Time the background audit writer spent inserting a batch"
+)
+PRESCRIPTION_EXPIRY_SECONDS = Histogram(
+    "prescription_expiry_run_duration_seconds", "Time a prescription expiry sweep took",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+PRESCRIPTIONS_EXPIRED = Counter(
+    "prescriptions_expired", "Prescriptions moved to expired by the expiry sweeper"
+)
+
+
+@dataclass
+class RequestStats:
+    """Work done while handling one request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    audit_seconds: float = 0.0
+    statements: list = field(default_factory=list)
+    
+    def record_query(self, statement: str, seconds: float) -> None:
+        """Count a query, keeping its statement for the slow-request log"""
+        self.queries += 1
+        self.db_seconds += seconds
+        if len(self.statements) < MAX_LOGGED_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+
+# Stats of the request being handled; copied into the threads running sync handlers
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count an engine's queries towards the current request"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        if stats is not None:
+            stats.record_query(statement, time.perf_counter() - context._metrics_started)
+
+
+@contextmanager
+def audit_timer():
+    """Count the time spent in the block as the current request's audit time"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = request_stats.get()
+        if stats is not None:
+            stats.audit_seconds += time.perf_counter() - started
+
+
+def render_metrics() -> bytes:
+    """Get the metrics of this process, or of every worker under gunicorn"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request metrics and logging slow requests"""
+    
+    def __init__(self, app, slow_request_seconds: float = settings.SLOW_REQUEST_SECONDS):
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+        self._route_paths: Optional[dict] = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        response = {"status": 500, "size": 0}
+        
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_stats.reset(token)
+            self.record(scope, response["status"], response["size"], elapsed, stats)
+    
+    def route_path(self, scope) -> str:
+        """Get the path template of the route that handled a request"""
+        if self._route_paths is None and "app" in scope:
+            self._route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return (self._route_paths or {}).get(scope.get("endpoint"), UNMATCHED_ROUTE)
+    
+    def record(self, scope, status: int, size: int, elapsed: float, stats: RequestStats) -> None:
+        """Record a finished request and log it if slow"""
+        method, route = scope["method"], self.route_path(scope)
+        REQUEST_SECONDS.labels(method, route, str(status)).observe(elapsed)
+        RESPONSE_BYTES.labels(method, route).observe(size)
+        REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+        REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+        REQUEST_AUDIT_SECONDS.labels(method, route).observe(stats.audit_seconds)
+        
+        if elapsed >= self.slow_request_seconds:
+            statements = "".join(
+                f"\n  {seconds * 1000:8.1f} ms  {' '.join(statement.split())}"
+                for statement, seconds in stats.statements
+            )
+            if stats.queries > len(stats.statements):
+                statements += f"\n  ... {stats.queries - len(stats.statements)} more"
+            logger.warning(
+                "Slow request %s %s -> %d in %.1f ms: %d queries in %.1f ms, audit %.1f ms, %d bytes%s",
+                method, scope["path"], status, elapsed * 1000, stats.queries, stats.db_seconds * 1000,
+                stats.audit_seconds * 1000, size, statements
+            )
@@ -0,0 +1,79 @@
+"""Keyset pagination utilities"""
+import base64
+import json
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from uuid import UUID
+from typing import Optional
+from datetime import datetime
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Set on results that cannot be paged when more rows matched than were returned
+TRUNCATED_HEADER = "X-Truncated"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps([sort_value.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode an opaque cursor back into its (sort value, id) key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False
+) -> Query:
+    """Order by (sort column, id) and apply keyset or offset pagination
+    
+    With a cursor the page starts strictly after the cursor's key and ``skip``
+    is ignored; without one the legacy offset is applied.
+    """
+    key = tuple_(sort_column, id_column)
+    
+    if cursor:
+        after = decode_cursor(cursor)
+        query = query.filter(key < after if descending else key > after)
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    
+    if not cursor:
+        query = query.offset(skip)
+    
+    return query.limit(limit)
+
+
+def next_cursor(items: list, limit: int, sort_attr: str = "created_at") -> Optional[str]:
+    """Get the cursor for the page after items, or None on the last page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
+
+
+def set_next_cursor(response, items: list, limit: int, sort_attr: str = "created_at") -> None:
+    """Expose the next page's cursor on the response when there is one"""
+    cursor = next_cursor(items, limit, sort_attr)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,10 +1,26 @@
-"""Permission and authorization utilities"""
+"""Permission and authorization utilities
+
+Each permission owns one bit and each role's permissions are folded into an
+integer mask once at import, so checking a permission is a single ``&``.
+A role permission applies to every record; handlers additionally let users
+act on their own records: their user and patient record, and the
+consultations and prescriptions they wrote while they may still write them.
+"""
 from enum import Enum
+from functools import reduce
+from operator import or_
 from app.models.user import UserRole
 
 
 class Permission(str, Enum):
     """Permissions"""
+    
+    def __new__(cls, value: str):
+        member = str.__new__(cls, value)
+        member._value_ = value
+        member.bit = 1 << len(cls.__members__)
+        return member
+    
     # User permissions
     CREATE_USER = "create_user"
     READ_USER = "read_user"
@@ -32,68 +48,58 @@ class Permission(str, Enum):
     
     # Audit permissions
     READ_AUDIT_LOG = "read_audit_log"
+    
+    # Bits follow declaration order and are carried by issued tokens, so new
+    # permissions go at the end
+    LIST_PATIENTS = "list_patients"
+    EXPORT_RECORDS = "export_records"
 
 
 # Role-based permissions mapping
 ROLE_PERMISSIONS = {
-    UserRole.ADMIN: [
-        Permission.CREATE_USER,
-        Permission.READ_USER,
-        Permission.UPDATE_USER,
-        Permission.DELETE_USER,
-        Permission.CREATE_PATIENT,
-        Permission.READ_PATIENT,
-        Permission.UPDATE_PATIENT,
-        Permission.DELETE_PATIENT,
-        Permission.CREATE_CONSULTATION,
-        Permission.READ_CONSULTATION,
-        Permission.UPDATE_CONSULTATION,
-        Permission.DELETE_CONSULTATION,
-        Permission.CREATE_PRESCRIPTION,
-        Permission.READ_PRESCRIPTION,
-        Permission.UPDATE_PRESCRIPTION,
-        Permission.DELETE_PRESCRIPTION,
-        Permission.DISPENSE_PRESCRIPTION,
-        Permission.READ_AUDIT_LOG,
-    ],
+    UserRole.ADMIN: list(Permission),
     UserRole.DOCTOR: [
-        Permission.READ_USER,
         Permission.READ_PATIENT,
         Permission.UPDATE_PATIENT,
+        Permission.DELETE_PATIENT,
+        Permission.LIST_PATIENTS,
         Permission.CREATE_CONSULTATION,
-        Permission.READ_CONSULTATION,
-        Permission.UPDATE_CONSULTATION,
         Permission.CREATE_PRESCRIPTION,
-        Permission.READ_PRESCRIPTION,
-        Permission.UPDATE_PRESCRIPTION,
     ],
     UserRole.NURSE: [
         Permission.READ_PATIENT,
-        Permission.UPDATE_PATIENT,
-        Permission.READ_CONSULTATION,
-        Permission.UPDATE_CONSULTATION,
-        Permission.READ_PRESCRIPTION,
     ],
     UserRole.PHARMACIST: [
-        Permission.READ_PATIENT,
         Permission.READ_PRESCRIPTION,
-        Permission.UPDATE_PRESCRIPTION,
         Permission.DISPENSE_PRESCRIPTION,
     ],
-    UserRole.PATIENT: [
-        Permission.READ_USER,
-        Permission.UPDATE_USER,
-        Permission.READ_PATIENT,
-        Permission.UPDATE_PATIENT,
-        Permission.READ_CONSULTATION,
-        Permission.READ_PRESCRIPTION,
-    ],
+    UserRole.PATIENT: [],
 }
 
+PERMISSION_BITS = {permission: permission.bit for permission in Permission}
+
+
+def permission_mask(*permissions: Permission) -> int:
+    """Combine permissions into a mask"""
+    return reduce(or_, (permission.bit for permission in permissions), 0)
+
+
+ROLE_MASKS = {role: permission_mask(*permissions) for role, permissions in ROLE_PERMISSIONS.items()}
+
+
+def role_mask(role: UserRole) -> int:
+    """Get the permission mask of a role"""
+    return ROLE_MASKS.get(role, 0)
+
+
+def permissions_from_mask(mask: int) -> list:
+    """Get the permissions set in a mask"""
+    return [permission for permission, bit in PERMISSION_BITS.items() if mask & bit]
+
 
 def has_permission(role: UserRole, permission: Permission) -> bool:
     """Check if a role has a specific permission"""
-    return permission in ROLE_PERMISSIONS.get(role, [])
+    return ROLE_MASKS.get(role, 0) & permission.bit != 0
 
 
 def get_role_permissions(role: UserRole) -> list:
@@ -0,0 +1,154 @@
+"""Authenticated principal cache"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+from typing import Optional
+from app.config import settings
+from app.core.cache import create_backend
+from app.core.permissions import Permission, role_mask
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user"""
+    id: UUID
+    email: str
+    role: UserRole
+    is_active: bool
+    permissions: int = 0
+    
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build a principal from a user row"""
+        return cls(
+            id=user.id, email=user.email, role=user.role, is_active=user.is_active,
+            permissions=role_mask(user.role)
+        )
+    
+    def can(self, permission: Permission) -> bool:
+        """Check if the user holds a permission"""
+        return self.permissions & permission.bit != 0
+
+
+class PrincipalCache:
+    """Bounded TTL/LRU cache of principals keyed by token subject
+    
+    Invalidating a user also records the time in the shared backend for ttl
+    seconds, so every worker drops principals it cached before then. A hit
+    therefore costs one backend lookup; a backend error on lookup is logged
+    and treated as a miss, so the user is reloaded rather than trusted.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = settings.PRINCIPAL_CACHE_SIZE,
+        ttl: float = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        backend=None,
+        prefix: str = "principal-invalidated:v1"
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._backend = backend
+        self._backend_created = backend is not None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def backend(self):
+        """Shared backend, created from settings on first access; None keeps invalidations local"""
+        if not self._backend_created:
+            self._backend = (
+                create_backend("redis") if settings.PRINCIPAL_INVALIDATION_BACKEND == "redis" else None
+            )
+            self._backend_created = True
+        return self._backend
+    
+    @backend.setter
+    def backend(self, backend) -> None:
+        self._backend = backend
+        self._backend_created = True
+    
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        """Return the cached principal if present, not expired and not invalidated by any worker"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+        
+        if self._invalidated_since(user_id, entry[2]):
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    del self._entries[user_id]
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            if user_id in self._entries:
+                self._entries.move_to_end(user_id)
+            self.hits += 1
+        return entry[0]
+    
+    def set(self, principal: Principal) -> None:
+        """Cache a principal, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl, time.time())
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user's cached principal in this worker and every other one"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        
+        backend = self.backend
+        if backend is not None and self.ttl > 0:
+            try:
+                backend.set(self._key(user_id), repr(time.time()).encode(), math.ceil(self.ttl))
+            except Exception:
+                logger.warning("Could not share principal invalidation", exc_info=True)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+    
+    def _invalidated_since(self, user_id: UUID, cached_at: float) -> bool:
+        """Whether any worker invalidated the user at or after cached_at"""
+        backend = self.backend
+        if backend is None:
+            return False
+        try:
+            invalidated_at = backend.get(self._key(user_id))
+        except Exception:
+            logger.warning("Principal invalidation lookup failed", exc_info=True)
+            return True
+        return invalidated_at is not None and float(invalidated_at) >= cached_at
+    
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.prefix}:{user_id}"
+
+
+principal_cache = PrincipalCache()
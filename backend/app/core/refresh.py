@@ -0,0 +1,94 @@
+"""Rotating refresh tokens
+
+A refresh token is a random value given to the client once; only its SHA-256
+hash is stored. Refreshing marks the presented token used and issues the next
+one in its family, so each token works once. A used or revoked token coming
+back means it was copied: the whole family is revoked and the user has to log
+in again.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+
+
+class RefreshTokenInvalid(Exception):
+    """Raised when a refresh token is unknown, expired or revoked"""
+
+
+class RefreshTokenReused(RefreshTokenInvalid):
+    """Raised when a refresh token is presented again after being used or revoked"""
+    
+    def __init__(self, record: RefreshToken):
+        super().__init__("Refresh token reused")
+        self.record = record
+
+
+def hash_refresh_token(token: str) -> str:
+    """Get the stored form of a refresh token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: UUID, family_id: Optional[UUID] = None) -> tuple:
+    """Add a refresh token to the session, starting a new family unless one is given
+    
+    Returns the token value for the client and its family id; the caller
+    commits.
+    """
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or uuid.uuid4()
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token, family_id
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple:
+    """Use a refresh token and add its successor to the session
+    
+    Returns the used token's record and the successor's value. Raises
+    RefreshTokenReused, after committing the family's revocation, when the
+    token was already used or revoked, including by a concurrent refresh.
+    """
+    now = datetime.utcnow()
+    record = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+    
+    if record is None:
+        raise RefreshTokenInvalid("Invalid refresh token")
+    if record.used_at is None and record.revoked_at is None and record.expires_at <= now:
+        raise RefreshTokenInvalid("Refresh token expired")
+    
+    # Claim the token with a conditional update so only one refresh can use it
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == record.id, RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+        .values(used_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    
+    if not claimed:
+        revoke_refresh_family(db, record.family_id)
+        db.commit()
+        raise RefreshTokenReused(record)
+    
+    successor, _ = issue_refresh_token(db, record.user_id, record.family_id)
+    return record, successor
+
+
+def revoke_refresh_family(db: Session, family_id: UUID) -> int:
+    """Revoke every live token of a family; the caller commits"""
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
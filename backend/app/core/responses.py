@@ -0,0 +1,66 @@
+"""Fast JSON responses
+
+The app renders responses with orjson instead of the stdlib encoder. List
+handlers go further: they select only the columns of their response schema
+and encode the row tuples directly, skipping ORM hydration and response
+model validation.
+
+List and get endpoints accept ``?fields=a,b`` to return only some of their
+response schema's fields; list endpoints then select only those columns.
+"""
+from typing import Optional, Type
+import orjson
+from fastapi import HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """Build a dependency parsing ``?fields=`` into names of schema fields
+    
+    The dependency returns None (every field) when the parameter is absent.
+    """
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of {schema.__name__} fields to return"
+        )
+    ) -> Optional[list]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",")} - {""}
+        unknown = sorted(requested - set(schema.model_fields))
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+            )
+        return [name for name in schema.model_fields if name in requested]
+    
+    return dependency
+
+
+def schema_columns(model, schema: Type[BaseModel], fields: Optional[list] = None, required: tuple = ()) -> list:
+    """Get the model columns backing the requested fields of a response schema
+    
+    Columns in required (e.g. pagination keys) are selected after the
+    requested ones without being returned by rows_response.
+    """
+    names = list(fields or schema.model_fields)
+    names += [name for name in required if name not in names]
+    return [getattr(model, name) for name in names]
+
+
+def rows_response(rows: list, schema: Type[BaseModel], fields: Optional[list] = None) -> Response:
+    """Encode rows selected with schema_columns as a JSON array of objects"""
+    names = list(fields or schema.model_fields)
+    return Response(
+        orjson.dumps([dict(zip(names, row)) for row in rows]),
+        media_type="application/json"
+    )
+
+
+def fields_response(record: BaseModel, fields: Optional[list] = None):
+    """Return a record whole, or only its requested fields"""
+    if fields is None:
+        return record
+    return ORJSONResponse(record.model_dump(mode="json", include=set(fields)))
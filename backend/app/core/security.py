@@ -1,22 +1,128 @@
 """Security utilities"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
+from sqlalchemy.util.concurrency import await_only
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from app.config import settings
+from app.core.tokens import revoked_tokens, token_cache, token_digest
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing pool has no room for another call"""
+
+
+def _hash_in_worker(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHashingPool:
+    """Bounded worker pool that keeps bcrypt off the request threads
+    
+    At most ``workers + max_pending`` calls are admitted at once; further
+    calls fail fast with PasswordHashingBusy instead of queueing.
+    """
+    
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+        executor: str = settings.PASSWORD_HASH_EXECUTOR
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = executor
+        self._executor: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._stats = {
+            op: {"calls": 0, "rejected": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            for op in ("hash", "verify")
+        }
+    
+    def hash(self, password: str) -> str:
+        """Hash a password in the pool"""
+        return self._run("hash", _hash_in_worker, password)
+    
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the pool"""
+        return self._run("verify", _verify_in_worker, plain_password, hashed_password)
+    
+    def stats(self) -> dict:
+        """Get per-operation call counts and latency"""
+        with self._lock:
+            return {
+                op: {
+                    "calls": s["calls"],
+                    "rejected": s["rejected"],
+                    "avg_ms": round(s["total_seconds"] / s["calls"] * 1000, 2) if s["calls"] else 0.0,
+                    "max_ms": round(s["max_seconds"] * 1000, 2),
+                }
+                for op, s in self._stats.items()
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                executor_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+                self._executor = executor_class(max_workers=self.workers)
+            return self._executor
+    
+    def _run(self, op: str, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats[op]["rejected"] += 1
+            raise PasswordHashingBusy(f"Password {op} pool is saturated")
+        
+        start = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Request thread: block only this thread
+                return future.result()
+            # Handler body running on the event loop (async DB mode): yield to the loop
+            return await_only(asyncio.wrap_future(future))
+        finally:
+            self._slots.release()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats[op]
+                stats["calls"] += 1
+                stats["total_seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+
+password_pool = PasswordHashingPool()
+
+
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return password_pool.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -40,13 +146,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> Optional[dict]:
-    """Decode a JWT token"""
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        return payload
-    except JWTError:
+    """Decode a JWT token
+    
+    Claims of a token verified before are served from the token cache until
+    it expires. Revoked tokens decode to None.
+    """
+    digest = token_digest(token)
+    payload = token_cache.get(digest)
+    
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            return None
+        token_cache.set(digest, payload)
+    
+    if digest in revoked_tokens:
         return None
+    return payload
+
+
+def revoke_token(token: str) -> None:
+    """Revoke a token for the rest of its lifetime"""
+    payload = decode_token(token)
+    if payload is None or "exp" not in payload:
+        return
+    digest = token_digest(token)
+    revoked_tokens.revoke(digest, payload["exp"])
+    token_cache.invalidate(digest)
@@ -0,0 +1,136 @@
+"""Process and connection pool sizing for the production server
+
+``gunicorn.conf.py`` picks the worker count and exports it as
+``WEB_CONCURRENCY`` before the app is loaded, so every worker sizes its
+connection pool from the same numbers.
+"""
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.config import settings
+
+# Uvicorn's access log, written once per request
+ACCESS_LOGGER = "uvicorn.access"
+
+# Connections of the sync engine in DB_MODE=async, where only exports and background threads use it
+ASYNC_MODE_SYNC_CONNECTIONS = 2
+
+
+def cpu_count() -> int:
+    """Get the CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """Get the number of server workers
+    
+    Uses WEB_CONCURRENCY when set, otherwise 2 x CPUs + 1, capped so each
+    worker still gets at least two database connections from the budget.
+    """
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    return max(1, min(2 * cpu_count() + 1, settings.DB_CONNECTION_BUDGET // 2))
+
+
+def pool_limits(workers: Optional[int] = None) -> tuple:
+    """Get (pool_size, max_overflow) for one worker's engine
+    
+    Each worker's share of DB_CONNECTION_BUDGET is split into a third kept
+    open and the rest as overflow, so all workers together never exceed the
+    budget.
+    """
+    per_worker = max(1, settings.DB_CONNECTION_BUDGET // (workers or settings.WEB_CONCURRENCY or 1))
+    pool_size = max(1, per_worker // 3)
+    return pool_size, per_worker - pool_size
+
+
+def engine_pool_limits(workers: Optional[int] = None, mode: Optional[str] = None) -> tuple:
+    """Get (pool_size, max_overflow) for the sync engine and for the async engine
+    
+    The async engine's limits are None in sync mode. In async mode the
+    worker's share is split: the sync engine keeps ASYNC_MODE_SYNC_CONNECTIONS
+    of it and the async engine, which serves requests, gets the rest.
+    """
+    pool_size, max_overflow = pool_limits(workers)
+    if (mode or settings.DB_MODE) != "async":
+        return (pool_size, max_overflow), None
+    
+    per_worker = pool_size + max_overflow
+    sync_connections = max(1, min(ASYNC_MODE_SYNC_CONNECTIONS, per_worker // 2))
+    async_connections = max(1, per_worker - sync_connections)
+    async_pool_size = max(1, async_connections // 3)
+    return (1, sync_connections - 1), (async_pool_size, async_connections - async_pool_size)
+
+
+def sql_echo() -> bool:
+    """Whether to log SQL statements; never in production"""
+    return settings.DEBUG and settings.ENVIRONMENT != "production"
+
+
+def concurrency_report(workers: int) -> list:
+    """Describe the effective concurrency of the server"""
+    sync_limits, async_limits = engine_pool_limits(workers)
+    engines = [("sync", sync_limits)] + ([("async", async_limits)] if async_limits else [])
+    per_worker = sum(pool_size + max_overflow for _, (pool_size, max_overflow) in engines)
+    pools = ", ".join(
+        f"{name} pool {pool_size} + overflow {max_overflow}" for name, (pool_size, max_overflow) in engines
+    )
+    return [
+        f"workers: {workers} ({cpu_count()} CPUs available)",
+        f"database mode: {settings.DB_MODE}",
+        f"connections per worker: {per_worker} ({pools})",
+        f"connections total: {per_worker * workers} of budget {settings.DB_CONNECTION_BUDGET}",
+        f"password hashing: {settings.PASSWORD_HASH_WORKERS} {settings.PASSWORD_HASH_EXECUTOR} workers per server worker",
+        f"SQL echo: {'on' if sql_echo() else 'off'}, async access log: {'on' if settings.ACCESS_LOG_ASYNC else 'off'}",
+    ]
+
+
+class _RecordQueueHandler(QueueHandler):
+    """Queue records as they are; uvicorn's access formatter needs record.args"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class AsyncAccessLog:
+    """Move access log output off the request path
+    
+    The access logger's handlers are replaced by a queue; a listener thread
+    formats and writes the records.
+    """
+    
+    def __init__(self, logger_name: str = ACCESS_LOGGER):
+        self.logger = logging.getLogger(logger_name)
+        self._handlers: list = []
+        self._listener: Optional[QueueListener] = None
+    
+    def start(self) -> None:
+        """Route the logger through the queue"""
+        if self._listener is not None or not self.logger.handlers:
+            return
+        records = queue.SimpleQueue()
+        self._handlers = list(self.logger.handlers)
+        self._listener = QueueListener(records, *self._handlers, respect_handler_level=True)
+        for handler in self._handlers:
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(_RecordQueueHandler(records))
+        self._listener.start()
+    
+    def stop(self) -> None:
+        """Write out queued records and restore the original handlers"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        for handler in self._handlers:
+            self.logger.addHandler(handler)
+        self._handlers = []
+
+
+access_log = AsyncAccessLog()
@@ -0,0 +1,164 @@
+"""Verified token cache and revocation list
+
+Clients send the same access token with every request, so the claims of a
+verified token are kept (keyed by the token's SHA-256 digest) until the token
+expires and later requests skip the signature and claims checks. Logging out
+revokes the token's digest until the token would have expired; the
+revocation is shared by all workers through Redis.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+from app.core.cache import create_backend
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token: str) -> str:
+    """Get the digest identifying a token in the cache and revocation list"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Bounded LRU cache of verified claims keyed by token digest
+    
+    Entries are dropped once the token's ``exp`` has passed; tokens without
+    one are not cached.
+    """
+    
+    def __init__(self, maxsize: int = settings.TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, digest: str) -> Optional[dict]:
+        """Get a copy of a token's claims if cached and not expired"""
+        with self._lock:
+            claims = self._entries.get(digest)
+            if claims is None or claims["exp"] <= time.time():
+                if claims is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return dict(claims)
+    
+    def set(self, digest: str, claims: dict) -> None:
+        """Cache a verified token's claims, evicting the least recently used entry if full"""
+        if self.maxsize <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._entries[digest] = dict(claims)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, digest: str) -> None:
+        """Drop a token's cached claims"""
+        with self._lock:
+            self._entries.pop(digest, None)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class RevokedTokens:
+    """Digests of tokens revoked before they expire
+    
+    Revocations made by this process are also kept locally, so they hold even
+    while the shared backend is unavailable. A backend error on lookup is
+    logged and, by default, treated as revoked: a token revoked by another
+    worker is never accepted, at the cost of rejecting every token the local
+    list does not clear while the backend is down. With fail_open the token
+    is accepted instead, and revocations by other workers only take effect
+    once the backend is back or the token expires (ACCESS_TOKEN_EXPIRE_MINUTES).
+    """
+    
+    def __init__(
+        self,
+        backend=None,
+        prefix: str = "revoked:v1",
+        fail_open: bool = settings.TOKEN_REVOCATION_FAIL_OPEN
+    ):
+        self._backend = backend
+        self._backend_created = backend is not None
+        self.prefix = prefix
+        self.fail_open = fail_open
+        self._local: dict = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def backend(self):
+        """Shared backend, created from settings on first access; None keeps revocations local"""
+        if not self._backend_created:
+            self._backend = create_backend("redis") if settings.TOKEN_REVOCATION_BACKEND == "redis" else None
+            self._backend_created = True
+        return self._backend
+    
+    @backend.setter
+    def backend(self, backend) -> None:
+        self._backend = backend
+        self._backend_created = True
+    
+    def revoke(self, digest: str, expires_at: float) -> None:
+        """Revoke a token until expires_at, when it stops being valid anyway"""
+        now = time.time()
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._local = {key: exp for key, exp in self._local.items() if exp > now}
+            self._local[digest] = expires_at
+        
+        backend = self.backend
+        if backend is not None:
+            try:
+                backend.set(self._key(digest), b"1", math.ceil(expires_at - now))
+            except Exception:
+                logger.warning("Could not share token revocation", exc_info=True)
+    
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            expires_at = self._local.get(digest)
+        if expires_at is not None and expires_at > time.time():
+            return True
+        
+        backend = self.backend
+        if backend is None:
+            return False
+        try:
+            return backend.get(self._key(digest)) is not None
+        except Exception:
+            logger.warning(
+                "Token revocation lookup failed; %s the token", "accepting" if self.fail_open else "rejecting",
+                exc_info=True
+            )
+            return not self.fail_open
+    
+    def clear(self) -> None:
+        """Forget local revocations"""
+        with self._lock:
+            self._local.clear()
+    
+    def _key(self, digest: str) -> str:
+        return f"{self.prefix}:{digest}"
+
+
+token_cache = TokenCache()
+revoked_tokens = RevokedTokens()
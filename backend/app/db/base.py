@@ -2,3 +2,7 @@
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
+
+# Deferred group of unbounded text columns, loaded only when a handler asks
+# for them (see app.db.loading.WITH_TEXT)
+LARGE_TEXT = "text"
@@ -0,0 +1,50 @@
+"""Index builds for migrations that do not block writes
+
+A plain CREATE INDEX locks the table against writes until the index is
+built, which takes minutes on large tables. On PostgreSQL these helpers
+build and drop indexes CONCURRENTLY instead, outside the migration's
+transaction (what ran before them in the migration is committed first).
+An invalid index left by an interrupted concurrent build is dropped and
+rebuilt. Partitioned tables cannot be indexed concurrently and get a plain
+build; other databases build in the migration's transaction.
+"""
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def _is_partitioned(connection: Connection, table: str) -> bool:
+    kind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return kind == "p"
+
+
+def _is_invalid(connection: Connection, name: str) -> bool:
+    return bool(connection.execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar())
+
+
+def create_index_online(name: str, table: str, columns: list, **options) -> None:
+    """Create an index unless it exists, without blocking writes on PostgreSQL"""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or _is_partitioned(bind, table):
+        op.create_index(name, table, columns, if_not_exists=True, **options)
+        return
+    
+    with op.get_context().autocommit_block():
+        if _is_invalid(op.get_bind(), name):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True, **options)
+
+
+def drop_index_online(name: str, table: str) -> None:
+    """Drop an index if it exists, without blocking writes on PostgreSQL"""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or _is_partitioned(bind, table):
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,15 +1,82 @@
-"""Database initialization script"""
+"""Database initialization script
+
+Usage:
+    python -m app.db.init_db            # migrate to head and create default users
+    python -m app.db.init_db upgrade    # migrate to head only
+    python -m app.db.init_db check      # exit non-zero unless the schema is at head
+"""
+import argparse
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal, engine
-from app.db.base import Base
 from app.models.user import User, UserRole
 from app.core.security import hash_password
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revision matching the schema create_all used to build
+BASELINE_REVISION = "0001"
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema is not at the latest migration"""
+
+
+def alembic_config(connection=None) -> Config:
+    """Build the Alembic configuration, optionally bound to a connection"""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """Get the latest migration revision"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(bind: Engine = engine) -> Optional[str]:
+    """Get the revision the database is at, or None if it is not under migration control"""
+    with bind.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def upgrade_db(bind: Engine = engine, revision: str = "head") -> None:
+    """Migrate the database, adopting schemas previously built by create_all"""
+    with bind.connect() as connection:
+        tables = inspect(connection).get_table_names()
+        # Migrations manage their own transactions; some build indexes outside one
+        connection.commit()
+        config = alembic_config(connection)
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
+def check_schema_version(bind: Engine = engine) -> None:
+    """Raise SchemaVersionError unless the database is migrated to head"""
+    current, head = current_revision(bind), head_revision()
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current}, expected {head}; "
+            "run 'python -m app.db.init_db upgrade'"
+        )
+
 
 def init_db():
-    """Initialize database with tables and sample data"""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    """Migrate the database and create the default users"""
+    upgrade_db()
     
     db = SessionLocal()
     
@@ -87,5 +154,25 @@ def init_db():
         db.close()
 
 
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the database schema")
+    parser.add_argument("action", nargs="?", choices=["init", "upgrade", "check"], default="init")
+    args = parser.parse_args(argv)
+    
+    if args.action == "upgrade":
+        upgrade_db()
+        print(f"✅ Database schema at revision {head_revision()}")
+    elif args.action == "check":
+        try:
+            check_schema_version()
+        except SchemaVersionError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Database schema at revision {head_revision()}")
+    else:
+        init_db()
+    return 0
+
+
 if __name__ == "__main__":
-    init_db()
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Relationship loading strategies
+
+Handlers pass these options explicitly so each endpoint issues a known,
+bounded number of queries. The lazy-load guard turns any relationship access
+that was not loaded up front into an error, which tests enable to catch N+1
+regressions.
+
+Large text columns are deferred on the models; handlers that return whole
+records undefer them so the record still loads in one query.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session, joinedload, raiseload, selectinload, undefer_group
+from app.db.base import LARGE_TEXT
+from app.models.consultation import Consultation
+from app.models.patient import Patient
+from app.models.prescription import Prescription
+
+# Whole records, including their deferred text columns
+WITH_TEXT = (undefer_group(LARGE_TEXT),)
+
+# Access checks read the owning patient's user_id
+CONSULTATION_WITH_PATIENT = (joinedload(Consultation.patient), *WITH_TEXT)
+PRESCRIPTION_WITH_PATIENT = (joinedload(Prescription.patient), *WITH_TEXT)
+
+# Delete cascades walk the child collections
+PATIENT_FOR_DELETE = (
+    selectinload(Patient.consultations).selectinload(Consultation.prescriptions),
+    selectinload(Patient.prescriptions),
+)
+CONSULTATION_FOR_DELETE = (selectinload(Consultation.prescriptions),)
+
+
+def _within(column, since: Optional[datetime], until: Optional[datetime]) -> list:
+    criteria = []
+    if since:
+        criteria.append(column >= since)
+    if until:
+        criteria.append(column <= until)
+    return criteria
+
+
+def patient_chart_options(since: Optional[datetime] = None, until: Optional[datetime] = None) -> tuple:
+    """Load a patient's consultations and prescriptions, optionally within a date window
+    
+    Each collection is one extra SELECT ... IN query regardless of its size.
+    """
+    return (
+        *WITH_TEXT,
+        selectinload(
+            Patient.consultations.and_(*_within(Consultation.consultation_date, since, until))
+        ).undefer_group(LARGE_TEXT),
+        selectinload(
+            Patient.prescriptions.and_(*_within(Prescription.prescribed_date, since, until))
+        ).undefer_group(LARGE_TEXT),
+    )
+
+
+def refresh_with_text(db: Session, instance) -> None:
+    """Reload a committed record, deferred text columns included, in one query"""
+    db.refresh(instance, [attr.key for attr in inspect(instance).mapper.column_attrs])
+
+
+def _raise_on_lazy_load(execute_state: ORMExecuteState) -> None:
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+    ):
+        execute_state.statement = execute_state.statement.options(raiseload("*"))
+
+
+def enable_lazy_load_guard(session_factory) -> None:
+    """Make relationships that were not eagerly loaded raise instead of lazy loading"""
+    event.listen(session_factory, "do_orm_execute", _raise_on_lazy_load)
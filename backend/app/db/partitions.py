@@ -0,0 +1,324 @@
+"""Monthly range partitions of audit_logs
+
+On PostgreSQL audit_logs is partitioned by month on ``timestamp``
+(``audit_logs_YYYY_MM``). Writes touch one small partition and its indexes,
+vacuum works month by month, and queries bounded in time only scan the
+months they cover. Partitions are created AUDIT_PARTITION_MONTHS_AHEAD in
+advance when create_all or migration 0007 builds the table, and from then on
+by the maintenance worker. Should maintenance be off or behind, an insert
+finding no partition for its rows creates their months and retries (see
+``create_partitions_for``).
+
+Months older than AUDIT_RETENTION_MONTHS are detached concurrently, so audit
+writes continue meanwhile, copied to gzip-compressed CSV files in
+AUDIT_ARCHIVE_DIR and dropped. A partition detached by a run that failed
+before dropping it is archived by the next; a concurrent detach that was
+interrupted is finalized first. There is deliberately no DEFAULT partition:
+PostgreSQL cannot detach concurrently from a table that has one.
+
+Other databases keep a plain table and maintenance does nothing.
+
+Usage:
+    python -m app.db.partitions    # create upcoming partitions and archive expired ones
+"""
+import gzip
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Table, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = "audit_logs"
+
+# Rows written before the table was partitioned (see migration 0007)
+LEGACY_PARTITION = "audit_logs_legacy"
+
+_PARTITION_NAME = re.compile(r"audit_logs_(\d{4}_\d{2}|legacy)$")
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+# Advisory lock key held while one worker maintains the partitions
+MAINTENANCE_LOCK = 0x41554454
+
+# SQLSTATE of an insert no partition accepts (check_violation)
+_NO_PARTITION = "23514"
+
+
+def month_start(moment: datetime) -> datetime:
+    """Get the start of the month a moment falls in"""
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Move the start of a month by a number of months"""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Get the name of the partition holding a month"""
+    return f"{AUDIT_TABLE}_{month:%Y_%m}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether audit_logs is a partitioned PostgreSQL table"""
+    if connection.dialect.name != "postgresql":
+        return False
+    kind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": AUDIT_TABLE}
+    ).scalar()
+    return kind == "p"
+
+
+def partitions(connection: Connection) -> list:
+    """Get (name, upper bound) of every attached partition, oldest first
+    
+    The upper bound is exclusive; None means the partition has none.
+    """
+    rows = connection.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": AUDIT_TABLE}).all()
+    
+    bounds = []
+    for name, bound in rows:
+        upper = _UPPER_BOUND.search(bound)
+        bounds.append((name, datetime.fromisoformat(upper.group(1)) if upper else None))
+    return sorted(bounds, key=lambda partition: partition[1] or datetime.max)
+
+
+def pending_detaches(connection: Connection) -> list:
+    """Get the names of partitions whose concurrent detach was interrupted"""
+    return list(connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) AND i.inhdetachpending"
+    ), {"table": AUDIT_TABLE}).scalars())
+
+
+def detached_partitions(connection: Connection) -> list:
+    """Get the names of audit partitions detached but not yet dropped"""
+    names = connection.execute(text(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition "
+        "AND relnamespace = to_regnamespace(current_schema()) AND relname LIKE 'audit_logs_%'"
+    )).scalars()
+    return sorted(name for name in names if _PARTITION_NAME.match(name))
+
+
+def ensure_partitions(
+    connection: Connection,
+    now: Optional[datetime] = None,
+    months_ahead: int = settings.AUDIT_PARTITION_MONTHS_AHEAD
+) -> list:
+    """Create the partitions from the current month to months_ahead and return their names"""
+    if not is_partitioned(connection):
+        return []
+    
+    covered_until = max((upper for _, upper in partitions(connection) if upper), default=datetime.min)
+    month = month_start(now or datetime.utcnow())
+    months = [add_months(month, offset) for offset in range(months_ahead + 1)]
+    return create_month_partitions(connection, [start for start in months if start >= covered_until])
+
+
+def create_month_partitions(connection: Connection, months: list) -> list:
+    """Create the partitions of months (month starts) unless they exist and return their names"""
+    names = []
+    for start in sorted(set(months)):
+        name = partition_name(start)
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AUDIT_TABLE} "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{add_months(start, 1):%Y-%m-%d}')"
+        ))
+        names.append(name)
+    return names
+
+
+def is_missing_partition(error: Exception) -> bool:
+    """Whether an insert failed because no audit partition covers a row's timestamp"""
+    orig = getattr(error, "orig", None)
+    return (
+        isinstance(error, IntegrityError)
+        and getattr(orig, "pgcode", None) == _NO_PARTITION
+        and "no partition of relation" in str(orig)
+    )
+
+
+def create_partitions_for(engine: Engine, moments: list) -> list:
+    """Create the partitions holding moments, after an insert found none for them
+    
+    Runs on a connection of its own so the failed insert's session can retry
+    right after. A concurrent creation by another worker is logged and left
+    to the retry.
+    """
+    months = {month_start(moment) for moment in moments}
+    with engine.connect() as connection:
+        try:
+            created = create_month_partitions(connection, months)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            logger.warning("Could not create audit partitions for %s", sorted(months), exc_info=True)
+            return []
+    logger.warning("Created missing audit partitions %s; is partition maintenance running?", created)
+    return created
+
+
+def archive_partition(connection: Connection, name: str, archive_dir: str) -> str:
+    """Copy a detached partition to a gzip-compressed CSV file, drop it and return the file's path"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        with gzip.open(partial, "wb") as archive:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+        rows = cursor.rowcount
+    finally:
+        cursor.close()
+    with open(partial, "rb") as archive:
+        os.fsync(archive.fileno())
+    os.replace(partial, path)
+    
+    connection.execute(text(f"DROP TABLE {name}"))
+    connection.commit()
+    logger.info("Archived %d audit events of %s to %s", rows, name, path)
+    return path
+
+
+def archive_expired_partitions(
+    connection: Connection,
+    now: Optional[datetime] = None,
+    retention_months: int = settings.AUDIT_RETENTION_MONTHS,
+    archive_dir: str = settings.AUDIT_ARCHIVE_DIR
+) -> list:
+    """Detach, archive and drop the partitions older than the retention period
+    
+    Returns the archive paths. A retention of 0 keeps every partition.
+    """
+    if retention_months <= 0 or not is_partitioned(connection):
+        return []
+    
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    for name in pending_detaches(connection):
+        _detach_outside_transaction(connection, f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {name} FINALIZE")
+    for name, upper in partitions(connection):
+        if upper is not None and upper <= cutoff:
+            _detach_outside_transaction(connection, f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {name} CONCURRENTLY")
+    
+    return [archive_partition(connection, name, archive_dir) for name in detached_partitions(connection)]
+
+
+def _detach_outside_transaction(connection: Connection, statement: str) -> None:
+    """Run a DETACH that PostgreSQL refuses inside a transaction block
+    
+    A concurrent detach only locks out writes briefly at its start and end
+    instead of holding an ACCESS EXCLUSIVE lock on audit_logs throughout.
+    """
+    connection.commit()
+    isolation_level = connection.get_isolation_level()
+    connection.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        connection.execute(text(statement))
+        connection.commit()
+    finally:
+        connection.execution_options(isolation_level=isolation_level)
+
+
+def maintain_partitions(engine: Engine, now: Optional[datetime] = None) -> tuple:
+    """Create upcoming partitions and archive expired ones, unless another worker is doing it
+    
+    Returns the created partition names and the archive paths.
+    """
+    if engine.dialect.name != "postgresql":
+        return [], []
+    
+    with engine.connect() as connection:
+        locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK}).scalar()
+        connection.commit()
+        if not locked:
+            return [], []
+        try:
+            created = ensure_partitions(connection, now)
+            connection.commit()
+            archived = archive_expired_partitions(connection, now)
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK})
+            connection.commit()
+    return created, archived
+
+
+def add_partitions(table: Table) -> None:
+    """Create the first partitions whenever create_all creates the audit table"""
+    @event.listens_for(table, "after_create")
+    def create_partitions(target, connection, **kw):
+        ensure_partitions(connection)
+
+
+class PartitionMaintainer:
+    """Background worker running maintain_partitions every interval"""
+    
+    def __init__(self, engine: Optional[Engine] = None, interval: float = settings.AUDIT_PARTITION_CHECK_SECONDS):
+        self.engine = engine
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the background worker is running"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start maintaining, first right away and then every interval"""
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-partitions", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background worker once its current run finishes"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self._stopping.clear()
+    
+    def run(self) -> tuple:
+        """Maintain the partitions once"""
+        engine = self.engine
+        if engine is None:
+            from app.db.session import engine
+        return maintain_partitions(engine)
+    
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                created, archived = self.run()
+                if created or archived:
+                    logger.info("Created audit partitions %s, archived %s", created, archived)
+            except Exception:
+                logger.exception("Audit partition maintenance failed")
+            self._stopping.wait(self.interval)
+
+
+partition_maintainer = PartitionMaintainer()
+
+
+def main():
+    from app.db.session import engine
+    created, archived = maintain_partitions(engine)
+    print(f"Created partitions: {', '.join(created) or 'none'}")
+    print(f"Archived: {', '.join(archived) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Read replica routing
+
+Read-only handlers get a ``ReplicaSession`` whose queries go to a replica
+chosen by the ``ReplicaRouter``; anything it writes (audit rows without the
+background writer) still goes to the primary. A replica is skipped while its
+replication lag exceeds the threshold, and a user whose own write may not have
+reached a replica yet is served by the primary instead.
+"""
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from app.config import settings
+from app.core.cache import MemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("round_robin", "least_connections")
+
+# Zero while the standby has replayed everything it received, so an idle
+# primary does not read as lag
+PG_REPLICATION_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replication_lag(engine: Engine) -> float:
+    """Get how many seconds a replica is behind its primary"""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as connection:
+        return float(connection.execute(PG_REPLICATION_LAG).scalar() or 0.0)
+
+
+class ReplicaSession(Session):
+    """Session that reads from its replica and writes to the primary
+    
+    Once the session has flushed, later reads go to the primary as well so it
+    sees its own writes.
+    """
+    
+    replica: Optional[Engine] = None
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.replica = None
+        if self.replica is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self.replica
+
+
+class ReplicaRouter:
+    """Pick the replica that serves a read, or None for the primary
+    
+    Lag is probed at most every lag_check_interval seconds per replica; a
+    failed probe takes the replica out of rotation until the next check.
+    A probe showing lag L at time T means the replica has everything
+    committed before T - L, so a user whose last write is later than that
+    reads from another replica or the primary. Users' write times are kept
+    in recent_writes (the read cache backend in production, so all workers
+    see them) only until every replica in rotation must have caught up.
+    """
+    
+    def __init__(
+        self,
+        replicas: list,
+        strategy: str = settings.DB_REPLICA_STRATEGY,
+        max_lag: float = settings.DB_REPLICA_MAX_LAG_SECONDS,
+        lag_check_interval: float = settings.DB_REPLICA_LAG_CHECK_SECONDS,
+        lag_probe=replication_lag,
+        recent_writes=None
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_probe = lag_probe
+        self.recent_writes = recent_writes or MemoryCacheBackend()
+        self.routed = Counter()
+        self._lag: dict = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+    
+    def lag(self, replica: Engine) -> tuple:
+        """Get a replica's (lag, checked_at) measurement, probing it when stale"""
+        now = time.time()
+        with self._lock:
+            measured = self._lag.get(replica)
+        if measured is not None and now - measured[1] < self.lag_check_interval:
+            return measured
+        
+        try:
+            lag = self.lag_probe(replica)
+        except Exception:
+            logger.warning("Replication lag check failed for %s", replica.url, exc_info=True)
+            lag = math.inf
+        with self._lock:
+            self._lag[replica] = (lag, now)
+        return lag, now
+    
+    def is_fresh(self, replica: Engine, written: Optional[float] = None) -> bool:
+        """Whether a replica is within the lag limit and has a write made at written"""
+        lag, checked_at = self.lag(replica)
+        return lag < self.max_lag and (written is None or checked_at - lag >= written)
+    
+    def record_write(self, user_id: UUID) -> None:
+        """Remember that a user just committed a write"""
+        ttl = math.ceil(self.max_lag + self.lag_check_interval)
+        try:
+            self.recent_writes.set(self._write_key(user_id), str(time.time()).encode(), ttl)
+        except Exception:
+            logger.warning("Could not record write for %s", user_id, exc_info=True)
+    
+    def last_write(self, user_id: UUID) -> Optional[float]:
+        """Get when a user last wrote, within the lag window"""
+        raw = self.recent_writes.get(self._write_key(user_id))
+        return float(raw) if raw is not None else None
+    
+    def choose(self, user_id: Optional[UUID] = None) -> Optional[Engine]:
+        """Get the replica to read from, or None to read from the primary"""
+        replica = self._choose(user_id) if self.replicas else None
+        self.routed["replica" if replica is not None else "primary"] += 1
+        return replica
+    
+    def _choose(self, user_id: Optional[UUID]) -> Optional[Engine]:
+        written = None
+        if user_id is not None:
+            try:
+                written = self.last_write(user_id)
+            except Exception:
+                logger.warning("Could not look up writes for %s, reading from primary", user_id, exc_info=True)
+                return None
+        
+        start = next(self._turn) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        candidates = [replica for replica in ordered if self.is_fresh(replica, written)]
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda replica: replica.pool.checkedout())
+        return candidates[0]
+    
+    def stats(self) -> dict:
+        """Get how many reads went to replicas and to the primary"""
+        return {"replica": self.routed["replica"], "primary": self.routed["primary"]}
+    
+    @staticmethod
+    def _write_key(user_id: UUID) -> str:
+        return f"rw:v1:{user_id}"
+
+
+def track_writes(router: ReplicaRouter) -> None:
+    """Record commits of sessions that carry the authenticated user's id
+    
+    ``get_current_user`` stores the id in ``session.info["principal_id"]``.
+    Nothing is recorded while the router has no replicas.
+    """
+    @event.listens_for(Session, "after_flush")
+    def after_flush(session, flush_context):
+        if router.replicas:
+            session.info["wrote"] = True
+    
+    @event.listens_for(Session, "after_commit")
+    def after_commit(session):
+        if session.info.pop("wrote", False) and "principal_id" in session.info:
+            router.record_write(session.info["principal_id"])
+    
+    @event.listens_for(Session, "after_soft_rollback")
+    def after_soft_rollback(session, previous_transaction):
+        session.info.pop("wrote", None)
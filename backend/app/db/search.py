@@ -0,0 +1,117 @@
+"""Full-text search over consultation clinical text
+
+On PostgreSQL the consultations table carries a generated, weighted
+``tsvector`` of the clinical text with a GIN index. SQLite (local and test
+runs) keeps an FTS5 table filled by triggers instead. Either way the database
+maintains the index on every insert and update, bulk writes included, so
+handlers never touch it.
+
+Neither object is declared on the model: ``add_search_index`` creates them
+after the consultations table when create_all builds it, migration 0004 adds
+them to existing databases, and ``include_object`` hides them from
+autogenerate.
+"""
+import re
+from sqlalchemy import DDL, Table, column, event, func, literal_column, table
+from sqlalchemy.orm import Query
+
+# Searched columns and their weights: diagnosis and complaint outrank the notes
+SEARCH_WEIGHTS = {
+    "diagnosis": "A",
+    "chief_complaint": "A",
+    "treatment_plan": "B",
+    "clinical_notes": "C",
+    "physical_examination": "C",
+}
+SEARCH_COLUMNS = tuple(SEARCH_WEIGHTS)
+
+# PostgreSQL
+TS_CONFIG = "english"
+SEARCH_VECTOR = "search_vector"
+SEARCH_INDEX = "ix_consultations_search_vector"
+
+# SQLite
+FTS_TABLE = "consultations_fts"
+FTS_TRIGGERS = ("consultations_fts_insert", "consultations_fts_update", "consultations_fts_delete")
+# bm25 weight per FTS5 column; consultation_id is not indexed
+FTS_BM25_WEIGHTS = (0.0,) + tuple({"A": 10.0, "B": 4.0, "C": 1.0}[weight] for weight in SEARCH_WEIGHTS.values())
+
+
+def postgresql_search_ddl() -> list:
+    """Statements adding the search vector and its index to consultations"""
+    vector = " || ".join(
+        f"setweight(to_tsvector('{TS_CONFIG}', coalesce({name}, '')), '{weight}')"
+        for name, weight in SEARCH_WEIGHTS.items()
+    )
+    return [
+        f"ALTER TABLE consultations ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR} tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON consultations USING GIN ({SEARCH_VECTOR})",
+    ]
+
+
+def sqlite_search_ddl() -> list:
+    """Statements creating the FTS5 table and the triggers keeping it in sync"""
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+    insert_new = f"INSERT INTO {FTS_TABLE} (consultation_id, {columns}) VALUES (new.id, {new_values});"
+    delete_old = f"DELETE FROM {FTS_TABLE} WHERE consultation_id = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"consultation_id UNINDEXED, {columns}, tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[0]} AFTER INSERT ON consultations "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[1]} AFTER UPDATE OF {columns} ON consultations "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[2]} AFTER DELETE ON consultations "
+        f"BEGIN {delete_old} END",
+    ]
+
+
+def sqlite_search_backfill() -> str:
+    """Statement indexing consultations written before the FTS5 table existed"""
+    columns = ", ".join(SEARCH_COLUMNS)
+    return f"INSERT INTO {FTS_TABLE} (consultation_id, {columns}) SELECT id, {columns} FROM consultations"
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Autogenerate filter hiding the search objects the models do not declare"""
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False
+    return name not in (SEARCH_VECTOR, SEARCH_INDEX)
+
+
+def add_search_index(consultations: Table) -> None:
+    """Create the search objects whenever create_all creates the consultations table"""
+    for statement in postgresql_search_ddl():
+        event.listen(consultations, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in sqlite_search_ddl():
+        event.listen(consultations, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def fts5_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching notes holding every word
+    
+    Each word is quoted so FTS5 operators and punctuation in the input are
+    searched for rather than parsed.
+    """
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def match_consultations(query: Query, dialect: str, text: str) -> tuple:
+    """Restrict a consultations query to notes matching text
+    
+    Returns the query and its rank expression, higher for better matches.
+    """
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), text)
+        vector = literal_column(f"consultations.{SEARCH_VECTOR}")
+        return query.filter(vector.op("@@")(ts_query)), func.ts_rank_cd(vector, ts_query)
+    
+    fts = table(FTS_TABLE, column("consultation_id"))
+    rank = -func.bm25(literal_column(FTS_TABLE), *FTS_BM25_WEIGHTS)
+    query = (
+        query.join(fts, fts.c.consultation_id == literal_column("consultations.id"))
+        .filter(literal_column(FTS_TABLE).op("MATCH")(fts5_query(text)))
+    )
+    return query, rank
@@ -1,18 +1,91 @@
 """Database session configuration"""
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from uuid import UUID
+from typing import Optional
 from app.config import settings
+from app.core.cache import create_backend
+from app.core.metrics import instrument_engine
+from app.core.server import engine_pool_limits, sql_echo
+from app.db.replicas import ReplicaRouter, ReplicaSession, track_writes
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Each worker's share of DB_CONNECTION_BUDGET, split with the async engine in async mode
+(pool_size, max_overflow), async_pool_limits = engine_pool_limits()
 
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=sql_echo(),
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=pool_size,
+    max_overflow=max_overflow
 )
 
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Replicas get the same pool limits: each is its own database server. They
+# serve sync mode only, so in async mode they keep the sync engine's small pool.
+replica_engines = [
+    create_engine(url, echo=sql_echo(), pool_pre_ping=True, pool_size=pool_size, max_overflow=max_overflow)
+    for url in settings.DATABASE_REPLICA_URLS
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+
+# Recent writes are shared through the read cache backend so every worker sees them
+replica_router = ReplicaRouter(replica_engines, recent_writes=create_backend() if replica_engines else None)
+track_writes(replica_router)
+
+ReadSessionLocal = sessionmaker(class_=ReplicaSession, autocommit=False, autoflush=False, bind=engine)
+
+if settings.DB_LAZY_LOAD_GUARD:
+    from app.db.loading import enable_lazy_load_guard
+    enable_lazy_load_guard(SessionLocal)
+    enable_lazy_load_guard(ReadSessionLocal)
+
+
+def get_async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_MODE == "async":
+    async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    
+    # aiosqlite runs without a connection pool
+    pool_options = {} if async_database_url.startswith("sqlite") else {
+        "pool_size": async_pool_limits[0],
+        "max_overflow": async_pool_limits[1]
+    }
+    
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=sql_echo(),
+        pool_pre_ping=True,
+        **pool_options
+    )
+    instrument_engine(async_engine.sync_engine)
+    
+    # Objects outlive the greenlet that loaded them, so keep them loaded after commit
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -21,3 +94,16 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def open_read_session(user_id: Optional[UUID] = None) -> ReplicaSession:
+    """Open a session that reads from a replica when one is fresh enough for user_id"""
+    db = ReadSessionLocal()
+    db.replica = replica_router.choose(user_id)
+    return db
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
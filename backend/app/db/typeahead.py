@@ -0,0 +1,54 @@
+"""Patient typeahead
+
+Front-desk lookups match the typed text against the patient's name and email
+anywhere in the value, and against phone and insurance numbers from their
+start. Each field is searched on its own so every branch uses its index
+(pg_trgm GIN indexes for names and emails, pattern btree indexes for
+numbers) and stops after ``limit`` matches; an OR across the joined tables
+would scan instead. The candidates are then sorted by name, names with a
+word starting with the text first.
+"""
+from sqlalchemy import case, or_, select, union
+from sqlalchemy.sql import Select
+from app.models.patient import Patient
+from app.models.user import User
+
+# Shortest text worth searching: pg_trgm cannot use its index below 3 characters
+MIN_QUERY_LENGTH = 3
+
+# LIKE escape character; a backslash would depend on standard_conforming_strings
+LIKE_ESCAPE = "/"
+
+
+def escape_like(text: str) -> str:
+    """Escape LIKE wildcards so the text matches literally"""
+    for character in (LIKE_ESCAPE, "%", "_"):
+        text = text.replace(character, LIKE_ESCAPE + character)
+    return text
+
+
+def patient_typeahead(columns: list, text: str, limit: int) -> Select:
+    """Select columns of up to limit patients matching text, best first"""
+    text = escape_like(text.strip())
+    contains, starts = f"%{text}%", f"{text}%"
+    with_user = select(Patient.id).join(User, User.id == Patient.user_id)
+    branches = [
+        with_user.where(User.full_name.ilike(contains, escape=LIKE_ESCAPE)),
+        with_user.where(User.email.ilike(contains, escape=LIKE_ESCAPE)),
+        with_user.where(User.phone.like(starts, escape=LIKE_ESCAPE)),
+        select(Patient.id).where(Patient.insurance_number.like(starts, escape=LIKE_ESCAPE)),
+    ]
+    candidates = union(*[select(branch.limit(limit).subquery().c.id) for branch in branches])
+    
+    word_start = or_(
+        User.full_name.ilike(starts, escape=LIKE_ESCAPE),
+        User.full_name.ilike(f"% {starts}", escape=LIKE_ESCAPE)
+    )
+    name_first = case((word_start, 0), else_=1)
+    return (
+        select(*columns)
+        .join(User, User.id == Patient.user_id)
+        .where(Patient.id.in_(candidates))
+        .order_by(name_first, User.full_name, Patient.id)
+        .limit(limit)
+    )
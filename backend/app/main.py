@@ -1,14 +1,45 @@
 """FastAPI application entry point"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from app.config import settings
-from app.api.v1 import auth, users, patients, consultations, prescriptions
-from app.db.base import Base
-from app.db.session import engine
+from app.api.v1 import audit, auth, users, patients, consultations, prescriptions
+from app.api.async_routes import asyncify_router
+from app.api.deps import get_read_db
+from app.core.audit import audit_writer
+from app.core.expiry import prescription_expiry
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER, TRUNCATED_HEADER, InvalidCursor
+from app.core.security import PasswordHashingBusy, password_pool
+from app.core.server import access_log
+from app.db.init_db import check_schema_version
+from app.db.partitions import partition_maintainer
+from app.db.session import get_db, get_async_db
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services"""
+    # Migrations run separately (python -m app.db.init_db); only confirm they did
+    if settings.DB_SCHEMA_CHECK:
+        check_schema_version()
+    if settings.AUDIT_ASYNC_ENABLED:
+        audit_writer.start()
+    if settings.ACCESS_LOG_ASYNC:
+        access_log.start()
+    if settings.PRESCRIPTION_EXPIRY_ENABLED:
+        prescription_expiry.start()
+    if settings.AUDIT_PARTITION_MAINTENANCE:
+        partition_maintainer.start()
+    yield
+    partition_maintainer.stop()
+    prescription_expiry.stop()
+    access_log.stop()
+    audit_writer.stop()
+    password_pool.shutdown()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -16,7 +47,9 @@ app = FastAPI(
     version=settings.PROJECT_VERSION,
     description="Secure medical records management platform",
     docs_url="/api/docs",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -26,8 +59,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TRUNCATED_HEADER],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Health check endpoint
 @app.get("/health")
@@ -36,12 +73,25 @@ async def health_check():
     return {"status": "healthy", "version": settings.PROJECT_VERSION}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics"""
+        return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 # API v1 routes
-app.include_router(auth.router, prefix=settings.API_V1_STR)
-app.include_router(users.router, prefix=settings.API_V1_STR)
-app.include_router(patients.router, prefix=settings.API_V1_STR)
-app.include_router(consultations.router, prefix=settings.API_V1_STR)
-app.include_router(prescriptions.router, prefix=settings.API_V1_STR)
+api_routers = [auth.router, users.router, patients.router, consultations.router, prescriptions.router, audit.router]
+
+if settings.DB_MODE == "async":
+    # Every request gets an AsyncSession and handlers run on the event loop;
+    # replica routing applies to sync mode only, so reads use the primary
+    app.dependency_overrides[get_db] = get_async_db
+    app.dependency_overrides[get_read_db] = get_async_db
+    api_routers = [asyncify_router(router) for router in api_routers]
+
+for router in api_routers:
+    app.include_router(router, prefix=settings.API_V1_STR)
 
 
 # Root endpoint
@@ -57,6 +107,25 @@ async def root():
 
 
 # Exception handlers
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request, exc):
+    """Shed login and registration load when the hashing pool is saturated"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request, exc):
+    """Reject malformed pagination cursors"""
+    return JSONResponse(
+        status_code=400,
+        content={"detail": str(exc)}
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
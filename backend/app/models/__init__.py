@@ -3,6 +3,7 @@ from app.models.user import User
 from app.models.patient import Patient
 from app.models.consultation import Consultation
 from app.models.prescription import Prescription
-from app.models.audit_log import AuditLog
+from app.models.audit_log import AuditLog, AuditDailyCount
+from app.models.refresh_token import RefreshToken
 
-__all__ = ["User", "Patient", "Consultation", "Prescription", "AuditLog"]
+__all__ = ["User", "Patient", "Consultation", "Prescription", "AuditLog", "AuditDailyCount", "RefreshToken"]
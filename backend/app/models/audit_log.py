@@ -1,11 +1,12 @@
 """Audit log model"""
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import BigInteger, Column, Date, Index, String, DateTime, Text, ForeignKey, Enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 from enum import Enum as PyEnum
 from app.db.base import Base
+from app.db.partitions import add_partitions
 
 
 class AuditAction(str, PyEnum):
@@ -23,6 +24,15 @@ class AuditAction(str, PyEnum):
 class AuditLog(Base):
     """Audit log model for tracking all actions"""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        # get_audit_logs filters, newest first
+        Index("ix_audit_logs_user_id_timestamp_id", "user_id", "timestamp", "id"),
+        Index("ix_audit_logs_resource_timestamp_id", "resource_type", "resource_id", "timestamp", "id"),
+        # Monthly range partitions on PostgreSQL (see app.db.partitions)
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
@@ -34,10 +44,40 @@ class AuditLog(Base):
     user_agent = Column(String(500), nullable=True)
     status = Column(String(20), default="success", nullable=False)  # success, failure
     error_message = Column(Text, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Part of the primary key because PostgreSQL partitions by it
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     
     def __repr__(self):
         return f"<AuditLog {self.id}>"
+
+
+add_partitions(AuditLog.__table__)
+
+
+# user_id of daily counts of events without a user, since key columns cannot be null
+NO_USER = uuid.UUID(int=0)
+
+
+class AuditDailyCount(Base):
+    """Number of audit events per day, user, action and resource type
+    
+    Kept up to date in the transaction inserting the events (see
+    app.core.audit.add_daily_counts), so audit statistics never scan
+    audit_logs. Counts outlive archived audit partitions.
+    """
+    __tablename__ = "audit_daily_counts"
+    __table_args__ = (
+        Index("ix_audit_daily_counts_user_id_day", "user_id", "day"),
+    )
+    
+    day = Column(Date, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)  # NO_USER for events without a user
+    action = Column(Enum(AuditAction), primary_key=True)
+    resource_type = Column(String(100), primary_key=True)
+    events = Column(BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f"<AuditDailyCount {self.day} {self.action}>"
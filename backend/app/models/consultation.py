@@ -1,11 +1,12 @@
 """Consultation model"""
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Index, String, DateTime, Text, ForeignKey, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 from enum import Enum as PyEnum
-from app.db.base import Base
+from app.db.base import Base, LARGE_TEXT
+from app.db.search import add_search_index
 
 
 class ConsultationStatus(str, PyEnum):
@@ -19,6 +20,13 @@ class ConsultationStatus(str, PyEnum):
 class Consultation(Base):
     """Consultation model"""
     __tablename__ = "consultations"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_consultations_created_at_id", "created_at", "id"),
+        # list_consultations?patient_id= in keyset order
+        Index("ix_consultations_patient_id_created_at_id", "patient_id", "created_at", "id"),
+        Index("ix_consultations_doctor_id", "doctor_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False)
@@ -26,12 +34,12 @@ class Consultation(Base):
     consultation_date = Column(DateTime, nullable=False)
     status = Column(Enum(ConsultationStatus), default=ConsultationStatus.SCHEDULED, nullable=False)
     reason = Column(String(500), nullable=True)
-    chief_complaint = Column(Text, nullable=True)
-    diagnosis = Column(Text, nullable=True)
-    clinical_notes = Column(Text, nullable=True)
-    vital_signs = Column(Text, nullable=True)  # JSON format
-    physical_examination = Column(Text, nullable=True)
-    treatment_plan = Column(Text, nullable=True)
+    chief_complaint = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    diagnosis = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    clinical_notes = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    vital_signs = deferred(Column(Text, nullable=True), group=LARGE_TEXT)  # JSON format
+    physical_examination = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    treatment_plan = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
     follow_up_date = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -43,3 +51,6 @@ class Consultation(Base):
     
     def __repr__(self):
         return f"<Consultation {self.id}>"
+
+
+add_search_index(Consultation.__table__)
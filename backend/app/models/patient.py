@@ -1,11 +1,11 @@
 """Patient model"""
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Index, String, DateTime, Text, ForeignKey, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 from enum import Enum as PyEnum
-from app.db.base import Base
+from app.db.base import Base, LARGE_TEXT
 
 
 class BloodType(str, PyEnum):
@@ -23,6 +23,13 @@ class BloodType(str, PyEnum):
 class Patient(Base):
     """Patient model"""
     __tablename__ = "patients"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_patients_created_at_id", "created_at", "id"),
+        # Patient typeahead: insurance numbers match by prefix
+        Index("ix_patients_insurance_number", "insurance_number",
+              postgresql_ops={"insurance_number": "varchar_pattern_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, unique=True)
@@ -35,9 +42,9 @@ class Patient(Base):
     country = Column(String(100), nullable=True)
     emergency_contact_name = Column(String(255), nullable=True)
     emergency_contact_phone = Column(String(20), nullable=True)
-    allergies = Column(Text, nullable=True)  # JSON or comma-separated
-    chronic_conditions = Column(Text, nullable=True)  # JSON or comma-separated
-    family_history = Column(Text, nullable=True)
+    allergies = deferred(Column(Text, nullable=True), group=LARGE_TEXT)  # JSON or comma-separated
+    chronic_conditions = deferred(Column(Text, nullable=True), group=LARGE_TEXT)  # JSON or comma-separated
+    family_history = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
     insurance_number = Column(String(100), nullable=True)
     insurance_provider = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -45,8 +52,18 @@ class Patient(Base):
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
-    consultations = relationship("Consultation", back_populates="patient", cascade="all, delete-orphan")
-    prescriptions = relationship("Prescription", back_populates="patient", cascade="all, delete-orphan")
+    consultations = relationship(
+        "Consultation",
+        back_populates="patient",
+        cascade="all, delete-orphan",
+        order_by="Consultation.consultation_date.desc()"
+    )
+    prescriptions = relationship(
+        "Prescription",
+        back_populates="patient",
+        cascade="all, delete-orphan",
+        order_by="Prescription.prescribed_date.desc()"
+    )
     
     def __repr__(self):
         return f"<Patient {self.id}>"
@@ -1,11 +1,11 @@
 """Prescription model"""
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Enum
+from sqlalchemy import Column, Index, String, DateTime, Text, ForeignKey, Integer, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 from enum import Enum as PyEnum
-from app.db.base import Base
+from app.db.base import Base, LARGE_TEXT
 
 
 class PrescriptionStatus(str, PyEnum):
@@ -19,6 +19,17 @@ class PrescriptionStatus(str, PyEnum):
 class Prescription(Base):
     """Prescription model"""
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_prescriptions_created_at_id", "created_at", "id"),
+        # list_prescriptions?patient_id= / ?status_filter= in keyset order
+        Index("ix_prescriptions_patient_id_created_at_id", "patient_id", "created_at", "id"),
+        Index("ix_prescriptions_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_prescriptions_doctor_id", "doctor_id"),
+        Index("ix_prescriptions_consultation_id", "consultation_id"),
+        # Expiry sweeper: active prescriptions past their expiry date
+        Index("ix_prescriptions_status_expiry_date", "status", "expiry_date"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False)
@@ -32,9 +43,9 @@ class Prescription(Base):
     quantity = Column(Integer, nullable=True)
     refills = Column(Integer, default=0, nullable=False)
     status = Column(Enum(PrescriptionStatus), default=PrescriptionStatus.ACTIVE, nullable=False)
-    notes = Column(Text, nullable=True)
-    contraindications = Column(Text, nullable=True)
-    side_effects = Column(Text, nullable=True)
+    notes = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    contraindications = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
+    side_effects = deferred(Column(Text, nullable=True), group=LARGE_TEXT)
     prescribed_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     expiry_date = Column(DateTime, nullable=True)
     dispensed_date = Column(DateTime, nullable=True)
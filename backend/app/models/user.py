@@ -1,5 +1,5 @@
 """User model"""
-from sqlalchemy import Column, String, Boolean, DateTime, Enum
+from sqlalchemy import DDL, Column, Index, String, Boolean, DateTime, Enum, event
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -19,6 +19,16 @@ class UserRole(str, PyEnum):
 class User(Base):
     """User model"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Patient typeahead (app.db.typeahead): substring matches through
+        # pg_trgm on PostgreSQL, prefix matches on phone numbers
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_users_phone", "phone", postgresql_ops={"phone": "varchar_pattern_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -36,3 +46,10 @@ class User(Base):
     
     def __repr__(self):
         return f"<User {self.email}>"
+
+
+# The trigram indexes need pg_trgm before create_all builds the table
+event.listen(
+    User.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
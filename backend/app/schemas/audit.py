@@ -0,0 +1,45 @@
+"""Audit log schemas"""
+from pydantic import BaseModel
+from datetime import date, datetime
+from uuid import UUID
+from typing import Optional
+from enum import Enum
+
+
+class AuditAction(str, Enum):
+    """Audit actions"""
+    CREATE = "create"
+    READ = "read"
+    UPDATE = "update"
+    DELETE = "delete"
+    LOGIN = "login"
+    LOGOUT = "logout"
+    EXPORT = "export"
+    SHARE = "share"
+
+
+class AuditLogResponse(BaseModel):
+    """Audit log response schema"""
+    id: UUID
+    user_id: Optional[UUID] = None
+    action: AuditAction
+    resource_type: str
+    resource_id: Optional[UUID] = None
+    description: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    status: str
+    error_message: Optional[str] = None
+    timestamp: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class AuditCountResponse(BaseModel):
+    """Number of audit events in one group; only the grouped fields are returned"""
+    day: Optional[date] = None
+    user_id: Optional[UUID] = None
+    action: Optional[AuditAction] = None
+    resource_type: Optional[str] = None
+    count: int
@@ -0,0 +1,27 @@
+"""Bulk operation schemas"""
+from pydantic import BaseModel
+from uuid import UUID
+from typing import Optional
+from enum import Enum
+
+
+class BulkItemStatus(str, Enum):
+    """Outcome of a single item in a bulk request"""
+    CREATED = "created"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+
+class BulkItemResult(BaseModel):
+    """Result for one item of a bulk request"""
+    index: int
+    id: Optional[UUID] = None
+    status: BulkItemStatus
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Bulk request response schema"""
+    succeeded: int
+    failed: int
+    results: list[BulkItemResult]
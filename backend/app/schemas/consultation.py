@@ -46,6 +46,11 @@ class ConsultationUpdate(BaseModel):
     follow_up_date: Optional[datetime] = None
 
 
+class ConsultationBulkUpdate(ConsultationUpdate):
+    """Consultation bulk update item schema"""
+    id: UUID
+
+
 class ConsultationResponse(ConsultationBase):
     """Consultation response schema"""
     id: UUID
@@ -56,3 +61,19 @@ class ConsultationResponse(ConsultationBase):
     
     class Config:
         from_attributes = True
+
+
+class ConsultationSearchResult(ConsultationResponse):
+    """Consultation matching a search, with its relevance"""
+    rank: float
+
+
+class ConsultationCacheEntry(ConsultationResponse):
+    """Cached consultation with the fields its access check needs"""
+    patient_user_id: UUID
+    
+    @classmethod
+    def from_consultation(cls, consultation) -> "ConsultationCacheEntry":
+        """Build an entry from a consultation loaded with its patient"""
+        response = ConsultationResponse.model_validate(consultation)
+        return cls(**response.model_dump(), patient_user_id=consultation.patient.user_id)
@@ -4,6 +4,8 @@ from datetime import datetime
 from uuid import UUID
 from typing import Optional
 from enum import Enum
+from app.schemas.consultation import ConsultationResponse
+from app.schemas.prescription import PrescriptionResponse
 
 
 class BloodType(str, Enum):
@@ -68,3 +70,20 @@ class PatientResponse(PatientBase):
     
     class Config:
         from_attributes = True
+
+
+class PatientSearchResult(BaseModel):
+    """Patient typeahead match with the identifying details staff check"""
+    id: UUID
+    user_id: UUID
+    full_name: str
+    email: str
+    phone: Optional[str] = None
+    date_of_birth: Optional[datetime] = None
+    insurance_number: Optional[str] = None
+
+
+class PatientChartResponse(PatientResponse):
+    """Patient record with nested consultations and prescriptions"""
+    consultations: list[ConsultationResponse] = []
+    prescriptions: list[PrescriptionResponse] = []
@@ -45,6 +45,11 @@ class PrescriptionUpdate(BaseModel):
     expiry_date: Optional[datetime] = None
 
 
+class PrescriptionBulkUpdate(PrescriptionUpdate):
+    """Prescription bulk update item schema"""
+    id: UUID
+
+
 class PrescriptionDispense(BaseModel):
     """Prescription dispense schema"""
     dispensed_by: UUID
@@ -64,3 +69,14 @@ class PrescriptionResponse(PrescriptionBase):
     
     class Config:
         from_attributes = True
+
+
+class PrescriptionCacheEntry(PrescriptionResponse):
+    """Cached prescription with the fields its access check needs"""
+    patient_user_id: UUID
+    
+    @classmethod
+    def from_prescription(cls, prescription) -> "PrescriptionCacheEntry":
+        """Build an entry from a prescription loaded with its patient"""
+        response = PrescriptionResponse.model_validate(prescription)
+        return cls(**response.model_dump(), patient_user_id=prescription.patient.user_id)
@@ -61,10 +61,16 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     """Token schema"""
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
     expires_in: int
 
 
+class TokenRefresh(BaseModel):
+    """Token refresh schema"""
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     """Token data schema"""
     sub: str
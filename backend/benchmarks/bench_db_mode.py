@@ -0,0 +1,159 @@
+"""Benchmark sync vs async database mode
+
+Runs the same read workload against the app once per ``DB_MODE`` in a fresh
+interpreter and reports throughput and latency. Point ``DATABASE_URL`` at a
+PostgreSQL database; the benchmark creates its own rows and removes them.
+
+Usage:
+    python -m benchmarks.bench_db_mode --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ("sync", "async")
+
+
+def seed():
+    """Create a doctor and a patient to read"""
+    from app.db.session import SessionLocal
+    from app.models.user import User, UserRole
+    from app.models.patient import Patient
+    
+    db = SessionLocal()
+    suffix = str(time.time_ns())
+    doctor = User(
+        email=f"bench-doctor-{suffix}@medicalcycle.local",
+        username=f"bench-doctor-{suffix}",
+        full_name="Benchmark Doctor",
+        hashed_password="!",
+        role=UserRole.DOCTOR
+    )
+    patient_user = User(
+        email=f"bench-patient-{suffix}@medicalcycle.local",
+        username=f"bench-patient-{suffix}",
+        full_name="Benchmark Patient",
+        hashed_password="!",
+        role=UserRole.PATIENT
+    )
+    db.add_all([doctor, patient_user])
+    db.flush()
+    patient = Patient(user_id=patient_user.id)
+    db.add(patient)
+    db.commit()
+    ids = (doctor.id, patient_user.id, patient.id)
+    db.close()
+    return ids
+
+
+def cleanup(ids):
+    """Remove the rows created by seed"""
+    from app.db.session import SessionLocal
+    from app.models.audit_log import AuditLog
+    from app.models.user import User
+    from app.models.patient import Patient
+    
+    doctor_id, patient_user_id, patient_id = ids
+    db = SessionLocal()
+    db.query(AuditLog).filter(AuditLog.user_id == doctor_id).delete()
+    db.query(Patient).filter(Patient.id == patient_id).delete()
+    db.query(User).filter(User.id.in_([doctor_id, patient_user_id])).delete()
+    db.commit()
+    db.close()
+
+
+async def drive(app, path, headers, total, concurrency):
+    """Issue total GET requests with at most concurrency in flight"""
+    import httpx
+    
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def run_worker(total, concurrency):
+    """Benchmark the mode selected by DB_MODE in this interpreter"""
+    from app.main import app
+    from app.config import settings
+    from app.core.audit import audit_writer
+    from app.core.security import create_access_token
+    
+    ids = seed()
+    doctor_id, _, patient_id = ids
+    token = create_access_token(data={"sub": str(doctor_id), "role": "doctor"})
+    headers = {"Authorization": f"Bearer {token}"}
+    path = f"{settings.API_V1_STR}/patients/{patient_id}"
+    
+    audit_writer.start()
+    try:
+        result = asyncio.run(drive(app, path, headers, total, concurrency))
+    finally:
+        audit_writer.stop()
+        cleanup(ids)
+    
+    result["mode"] = settings.DB_MODE
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args.requests, args.concurrency)
+        return
+    
+    print(f"{'mode':<8}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode in MODES:
+        env = {**os.environ, "DB_MODE": mode, "DEBUG": "false"}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_mode", "--worker",
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<8}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
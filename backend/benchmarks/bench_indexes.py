@@ -0,0 +1,210 @@
+"""Benchmark the filter indexes added in migration 0002
+
+Seeds a large dataset, then runs the list and audit query shapes used by the
+handlers with the schema at migration 0001 (no filter indexes) and again at
+head, printing each query plan and its median execution time.
+
+The benchmark migrates the schema up and down, so point ``DATABASE_URL`` at a
+scratch PostgreSQL database. SQLite works too, with ``EXPLAIN QUERY PLAN``
+output.
+
+Usage:
+    python -m benchmarks.bench_indexes --rows 1000000
+    python -m benchmarks.bench_indexes --skip-seed   # rerun on seeded data
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import func, insert, text
+from app.db.session import SessionLocal, engine
+from app.core.pagination import paginate
+from app.models.user import User, UserRole
+from app.models.patient import Patient
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription, PrescriptionStatus
+from app.models.audit_log import AuditLog, AuditAction
+
+BATCH_SIZE = 10000
+BEFORE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config("alembic.ini")
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def insert_batches(db, model, make_row, count):
+    """Insert count generated rows in multi-row batches"""
+    for start in range(0, count, BATCH_SIZE):
+        db.execute(insert(model), [make_row(i) for i in range(start, min(start + BATCH_SIZE, count))])
+        db.commit()
+
+
+def seed(rows, patients, doctors):
+    """Seed users, patients and rows consultations, prescriptions and audit logs"""
+    db = SessionLocal()
+    now = datetime.utcnow()
+    suffix = uuid.uuid4().hex[:8]
+    
+    def when(i):
+        return now - timedelta(minutes=i)
+    
+    doctor_ids = [uuid.uuid4() for _ in range(doctors)]
+    user_ids = [uuid.uuid4() for _ in range(patients)]
+    patient_ids = [uuid.uuid4() for _ in range(patients)]
+    all_user_ids = doctor_ids + user_ids
+    
+    insert_batches(db, User, lambda i: {
+        "id": all_user_ids[i],
+        "email": f"bench-{suffix}-{i}@medicalcycle.local",
+        "username": f"bench-{suffix}-{i}",
+        "full_name": f"Benchmark User {i}",
+        "hashed_password": "!",
+        "role": UserRole.DOCTOR if i < doctors else UserRole.PATIENT,
+        "is_active": True,
+        "is_verified": True,
+        "created_at": now,
+        "updated_at": now,
+    }, doctors + patients)
+    insert_batches(db, Patient, lambda i: {
+        "id": patient_ids[i], "user_id": user_ids[i], "created_at": now, "updated_at": now,
+    }, patients)
+    insert_batches(db, Consultation, lambda i: {
+        "id": uuid.uuid4(),
+        "patient_id": random.choice(patient_ids),
+        "doctor_id": random.choice(doctor_ids),
+        "consultation_date": when(i),
+        "reason": "Benchmark visit",
+        "created_at": when(i),
+        "updated_at": when(i),
+    }, rows)
+    statuses = list(PrescriptionStatus)
+    insert_batches(db, Prescription, lambda i: {
+        "id": uuid.uuid4(),
+        "patient_id": random.choice(patient_ids),
+        "doctor_id": random.choice(doctor_ids),
+        "medication_name": "Benchmark",
+        "dosage": "1mg",
+        "frequency": "daily",
+        "duration": "7 days",
+        "route": "oral",
+        "refills": 0,
+        "status": random.choice(statuses),
+        "prescribed_date": when(i),
+        "created_at": when(i),
+        "updated_at": when(i),
+    }, rows)
+    insert_batches(db, AuditLog, lambda i: {
+        "id": uuid.uuid4(),
+        "user_id": random.choice(doctor_ids),
+        "action": AuditAction.READ,
+        "resource_type": "patient",
+        "resource_id": random.choice(patient_ids),
+        "status": "success",
+        "timestamp": when(i),
+    }, rows)
+    db.close()
+
+
+def query_shapes(db):
+    """Build the handler queries with filter values taken from the data"""
+    patient_id = db.query(Consultation.patient_id).limit(1).scalar()
+    doctor_id = db.query(AuditLog.user_id).limit(1).scalar()
+    resource_id = db.query(AuditLog.resource_id).limit(1).scalar()
+    
+    return {
+        "consultations?patient_id": paginate(
+            db.query(Consultation).filter(Consultation.patient_id == patient_id),
+            Consultation.created_at, Consultation.id
+        ),
+        "prescriptions?patient_id": paginate(
+            db.query(Prescription).filter(Prescription.patient_id == patient_id),
+            Prescription.created_at, Prescription.id
+        ),
+        "prescriptions?status_filter": paginate(
+            db.query(Prescription).filter(Prescription.status == PrescriptionStatus.EXPIRED),
+            Prescription.created_at, Prescription.id
+        ),
+        "audit_logs?user_id": paginate(
+            db.query(AuditLog).filter(AuditLog.user_id == doctor_id),
+            AuditLog.timestamp, AuditLog.id, descending=True
+        ),
+        "audit_logs?resource": paginate(
+            db.query(AuditLog).filter(
+                AuditLog.resource_type == "patient", AuditLog.resource_id == resource_id
+            ),
+            AuditLog.timestamp, AuditLog.id, descending=True
+        ),
+    }
+
+
+def explain(db, query) -> str:
+    """Get the database's plan for a query"""
+    sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        rows = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars()
+        return "\n".join(rows)
+    return "\n".join(str(row[-1]) for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def measure(label, repeat):
+    """Print the plan and median time of every query shape"""
+    db = SessionLocal()
+    db.execute(text("ANALYZE"))
+    db.commit()
+    
+    print(f"\n=== {label} ===")
+    timings = {}
+    for name, query in query_shapes(db).items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query.all()
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples) * 1000
+        print(f"\n-- {name} ({timings[name]:.2f} ms median)")
+        print(explain(db, query))
+    db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000,
+                        help="consultations, prescriptions and audit logs to seed (each)")
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+    
+    config = alembic_config()
+    command.upgrade(config, "head")
+    
+    if not args.skip_seed:
+        start = time.perf_counter()
+        seed(args.rows, args.patients, args.doctors)
+        print(f"Seeded {args.rows} rows per table in {time.perf_counter() - start:.1f}s")
+    
+    with SessionLocal() as db:
+        total = db.query(func.count(Consultation.id)).scalar()
+    print(f"{total} consultations in {engine.url.render_as_string(hide_password=True)}")
+    
+    command.downgrade(config, BEFORE_REVISION)
+    before = measure(f"before (revision {BEFORE_REVISION})", args.repeat)
+    command.upgrade(config, "head")
+    after = measure("after (head)", args.repeat)
+    
+    print(f"\n{'query':<32}{'before ms':>12}{'after ms':>12}")
+    for name in before:
+        print(f"{name:<32}{before[name]:>12.2f}{after[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark list response serialization
+
+Compares, for ``list_consultations`` and ``list_prescriptions`` pages, the
+previous path (load ORM objects, validate them through the response model,
+encode with the stdlib JSON encoder) with the current one (select the schema's
+columns and encode the row tuples with orjson). Both include the page query.
+The benchmark creates wide rows with large text fields in ``DATABASE_URL`` and
+removes them afterwards.
+
+Usage:
+    python -m benchmarks.bench_list_serialization --rows 2000 --page-size 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from app.db.session import SessionLocal
+from app.core.pagination import paginate
+from app.core.responses import rows_response, schema_columns
+from app.models.user import User, UserRole
+from app.models.patient import Patient
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription
+from app.schemas.consultation import ConsultationResponse
+from app.schemas.prescription import PrescriptionResponse
+
+# Roughly the size of real clinical notes
+NOTES = "Patient reports intermittent symptoms over the past weeks. " * 30
+
+
+def seed(rows):
+    """Create a doctor, a patient and rows consultations and prescriptions"""
+    db = SessionLocal()
+    now = datetime.utcnow()
+    suffix = uuid.uuid4().hex[:8]
+    doctor_id, user_id, patient_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    
+    db.execute(insert(User), [
+        {
+            "id": id_, "email": f"bench-{name}-{suffix}@medicalcycle.local",
+            "username": f"bench-{name}-{suffix}", "full_name": f"Benchmark {name}",
+            "hashed_password": "!", "role": role, "is_active": True, "is_verified": True,
+            "created_at": now, "updated_at": now,
+        }
+        for id_, name, role in ((doctor_id, "doctor", UserRole.DOCTOR), (user_id, "patient", UserRole.PATIENT))
+    ])
+    db.execute(insert(Patient), [{"id": patient_id, "user_id": user_id, "created_at": now, "updated_at": now}])
+    db.execute(insert(Consultation), [
+        {
+            "id": uuid.uuid4(), "patient_id": patient_id, "doctor_id": doctor_id,
+            "consultation_date": now - timedelta(minutes=i), "reason": "Follow-up visit",
+            "chief_complaint": NOTES[:500], "diagnosis": NOTES[:800], "clinical_notes": NOTES,
+            "vital_signs": "BP 120/80, HR 72", "physical_examination": NOTES,
+            "treatment_plan": NOTES[:1000], "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(Prescription), [
+        {
+            "id": uuid.uuid4(), "patient_id": patient_id, "doctor_id": doctor_id,
+            "medication_name": "Amoxicillin", "dosage": "500mg", "frequency": "3 times daily",
+            "duration": "7 days", "route": "oral", "refills": 0, "notes": NOTES[:1000],
+            "contraindications": NOTES[:600], "side_effects": NOTES[:600],
+            "prescribed_date": now - timedelta(minutes=i), "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+    return doctor_id, user_id, patient_id
+
+
+def cleanup(ids):
+    """Remove the rows created by seed"""
+    doctor_id, user_id, patient_id = ids
+    db = SessionLocal()
+    db.query(Prescription).filter(Prescription.patient_id == patient_id).delete()
+    db.query(Consultation).filter(Consultation.patient_id == patient_id).delete()
+    db.query(Patient).filter(Patient.id == patient_id).delete()
+    db.query(User).filter(User.id.in_([doctor_id, user_id])).delete()
+    db.commit()
+    db.close()
+
+
+def orm_page(loop, field, db, model, patient_id, page_size, offset) -> bytes:
+    """Previous path: ORM objects through the response model and json"""
+    items = paginate(
+        db.query(model).filter(model.patient_id == patient_id), model.created_at, model.id, None, offset, page_size
+    ).all()
+    content = loop.run_until_complete(serialize_response(field=field, response_content=items))
+    return JSONResponse(content).body
+
+
+def rows_page(db, model, schema, patient_id, page_size, offset) -> bytes:
+    """Current path: schema columns encoded from row tuples"""
+    rows = paginate(
+        db.query(*schema_columns(model, schema)).filter(model.patient_id == patient_id),
+        model.created_at, model.id, None, offset, page_size
+    ).all()
+    return rows_response(rows, schema).body
+
+
+def measure(render, rows, page_size, repeat) -> float:
+    """Get the median rows per second of rendering every page of rows"""
+    samples = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        start = time.perf_counter()
+        for offset in range(0, rows, page_size):
+            render(db, offset)
+        samples.append(rows / (time.perf_counter() - start))
+        db.close()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    loop = asyncio.new_event_loop()
+    ids = seed(args.rows)
+    patient_id = ids[2]
+    try:
+        print(f"{'endpoint':<22}{'before rows/s':>16}{'after rows/s':>16}{'speedup':>10}")
+        for name, model, schema in (
+            ("list_consultations", Consultation, ConsultationResponse),
+            ("list_prescriptions", Prescription, PrescriptionResponse),
+        ):
+            field = create_response_field(name=f"Response_{name}", type_=list[schema], mode="serialization")
+            before = measure(
+                lambda db, offset: orm_page(loop, field, db, model, patient_id, args.page_size, offset),
+                args.rows, args.page_size, args.repeat
+            )
+            after = measure(
+                lambda db, offset: rows_page(db, model, schema, patient_id, args.page_size, offset),
+                args.rows, args.page_size, args.repeat
+            )
+            print(f"{name:<22}{before:>16.0f}{after:>16.0f}{after / before:>9.1f}x")
+    finally:
+        cleanup(ids)
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
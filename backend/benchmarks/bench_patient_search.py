@@ -0,0 +1,164 @@
+"""Benchmark the patient typeahead
+
+Seeds patients with generated names, emails, phone and insurance numbers,
+then runs typeahead searches the way front-desk staff type them (name and
+email fragments, phone and insurance prefixes) and reports latency
+percentiles against the 20 ms p99 budget, with the plan of one search per
+kind.
+
+Point ``DATABASE_URL`` at a scratch PostgreSQL database migrated to head;
+SQLite works too but has no trigram indexes and scans.
+
+Usage:
+    python -m benchmarks.bench_patient_search --patients 1000000
+    python -m benchmarks.bench_patient_search --skip-seed   # rerun on seeded data
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import func, insert, text
+from app.db.init_db import upgrade_db
+from app.db.session import SessionLocal, engine
+from app.db.typeahead import patient_typeahead
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+
+BATCH_SIZE = 10000
+BUDGET_MS = 20.0
+
+FIRST_NAMES = (
+    "Maria", "John", "Ana", "David", "Sofia", "James", "Lucia", "Michael", "Emma", "Daniel", "Olivia", "Carlos",
+    "Isabel", "Thomas", "Laura", "Pedro", "Chloe", "Ahmed", "Yuki", "Fatima", "Ivan", "Grace", "Omar", "Nina",
+)
+LAST_NAMES = (
+    "Smith", "Garcia", "Johnson", "Martinez", "Brown", "Rodriguez", "Nguyen", "Silva", "Kowalski", "Muller",
+    "Rossi", "Tanaka", "Okafor", "Haddad", "Petrov", "Larsen", "Dubois", "Fernandes", "Cohen", "Novak",
+    "Schmidt", "Moreau", "Jensen", "Costa", "Ivanova", "Sato", "Ali", "Khan", "Lopez", "Wilson",
+)
+
+
+def person(i):
+    """Deterministic details of the i-th seeded patient"""
+    rng = random.Random(i)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "full_name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+        "phone": f"+{rng.randint(1, 99)}{rng.randint(10 ** 8, 10 ** 9 - 1)}",
+        "insurance_number": f"{rng.choice('ABCDEFGH')}{rng.randint(10 ** 9, 10 ** 10 - 1)}",
+    }
+
+
+def seed(patients):
+    """Insert patients and their users in multi-row batches"""
+    db = SessionLocal()
+    now = datetime.utcnow()
+    suffix = uuid.uuid4().hex[:8]
+    for start in range(0, patients, BATCH_SIZE):
+        people = [(uuid.uuid4(), person(i)) for i in range(start, min(start + BATCH_SIZE, patients))]
+        db.execute(insert(User), [{
+            "id": user_id,
+            "email": details["email"],
+            "username": f"bench-{suffix}-{start + n}",
+            "full_name": details["full_name"],
+            "phone": details["phone"],
+            "hashed_password": "!",
+            "role": UserRole.PATIENT,
+            "is_active": True,
+            "is_verified": True,
+            "created_at": now,
+            "updated_at": now,
+        } for n, (user_id, details) in enumerate(people)])
+        db.execute(insert(Patient), [{
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "insurance_number": details["insurance_number"],
+            "created_at": now,
+            "updated_at": now,
+        } for user_id, details in people])
+        db.commit()
+    db.close()
+
+
+def typed_queries(patients, count):
+    """Searches as staff type them, taken from seeded patients"""
+    rng = random.Random(0)
+    kinds = {
+        "name": lambda d: d["full_name"].split()[rng.randrange(2)][:rng.randint(3, 6)],
+        "full name": lambda d: d["full_name"][:rng.randint(8, len(d["full_name"]))],
+        "email": lambda d: d["email"][:rng.randint(5, 12)],
+        "phone": lambda d: d["phone"][:rng.randint(5, 8)],
+        "insurance": lambda d: d["insurance_number"][:rng.randint(4, 8)],
+    }
+    return [
+        (kind, make(person(rng.randrange(patients))))
+        for _ in range(count // len(kinds))
+        for kind, make in kinds.items()
+    ]
+
+
+def explain(db, statement) -> str:
+    """Get the database's plan for a statement"""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        return "\n".join(db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars())
+    return "\n".join(str(row[-1]) for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def percentile(samples, fraction):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=1000000)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+    
+    upgrade_db(engine)
+    if not args.skip_seed:
+        start = time.perf_counter()
+        seed(args.patients)
+        print(f"Seeded {args.patients} patients in {time.perf_counter() - start:.1f}s")
+    
+    db = SessionLocal()
+    db.execute(text("ANALYZE"))
+    db.commit()
+    total = db.query(func.count(Patient.id)).scalar()
+    print(f"{total} patients in {engine.url.render_as_string(hide_password=True)}")
+    
+    columns = [
+        Patient.id, Patient.user_id, User.full_name, User.email, User.phone,
+        Patient.date_of_birth, Patient.insurance_number
+    ]
+    queries = typed_queries(args.patients, args.searches)
+    timings = {}
+    plans = {}
+    for kind, q in queries:
+        statement = patient_typeahead(columns, q, args.limit)
+        start = time.perf_counter()
+        db.execute(statement).all()
+        timings.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+        plans.setdefault(kind, (q, statement))
+    
+    for kind, (q, statement) in plans.items():
+        print(f"\n-- {kind}: {q!r}")
+        print(explain(db, statement))
+    db.close()
+    
+    every = [sample for samples in timings.values() for sample in samples]
+    print(f"\n{'search':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, samples in [*timings.items(), ("all", every)]:
+        print(f"{kind:<12}{len(samples):>8}{statistics.median(samples):>10.2f}"
+              f"{percentile(samples, 0.95):>10.2f}{percentile(samples, 0.99):>10.2f}")
+    p99 = percentile(every, 0.99)
+    print(f"\np99 {p99:.2f} ms: {'within' if p99 <= BUDGET_MS else 'over'} the {BUDGET_MS:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
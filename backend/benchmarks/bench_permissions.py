@@ -0,0 +1,49 @@
+"""Benchmark permission checks
+
+Compares the previous checks (a scan of the role's permission list, and the
+handlers' role string comparisons) with the current ones: ``Principal.can``
+and the mask test ``require`` runs, both a bitwise ``&`` on the principal's
+precomputed mask. No database is needed.
+
+Usage:
+    python -m benchmarks.bench_permissions --checks 1000000
+"""
+import argparse
+import statistics
+import timeit
+import uuid
+from app.core.permissions import ROLE_MASKS, ROLE_PERMISSIONS, Permission
+from app.core.principals import Principal
+from app.models.user import UserRole
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    # Every role against every permission, hits and misses alike
+    principals = [
+        Principal(id=uuid.uuid4(), email=f"{role.value}@medicalcycle.local", role=role, is_active=True,
+                  permissions=ROLE_MASKS[role])
+        for role in UserRole
+    ]
+    pairs = [(principal, permission) for principal in principals for permission in Permission]
+    masks = [(principal, permission.bit) for principal, permission in pairs]
+    
+    cases = (
+        ("list scan", lambda: [permission in ROLE_PERMISSIONS[p.role] for p, permission in pairs]),
+        ("role strings", lambda: [p.role.value not in ["doctor", "nurse", "admin"] for p, permission in pairs]),
+        ("can()", lambda: [p.can(permission) for p, permission in pairs]),
+        ("require() mask", lambda: [p.permissions & mask == mask for p, mask in masks]),
+    )
+    print(f"{'check':<16}{'ns/check':>12}")
+    for name, check in cases:
+        number = max(1, args.checks // len(pairs))
+        samples = timeit.repeat(check, number=number, repeat=args.repeat)
+        print(f"{name:<16}{statistics.median(samples) / (number * len(pairs)) * 1e9:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
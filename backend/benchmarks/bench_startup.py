@@ -0,0 +1,77 @@
+"""Benchmark application cold start
+
+Each run starts a fresh interpreter and times importing ``app.main`` and
+running the lifespan startup (schema version check, audit writer). For
+comparison it also times ``Base.metadata.create_all``, which every worker
+used to run at import. Run ``python -m app.db.init_db upgrade`` against
+``DATABASE_URL`` first.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def run_worker():
+    """Time one cold start in this interpreter"""
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+    
+    async def startup():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter()
+    
+    started = asyncio.run(startup())
+    
+    from app.db.base import Base
+    from app.db.session import engine
+    create_all_start = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    create_all_end = time.perf_counter()
+    
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "lifespan_ms": (started - imported) * 1000,
+        "create_all_ms": (create_all_end - create_all_start) * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker()
+        return
+    
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--worker"],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    
+    print(f"{'phase':<28}{'median ms':>12}{'max ms':>10}")
+    for key, label in (
+        ("import_ms", "import app.main"),
+        ("lifespan_ms", "lifespan startup"),
+        ("create_all_ms", "create_all (previous import)"),
+    ):
+        values = [result[key] for result in results]
+        print(f"{label:<28}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
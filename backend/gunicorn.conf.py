@@ -0,0 +1,70 @@
+"""Production server configuration
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Runs uvicorn workers under gunicorn. The worker count and each worker's
+connection pool come from app.core.server, driven by WEB_CONCURRENCY and
+DB_CONNECTION_BUDGET.
+"""
+import os
+import shutil
+import tempfile
+from app.config import settings
+from app.core.server import concurrency_report, worker_count
+
+workers = worker_count()
+
+# Workers size their connection pools from this when they import the app
+os.environ["WEB_CONCURRENCY"] = str(workers)
+settings.WEB_CONCURRENCY = workers
+
+# Workers write their metrics here so /metrics on any of them reports all.
+# prometheus_client reads it on import, so it is set before the app is
+# preloaded, and emptied so a previous run's workers are not reported.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "medicalcycle-metrics")
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Import the app once in the master; workers fork with the modules loaded.
+# Importing opens no database connections, so nothing is shared across forks.
+preload_app = True
+
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    """Print the effective concurrency once the master is up"""
+    server.log.info("MedicalCycle server ready")
+    for line in concurrency_report(workers):
+        server.log.info("  %s", line)
+
+
+def post_fork(server, worker):
+    """Drop any connections inherited from the master, on every engine"""
+    from app.db.session import async_engine, engine, replica_engines
+    engines = [engine, *replica_engines]
+    if async_engine is not None:
+        engines.append(async_engine.sync_engine)
+    for inherited in engines:
+        inherited.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Stop reporting a dead worker's live metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,13 +1,21 @@
 """Test configuration and fixtures"""
+import threading
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from app.main import app
+from app.config import settings
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import ReadSessionLocal, get_db
+from app.db.loading import enable_lazy_load_guard
 from app.models.user import User
 from app.core.security import hash_password
+from app.core.audit import audit_writer
+from app.core.principals import principal_cache
+from app.core.cache import MemoryCacheBackend, read_cache
+from app.core.metrics import instrument_engine
+from app.core.tokens import revoked_tokens, token_cache
 
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -16,6 +24,31 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine)
+
+# Tests build the schema with create_all instead of migrations
+settings.DB_SCHEMA_CHECK = False
+
+# Batched audit writes go to the test database
+audit_writer.session_factory = TestingSessionLocal
+
+# Tests run expiry sweeps directly instead of on a timer; SQLite has no audit partitions
+settings.PRESCRIPTION_EXPIRY_ENABLED = False
+settings.AUDIT_PARTITION_MAINTENANCE = False
+
+# Record reads are cached in-process instead of Redis
+read_cache.backend = MemoryCacheBackend()
+
+# Token revocations and principal invalidations stay in-process
+revoked_tokens.backend = None
+settings.PRINCIPAL_INVALIDATION_BACKEND = "memory"
+
+# Read-only handlers read from the test database; test_replicas adds replicas
+ReadSessionLocal.configure(bind=engine)
+
+# Relationships handlers did not load explicitly raise instead of issuing N+1 queries
+enable_lazy_load_guard(TestingSessionLocal)
+enable_lazy_load_guard(ReadSessionLocal)
 
 
 def override_get_db():
@@ -30,13 +63,20 @@ def override_get_db():
 def db():
     """Create test database"""
     Base.metadata.create_all(bind=engine)
-    yield TestingSessionLocal()
+    session = TestingSessionLocal()
+    yield session
+    session.close()
     Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(db, tmp_path):
     """Create test client"""
+    audit_writer.spool_dir = str(tmp_path / "audit_spool")
+    principal_cache.clear()
+    token_cache.clear()
+    revoked_tokens.clear()
+    read_cache.backend.clear()
     app.dependency_overrides[get_db] = override_get_db
     
     with TestClient(app) as test_client:
@@ -45,6 +85,38 @@ def client(db):
     app.dependency_overrides.clear()
 
 
+class QueryCounter:
+    """Record the SQL statements issued against the test engine"""
+    
+    def __init__(self):
+        self.statements = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        # Audit rows are written by the background writer, not by the request
+        if statement.startswith(("INSERT INTO audit_logs", "INSERT INTO audit_daily_counts")):
+            return
+        with self._lock:
+            self.statements.append(statement)
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+
+
+@pytest.fixture
+def query_counter(db):
+    """Count queries issued during a test; call reset() before the part being measured"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
+
 @pytest.fixture
 def test_user(db):
     """Create test user"""
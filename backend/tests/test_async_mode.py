@@ -0,0 +1,138 @@
+"""Async database mode tests"""
+import inspect
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.config import settings
+from app.api.v1 import auth, patients, users
+from app.api.async_routes import asyncify_router
+from app.db.session import get_db, get_async_database_url
+from app.models.patient import Patient
+from app.core.security import create_access_token
+from app.models.audit_log import AuditLog
+from tests.conftest import SQLALCHEMY_DATABASE_URL, TestingSessionLocal
+
+
+@pytest.fixture
+def async_client(db):
+    """Create a test client whose routes run on AsyncSession"""
+    async_engine = create_async_engine(get_async_database_url(SQLALCHEMY_DATABASE_URL))
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+    
+    async_app = FastAPI()
+    for router in (auth.router, patients.router, users.router):
+        async_app.include_router(asyncify_router(router), prefix=settings.API_V1_STR)
+    async_app.dependency_overrides[get_db] = override_get_async_db
+    
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(test_doctor):
+    """Create authorization headers for test doctor"""
+    token = create_access_token(data={"sub": str(test_doctor.id), "role": test_doctor.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_async_database_url():
+    """Test sync driver URLs are mapped to async drivers"""
+    assert get_async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_asyncified_routes_are_coroutines():
+    """Test every handler in an asyncified router is an async endpoint"""
+    router = asyncify_router(patients.router)
+    
+    assert router.routes
+    assert all(inspect.iscoroutinefunction(route.endpoint) for route in router.routes)
+
+
+def test_async_get_patient(async_client, test_user, test_doctor, auth_headers, db):
+    """Test reading a patient through the async stack"""
+    patient = Patient(user_id=test_user.id, gender="F", blood_type="O-")
+    db.add(patient)
+    db.commit()
+    
+    response = async_client.get(f"/api/v1/patients/{patient.id}", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["blood_type"] == "O-"
+
+
+def test_async_cache_and_spool_run_off_the_loop(async_client, test_user, test_doctor, auth_headers, db, tmp_path, monkeypatch):
+    """Test read cache and audit spool calls leave the event loop free"""
+    import asyncio
+    from app.core.audit import AuditWriter
+    from app.core.cache import MemoryCacheBackend, read_cache
+    
+    on_loop = []
+    
+    def record(function):
+        def call(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(function.__name__)
+            except RuntimeError:
+                pass
+            return function(*args, **kwargs)
+        return call
+    
+    backend = MemoryCacheBackend()
+    for name in ("get", "add", "set"):
+        monkeypatch.setattr(backend, name, record(getattr(backend, name)))
+    monkeypatch.setattr(read_cache, "backend", backend)
+    writer = AuditWriter(session_factory=TestingSessionLocal, flush_interval=60, spool_dir=str(tmp_path))
+    monkeypatch.setattr(writer, "_spool_rows", record(writer._spool_rows))
+    monkeypatch.setattr("app.core.audit.audit_writer", writer)
+    writer.start()
+    patient = Patient(user_id=test_user.id, gender="F")
+    db.add(patient)
+    db.commit()
+    
+    try:
+        response = async_client.get(f"/api/v1/patients/{patient.id}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        response = async_client.put(f"/api/v1/patients/{patient.id}", json={"allergies": "Latex"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+    finally:
+        writer.stop()
+    
+    assert db.query(AuditLog).count() == 2
+    assert on_loop == []
+
+
+def test_async_update_patient(async_client, test_user, test_doctor, auth_headers, db):
+    """Test writing a patient through the async stack"""
+    patient = Patient(user_id=test_user.id, gender="M")
+    db.add(patient)
+    db.commit()
+    
+    response = async_client.put(
+        f"/api/v1/patients/{patient.id}",
+        json={"allergies": "Latex"},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["allergies"] == "Latex"
+
+
+def test_async_login(async_client, test_user):
+    """Test password verification awaits the hashing pool on the event loop"""
+    response = async_client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": test_user.email,
+            "password": "testpassword123"
+        }
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert "access_token" in response.json()
@@ -0,0 +1,379 @@
+"""Audit logging tests"""
+import json
+import os
+import subprocess
+import sys
+import uuid
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.audit import AuditWriter, log_audit, _to_spool_record
+from app.models.audit_log import AuditLog, AuditAction
+from tests.conftest import TestingSessionLocal
+
+
+def make_row(user_id, action=AuditAction.READ):
+    """Build an audit row as log_audit would"""
+    return dict(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        action=action,
+        resource_type="patient",
+        resource_id=uuid.uuid4(),
+        description="Viewed patient record",
+        ip_address=None,
+        user_agent=None,
+        status="success",
+        error_message=None,
+        timestamp=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def writer(db, tmp_path):
+    """Create an audit writer bound to the test database"""
+    writer = AuditWriter(
+        session_factory=TestingSessionLocal,
+        batch_size=10,
+        flush_interval=60,
+        spool_dir=str(tmp_path)
+    )
+    yield writer
+    writer.stop()
+
+
+def test_log_audit_inline_without_writer(db, test_user):
+    """Test log_audit commits directly when the writer is not running"""
+    log_audit(
+        db=db,
+        user_id=test_user.id,
+        action=AuditAction.LOGIN,
+        resource_type="user",
+        resource_id=test_user.id
+    )
+    
+    assert db.query(AuditLog).count() == 1
+
+
+def test_writer_flushes_batch(db, test_user, writer):
+    """Test queued events are written in one flush"""
+    writer.start()
+    for _ in range(5):
+        writer.enqueue(make_row(test_user.id))
+    
+    assert db.query(AuditLog).count() == 0
+    assert writer.flush() == 5
+    assert db.query(AuditLog).count() == 5
+    assert not [name for name in os.listdir(writer.spool_dir) if name.endswith(".segment")]
+
+
+def test_writer_replays_spool_after_crash(db, test_user, writer):
+    """Test events left in the spool file are inserted on start"""
+    with open(os.path.join(writer.spool_dir, "audit.jsonl"), "w") as f:
+        for _ in range(3):
+            f.write(json.dumps(_to_spool_record(make_row(test_user.id))) + "\n")
+    
+    writer.start()
+    
+    assert db.query(AuditLog).count() == 3
+
+
+def test_writer_skips_truncated_spool_line(db, test_user, writer):
+    """Test a line cut short by a crash is skipped instead of blocking the replay"""
+    with open(os.path.join(writer.spool_dir, "audit.jsonl"), "w") as f:
+        for _ in range(2):
+            f.write(json.dumps(_to_spool_record(make_row(test_user.id))) + "\n")
+        f.write(json.dumps(_to_spool_record(make_row(test_user.id)))[:40])
+    
+    writer.start()
+    
+    assert db.query(AuditLog).count() == 2
+    assert not [name for name in os.listdir(writer.spool_dir) if name.endswith(".segment")]
+
+
+def test_writer_replays_committed_segment_once(db, test_user, writer):
+    """Test a segment whose insert committed before the crash is not written or counted twice"""
+    from app.core.audit import get_audit_counts
+    
+    rows = [make_row(test_user.id) for _ in range(2)]
+    writer._write(rows)
+    with open(os.path.join(writer.spool_dir, "audit.jsonl"), "w") as f:
+        for row in rows + [make_row(test_user.id)]:
+            f.write(json.dumps(_to_spool_record(row)) + "\n")
+    
+    writer.start()
+    
+    assert db.query(AuditLog).count() == 3
+    assert get_audit_counts(db, ["action"]) == [(AuditAction.READ, 3)]
+    assert not [name for name in os.listdir(writer.spool_dir) if name.endswith(".segment")]
+
+
+def test_writer_on_migrated_database(test_user, tmp_path):
+    """Test the writer inserts and replays against a schema built by migrations rather than create_all"""
+    from app.db.init_db import upgrade_db
+    
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade_db(migrated)
+    writer = AuditWriter(
+        session_factory=sessionmaker(bind=migrated), batch_size=10, flush_interval=60,
+        spool_dir=str(tmp_path / "spool")
+    )
+    rows = [make_row(test_user.id) for _ in range(2)]
+    
+    try:
+        writer.start()
+        writer.enqueue_many(rows)
+        assert writer.flush() == 2
+        # A committed batch replayed after a crash is skipped, not rejected
+        assert writer._write(rows) == 0
+    finally:
+        writer.stop()
+    
+    with migrated.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM audit_logs").scalar() == 2
+        assert connection.exec_driver_sql("SELECT sum(events) FROM audit_daily_counts").scalar() == 2
+    migrated.dispose()
+
+
+def test_writer_quarantines_rejected_segment(db, test_user, writer):
+    """Test a segment the database keeps rejecting is set aside and later ones still replay"""
+    rejected = make_row(test_user.id)
+    rejected["resource_type"] = None
+    with open(os.path.join(writer.spool_dir, "audit.jsonl"), "w") as f:
+        f.write(json.dumps(_to_spool_record(rejected)) + "\n")
+    
+    writer.start()
+    writer.enqueue(make_row(test_user.id))
+    writer.flush()
+    writer.flush()
+    
+    names = os.listdir(writer.spool_dir)
+    assert db.query(AuditLog).count() == 1
+    assert len([name for name in names if name.endswith(".quarantine")]) == 1
+    assert not [name for name in names if name.endswith(".segment")]
+
+
+def test_writer_adopts_only_dead_workers_spools(db, test_user, writer):
+    """Test a worker replays spools of exited workers but not of running ones"""
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    
+    for pid in (exited.pid, os.getppid()):
+        with open(os.path.join(writer.spool_dir, f"audit-{pid}.jsonl"), "w") as f:
+            f.write(json.dumps(_to_spool_record(make_row(test_user.id))) + "\n")
+    
+    writer.start()
+    
+    assert db.query(AuditLog).count() == 1
+    assert sorted(os.listdir(writer.spool_dir)) == sorted(
+        [f"audit-{os.getppid()}.jsonl", f"audit-{os.getpid()}.jsonl"]
+    )
+
+
+def test_writer_keeps_segment_on_failure(db, test_user, writer):
+    """Test a failed insert leaves the events spooled for retry"""
+    writer.start()
+    writer.enqueue(make_row(test_user.id))
+    
+    # Empty in-memory database without an audit_logs table
+    writer.session_factory = sessionmaker(bind=create_engine("sqlite://"))
+    assert writer.flush() == 0
+    
+    writer.session_factory = TestingSessionLocal
+    assert writer.flush() == 1
+    assert db.query(AuditLog).count() == 1
+
+
+def test_get_audit_logs_cursor(db, test_user):
+    """Test audit logs page newest first by keyset cursor"""
+    from app.core.audit import get_audit_logs
+    from app.core.pagination import next_cursor
+    
+    for _ in range(3):
+        log_audit(db=db, user_id=test_user.id, action=AuditAction.READ, resource_type="patient")
+    
+    first = get_audit_logs(db, user_id=test_user.id, limit=2)
+    cursor = next_cursor(first, 2, sort_attr="timestamp")
+    second = get_audit_logs(db, user_id=test_user.id, limit=2, cursor=cursor)
+    
+    assert first[0].timestamp >= first[1].timestamp
+    assert len(second) == 1
+    assert second[0].id not in {log.id for log in first}
+
+
+def test_get_audit_logs_time_range(db, test_user):
+    """Test since and until bound the audit logs returned"""
+    from sqlalchemy import insert
+    from app.core.audit import get_audit_logs
+    
+    rows = [make_row(test_user.id) for _ in range(3)]
+    for row, month in zip(rows, (1, 2, 3)):
+        row["timestamp"] = datetime(2026, month, 15)
+    db.execute(insert(AuditLog), rows)
+    db.commit()
+    
+    logs = get_audit_logs(db, since=datetime(2026, 2, 1), until=datetime(2026, 3, 15))
+    
+    assert [log.id for log in logs] == [rows[1]["id"]]
+
+
+def test_partition_months():
+    """Test monthly partition bounds and names, across years"""
+    from app.db.partitions import add_months, month_start, partition_name
+    
+    month = month_start(datetime(2026, 12, 31, 23, 59))
+    
+    assert month == datetime(2026, 12, 1)
+    assert add_months(month, 1) == datetime(2027, 1, 1)
+    assert add_months(month, -12) == datetime(2025, 12, 1)
+    assert partition_name(add_months(month, 1)) == "audit_logs_2027_01"
+
+
+def test_partition_maintenance_skips_unpartitioned(db):
+    """Test maintenance leaves databases without audit partitions alone"""
+    from app.db.partitions import archive_expired_partitions, ensure_partitions, maintain_partitions
+    from tests.conftest import engine
+    
+    assert maintain_partitions(engine) == ([], [])
+    with engine.connect() as connection:
+        assert ensure_partitions(connection) == []
+        assert archive_expired_partitions(connection, retention_months=1) == []
+
+
+class NoPartition(Exception):
+    """Stand-in for the driver error of an insert no audit partition accepts"""
+    pgcode = "23514"
+    
+    def __str__(self):
+        return 'no partition of relation "audit_logs" found for row'
+
+
+def test_missing_partition_created_on_insert(db, test_user, writer, monkeypatch):
+    """Test inline and batched writes create a missing partition and retry"""
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import Session
+    from app.core import audit
+    from app.db.partitions import is_missing_partition
+    
+    created = []
+    monkeypatch.setattr(audit, "create_partitions_for", lambda bind, moments: created.append(moments))
+    failures = []
+    execute = Session.execute
+    
+    def execute_without_partition(self, statement, *args, **kwargs):
+        table = getattr(statement, "table", None)
+        if getattr(table, "name", None) == "audit_logs" and failures:
+            raise IntegrityError(str(failures.pop()), {}, NoPartition())
+        return execute(self, statement, *args, **kwargs)
+    
+    monkeypatch.setattr(Session, "execute", execute_without_partition)
+    
+    failures.append("inline")
+    log_audit(db=db, user_id=test_user.id, action=AuditAction.READ, resource_type="patient")
+    writer.start()
+    writer.enqueue(make_row(test_user.id))
+    failures.append("batch")
+    
+    assert writer.flush() == 1
+    assert db.query(AuditLog).count() == 2
+    assert len(created) == 2
+    assert not is_missing_partition(IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed")))
+
+
+def test_daily_counts_follow_inserts(db, test_user, writer):
+    """Test inline and batched audit writes both keep the daily counts"""
+    from app.core.audit import get_audit_counts
+    
+    log_audit(db=db, user_id=test_user.id, action=AuditAction.LOGIN, resource_type="user")
+    log_audit(db=db, user_id=None, action=AuditAction.LOGIN, resource_type="user")
+    writer.start()
+    writer.enqueue_many([make_row(test_user.id) for _ in range(3)])
+    writer.flush()
+    
+    counts = get_audit_counts(db, ["user_id", "action"])
+    
+    assert sorted(counts, key=str) == sorted(
+        [(None, AuditAction.LOGIN, 1), (test_user.id, AuditAction.LOGIN, 1), (test_user.id, AuditAction.READ, 3)],
+        key=str
+    )
+    assert get_audit_counts(db, ["action"], action=AuditAction.READ) == [(AuditAction.READ, 3)]
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Create authorization headers for test admin"""
+    from app.core.security import create_access_token
+    token = create_access_token(data={"sub": str(test_admin.id), "role": test_admin.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def past_events(db, test_user):
+    """Log three reads and a login by test_user in January 2026"""
+    from sqlalchemy import insert
+    from app.core.audit import add_daily_counts
+    
+    rows = [make_row(test_user.id) for _ in range(3)] + [make_row(test_user.id, AuditAction.LOGIN)]
+    for row, day in zip(rows, (5, 5, 6, 6)):
+        row["timestamp"] = datetime(2026, 1, day, 12)
+    db.execute(insert(AuditLog), rows)
+    add_daily_counts(db, rows)
+    db.commit()
+    return rows
+
+
+def test_list_audit_logs(client, test_user, admin_headers, past_events):
+    """Test admins page through filtered audit logs newest first"""
+    params = {"user_id": str(test_user.id), "action": "read", "limit": 2}
+    
+    first = client.get("/api/v1/audit/logs", params=params, headers=admin_headers)
+    second = client.get(
+        "/api/v1/audit/logs", params={**params, "cursor": first.headers["X-Next-Cursor"]}, headers=admin_headers
+    )
+    
+    assert first.status_code == 200
+    assert [log["action"] for log in first.json() + second.json()] == ["read"] * 3
+    assert first.json()[0]["timestamp"] >= first.json()[1]["timestamp"]
+    assert len(second.json()) == 1
+
+
+def test_count_audit_events(client, admin_headers, past_events):
+    """Test admins count audit events per day and action from the daily counts"""
+    response = client.get(
+        "/api/v1/audit/counts",
+        params={"group_by": "action,day", "since": "2026-01-01", "until": "2026-02-01"},
+        headers=admin_headers
+    )
+    
+    assert response.status_code == 200
+    assert response.json() == [
+        {"day": "2026-01-05", "action": "read", "count": 2},
+        {"day": "2026-01-06", "action": "login", "count": 1},
+        {"day": "2026-01-06", "action": "read", "count": 1},
+    ]
+
+
+def test_count_audit_events_flags_truncation(client, admin_headers, past_events):
+    """Test counts cut short by the limit say so"""
+    params = {"group_by": "day", "since": "2026-01-01", "until": "2026-02-01"}
+    
+    truncated = client.get("/api/v1/audit/counts", params={**params, "limit": 1}, headers=admin_headers)
+    complete = client.get("/api/v1/audit/counts", params={**params, "limit": 2}, headers=admin_headers)
+    
+    assert truncated.json() == [{"day": "2026-01-05", "count": 2}]
+    assert truncated.headers["X-Truncated"] == "true"
+    assert len(complete.json()) == 2
+    assert "X-Truncated" not in complete.headers
+
+
+def test_audit_api_requires_admin(client, test_doctor, admin_headers):
+    """Test only admins read the audit log and unknown groups are rejected"""
+    from app.core.security import create_access_token
+    token = create_access_token(data={"sub": str(test_doctor.id), "role": test_doctor.role.value})
+    
+    response = client.get("/api/v1/audit/logs", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+    
+    response = client.get("/api/v1/audit/counts", params={"group_by": "ip_address"}, headers=admin_headers)
+    assert response.status_code == 400
@@ -112,3 +112,222 @@ def test_get_current_user_without_token(client):
     response = client.get("/api/v1/auth/me")
     
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_login_hashing_pool_saturated(client, test_user, monkeypatch):
+    """Test login is shed with 503 when the hashing pool is full"""
+    from app.core.security import PasswordHashingBusy, password_pool
+    
+    def busy(*args):
+        raise PasswordHashingBusy("saturated")
+    
+    monkeypatch.setattr(password_pool, "verify", busy)
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": test_user.email,
+            "password": "testpassword123"
+        }
+    )
+    
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hashing_pool_rejects_over_capacity(monkeypatch):
+    """Test the hashing pool fails fast once workers and queue are full"""
+    import threading
+    from app.core import security
+    
+    release = threading.Event()
+    started = threading.Event()
+    
+    def slow_hash(password):
+        started.set()
+        release.wait(5)
+        return "hashed"
+    
+    monkeypatch.setattr(security, "_hash_in_worker", slow_hash)
+    pool = security.PasswordHashingPool(workers=1, max_pending=0, executor="thread")
+    
+    worker = threading.Thread(target=pool.hash, args=("first",))
+    worker.start()
+    started.wait(5)
+    
+    with pytest.raises(security.PasswordHashingBusy):
+        pool.hash("second")
+    
+    release.set()
+    worker.join()
+    pool.shutdown()
+    
+    stats = pool.stats()["hash"]
+    assert stats["calls"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_logout_revokes_token(client, test_user):
+    """Test a token stops working once its user logs out"""
+    token = client.post(
+        "/api/v1/auth/login",
+        json={"email": test_user.email, "password": "testpassword123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == status.HTTP_200_OK
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == status.HTTP_200_OK
+    
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_verified_token_is_cached(test_user, monkeypatch):
+    """Test a token's signature is checked once while its claims are cached"""
+    from app.core import security
+    from app.core.tokens import token_cache
+    
+    token = security.create_access_token(data={"sub": str(test_user.id)})
+    calls = []
+    decode = security.jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+    token_cache.clear()
+    
+    assert security.decode_token(token)["sub"] == str(test_user.id)
+    assert security.decode_token(token)["sub"] == str(test_user.id)
+    assert len(calls) == 1
+    assert token_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_token_cache_respects_expiry():
+    """Test cached claims are not served once the token has expired"""
+    import time
+    from app.core.tokens import TokenCache
+    
+    cache = TokenCache(maxsize=2)
+    cache.set("expired", {"sub": "a", "exp": time.time() - 1})
+    cache.set("valid", {"sub": "b", "exp": time.time() + 60})
+    cache.set("no-exp", {"sub": "c"})
+    
+    assert cache.get("expired") is None
+    assert cache.get("valid")["sub"] == "b"
+    assert cache.get("no-exp") is None
+    
+    cache.set("newer", {"sub": "d", "exp": time.time() + 60})
+    cache.set("newest", {"sub": "e", "exp": time.time() + 60})
+    assert cache.get("valid") is None
+
+
+def test_revocation_shared_through_backend():
+    """Test a token revoked by one worker is rejected by another"""
+    import time
+    from app.core.cache import MemoryCacheBackend
+    from app.core.tokens import RevokedTokens
+    
+    shared = MemoryCacheBackend()
+    first, second = RevokedTokens(backend=shared), RevokedTokens(backend=shared)
+    
+    first.revoke("digest", time.time() + 60)
+    first.revoke("stale", time.time() - 1)
+    
+    assert "digest" in second
+    assert "stale" not in second
+    assert "other" not in second
+
+
+def test_revocation_lookup_failure_is_explicit():
+    """Test tokens are rejected while the revocation backend is down, unless configured to fail open"""
+    import time
+    from app.core.tokens import RevokedTokens
+    
+    class DownBackend:
+        def get(self, key):
+            raise ConnectionError("redis down")
+        
+        def set(self, key, value, ttl):
+            raise ConnectionError("redis down")
+    
+    fail_closed = RevokedTokens(backend=DownBackend())
+    fail_open = RevokedTokens(backend=DownBackend(), fail_open=True)
+    fail_open.revoke("local", time.time() + 60)
+    
+    assert "digest" in fail_closed
+    assert "digest" not in fail_open
+    assert "local" in fail_open
+
+
+def login_tokens(client, user, password="testpassword123") -> dict:
+    return client.post("/api/v1/auth/login", json={"email": user.email, "password": password}).json()
+
+
+def test_refresh_rotates_without_password(client, test_user, monkeypatch):
+    """Test a refresh token buys new tokens without a password check, once"""
+    from app.core.security import password_pool
+    
+    tokens = login_tokens(client, test_user)
+    
+    def no_bcrypt(*args):
+        raise AssertionError("refresh must not verify a password")
+    
+    monkeypatch.setattr(password_pool, "verify", no_bcrypt)
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    
+    assert response.status_code == status.HTTP_200_OK
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert refreshed["expires_in"] == 30 * 60
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert response.json()["email"] == test_user.email
+
+
+def test_refresh_token_reuse_revokes_session(client, db, test_user):
+    """Test replaying a used refresh token revokes its successors too"""
+    from app.core.audit import audit_writer
+    from app.models.audit_log import AuditLog
+    
+    tokens = login_tokens(client, test_user)
+    refreshed = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    audit_writer.flush()
+    assert db.query(AuditLog).filter(AuditLog.status == "failure").count() == 2
+
+
+def test_refresh_token_of_deleted_user(client, db, test_user):
+    """Test a refresh token whose user no longer exists is rejected"""
+    from app.core.principals import principal_cache
+    from app.models.user import User
+    
+    tokens = login_tokens(client, test_user)
+    db.query(User).filter(User.id == test_user.id).delete()
+    db.commit()
+    principal_cache.clear()
+    
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Invalid refresh token"
+
+
+def test_refresh_token_rejected_after_logout_or_expiry(client, db, test_user):
+    """Test logging out or letting a refresh token expire ends the session"""
+    from datetime import datetime
+    from app.models.refresh_token import RefreshToken
+    
+    tokens = login_tokens(client, test_user)
+    client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    tokens = login_tokens(client, test_user)
+    db.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None)).update({"expires_at": datetime.utcnow()})
+    db.commit()
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Refresh token expired"
+    
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": "unknown"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
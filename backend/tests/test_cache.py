@@ -0,0 +1,96 @@
+"""Read cache tests"""
+import time
+import uuid
+from app.core.cache import MIN_TOMBSTONE_SECONDS, MemoryCacheBackend, ReadCache
+from app.schemas.user import UserResponse
+
+
+class FailingBackend:
+    """Backend that is always unreachable"""
+    
+    def get(self, key):
+        raise ConnectionError("cache down")
+    
+    def set(self, key, value, ttl):
+        raise ConnectionError("cache down")
+    
+    def add(self, key, value, ttl):
+        raise ConnectionError("cache down")
+    
+    def delete(self, *keys):
+        raise ConnectionError("cache down")
+
+
+def make_user() -> UserResponse:
+    return UserResponse(
+        id=uuid.uuid4(),
+        email="cached@example.com",
+        username="cached",
+        full_name="Cached User",
+        is_active=True,
+        is_verified=True,
+        created_at="2024-01-01T00:00:00",
+        updated_at="2024-01-01T00:00:00"
+    )
+
+
+def test_read_cache_round_trip():
+    """Test cached records come back as the requested schema"""
+    cache = ReadCache(MemoryCacheBackend())
+    user = make_user()
+    
+    assert cache.get("user", user.id, UserResponse) is None
+    cache.set("user", user.id, user)
+    
+    assert cache.get("user", user.id, UserResponse) == user
+    cache.invalidate("user", user.id)
+    assert cache.get("user", user.id, UserResponse) is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_read_cache_expires():
+    """Test entries expire after the TTL"""
+    cache = ReadCache(MemoryCacheBackend(), ttl=0)
+    user = make_user()
+    
+    cache.set("user", user.id, user)
+    time.sleep(0.01)
+    
+    assert cache.get("user", user.id, UserResponse) is None
+
+
+def test_read_cache_backend_errors_are_misses():
+    """Test an unreachable backend degrades to uncached reads"""
+    cache = ReadCache(FailingBackend())
+    user = make_user()
+    
+    cache.set("user", user.id, user)
+    cache.invalidate("user", user.id)
+    
+    assert cache.get("user", user.id, UserResponse) is None
+
+
+def test_read_cache_invalidate_blocks_late_fill_without_replicas():
+    """Test a read that loaded the record before a write cannot cache it after the invalidation"""
+    cache = ReadCache(MemoryCacheBackend(), stale_window=0)
+    before_write = make_user()
+    
+    # The reader misses and loads the record, then the writer commits and invalidates
+    assert cache.get("user", before_write.id, UserResponse) is None
+    cache.invalidate("user", before_write.id)
+    cache.set("user", before_write.id, before_write)
+    
+    assert cache.get("user", before_write.id, UserResponse) is None
+    assert cache.stale_window >= MIN_TOMBSTONE_SECONDS
+
+
+def test_read_cache_tombstone_blocks_stale_fill():
+    """Test a replica read cannot re-cache a record right after it was invalidated"""
+    cache = ReadCache(MemoryCacheBackend(), stale_window=60)
+    user = make_user()
+    
+    cache.set("user", user.id, user)
+    cache.invalidate("user", user.id)
+    cache.set("user", user.id, user)
+    
+    assert cache.get("user", user.id, UserResponse) is None
@@ -2,8 +2,12 @@
 import pytest
 from fastapi import status
 from datetime import datetime
+from sqlalchemy.exc import InvalidRequestError
 from app.models.patient import Patient
+from app.models.user import User
+from app.db.loading import WITH_TEXT
 from app.models.consultation import Consultation
+from app.schemas.consultation import ConsultationResponse
 from app.core.security import create_access_token
 
 
@@ -52,7 +56,8 @@ def test_list_consultations(client, test_user, test_doctor, auth_headers, db):
         patient_id=patient.id,
         doctor_id=test_doctor.id,
         consultation_date=datetime.utcnow(),
-        reason="Checkup"
+        reason="Checkup",
+        clinical_notes="Line one\nLine two \u00e9"
     )
     db.add(consultation)
     db.commit()
@@ -65,6 +70,8 @@ def test_list_consultations(client, test_user, test_doctor, auth_headers, db):
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert len(data) >= 1
+    # Rows are encoded directly; the output matches the response schema's
+    assert data[0] == ConsultationResponse.model_validate(consultation).model_dump(mode="json")
 
 
 def test_get_consultation(client, test_user, test_doctor, auth_headers, db):
@@ -147,3 +154,225 @@ def test_delete_consultation(client, test_user, test_doctor, auth_headers, db):
     )
     
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_bulk_create_consultations(client, test_user, test_doctor, auth_headers, db):
+    """Test creating consultations in bulk"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    item = {
+        "patient_id": str(patient.id),
+        "doctor_id": str(test_doctor.id),
+        "consultation_date": datetime.utcnow().isoformat(),
+        "reason": "Imported visit"
+    }
+    
+    response = client.post(
+        "/api/v1/consultations/bulk",
+        json=[item, {**item, "doctor_id": "00000000-0000-0000-0000-000000000000"}],
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["results"][1]["error"] == "Doctor not found"
+    assert db.query(Consultation).count() == 1
+
+
+def test_lazy_load_guard(test_user, test_doctor, db):
+    """Test relationships that were not eagerly loaded raise instead of querying"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    db.add(Consultation(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        consultation_date=datetime.utcnow(),
+        reason="Checkup"
+    ))
+    db.commit()
+    db.expunge_all()
+    
+    consultation = db.query(Consultation).first()
+    with pytest.raises(InvalidRequestError):
+        consultation.patient
+
+
+def test_list_consultations_sparse_fields(client, test_user, test_doctor, auth_headers, db, query_counter):
+    """Test ?fields= selects and returns only the requested columns"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    for i in range(3):
+        db.add(Consultation(
+            patient_id=patient.id,
+            doctor_id=test_doctor.id,
+            consultation_date=datetime.utcnow(),
+            clinical_notes="Long notes " * 100
+        ))
+    db.commit()
+    
+    client.get("/api/v1/consultations/?limit=1", headers=auth_headers)
+    query_counter.reset()
+    
+    response = client.get(
+        "/api/v1/consultations/?fields=consultation_date,status&limit=2",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert [set(item) for item in response.json()] == [{"consultation_date", "status"}] * 2
+    assert "clinical_notes" not in query_counter.statements[-1]
+    
+    # Pagination keys are selected even when not requested
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        f"/api/v1/consultations/?fields=consultation_date,status&cursor={cursor}",
+        headers=auth_headers
+    )
+    assert len(response.json()) == 1
+
+
+def test_sparse_fields_unknown_field(client, auth_headers):
+    """Test requesting a field the response does not have is rejected"""
+    response = client.get("/api/v1/consultations/?fields=status,password", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Unknown fields: password"
+
+
+def test_large_text_columns_deferred(test_user, test_doctor, db, query_counter):
+    """Test loading consultations leaves the large text columns out unless asked for"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    db.add(Consultation(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        consultation_date=datetime.utcnow(),
+        clinical_notes="Long notes"
+    ))
+    db.commit()
+    db.expunge_all()
+    query_counter.reset()
+    
+    db.query(Consultation).first()
+    assert "clinical_notes" not in query_counter.statements[-1]
+    
+    consultation = db.query(Consultation).options(*WITH_TEXT).populate_existing().first()
+    assert consultation.clinical_notes == "Long notes"
+    assert query_counter.count == 2
+
+
+def headers_for(user) -> dict:
+    token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_search_consultations_ranked(client, test_user, test_doctor, auth_headers, db):
+    """Test search returns matching consultations, diagnoses ranked above notes"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    in_notes, in_diagnosis, unrelated = [
+        Consultation(patient_id=patient.id, doctor_id=test_doctor.id, consultation_date=datetime.utcnow(), **text)
+        for text in (
+            {"clinical_notes": "Rule out pneumonia if the cough persists"},
+            {"diagnosis": "Community acquired pneumonia", "treatment_plan": "Amoxicillin"},
+            {"diagnosis": "Sprained ankle"},
+        )
+    ]
+    db.add_all([in_notes, in_diagnosis, unrelated])
+    db.commit()
+    
+    response = client.get("/api/v1/consultations/search?q=pneumonia", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data] == [str(in_diagnosis.id), str(in_notes.id)]
+    assert data[0]["rank"] > data[1]["rank"]
+    assert data[0]["diagnosis"] == "Community acquired pneumonia"
+    
+    # Every word must match; search syntax in the input is taken literally
+    response = client.get("/api/v1/consultations/search?q=pneumonia amoxicillin OR (", headers=auth_headers)
+    assert response.json() == []
+    response = client.get("/api/v1/consultations/search?q=pneumonia amoxicillin", headers=auth_headers)
+    assert [item["id"] for item in response.json()] == [str(in_diagnosis.id)]
+    
+    response = client.get("/api/v1/consultations/search?q=?!", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_follows_writes(client, test_user, test_doctor, auth_headers, db):
+    """Test the search index follows created, updated and deleted consultations"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    def search(q):
+        response = client.get(f"/api/v1/consultations/search?q={q}", headers=auth_headers)
+        return [item["id"] for item in response.json()]
+    
+    consultation_id = client.post(
+        "/api/v1/consultations/",
+        json={
+            "patient_id": str(patient.id),
+            "doctor_id": str(test_doctor.id),
+            "consultation_date": datetime.utcnow().isoformat(),
+            "diagnosis": "Migraine"
+        },
+        headers=auth_headers
+    ).json()["id"]
+    assert search("migraine") == [consultation_id]
+    
+    client.put(f"/api/v1/consultations/{consultation_id}", json={"diagnosis": "Tension headache"}, headers=auth_headers)
+    assert search("migraine") == []
+    assert search("headache") == [consultation_id]
+    
+    client.delete(f"/api/v1/consultations/{consultation_id}", headers=auth_headers)
+    assert search("headache") == []
+
+
+def test_search_access(client, test_user, test_doctor, test_admin, db):
+    """Test search only returns consultations the caller may view"""
+    other_doctor = User(
+        email="other.doctor@example.com",
+        username="otherdoctor",
+        full_name="Other Doctor",
+        hashed_password="x",
+        role="doctor",
+        is_active=True
+    )
+    other_patient_user = User(
+        email="other.patient@example.com",
+        username="otherpatient",
+        full_name="Other Patient",
+        hashed_password="x",
+        role="patient",
+        is_active=True
+    )
+    db.add_all([other_doctor, other_patient_user])
+    db.commit()
+    patient, other_patient = Patient(user_id=test_user.id), Patient(user_id=other_patient_user.id)
+    db.add_all([patient, other_patient])
+    db.commit()
+    own, others = [
+        Consultation(patient_id=p.id, doctor_id=test_doctor.id, consultation_date=datetime.utcnow(), diagnosis="Asthma")
+        for p in (patient, other_patient)
+    ]
+    db.add_all([own, others])
+    db.commit()
+    
+    def search(user):
+        response = client.get("/api/v1/consultations/search?q=asthma", headers=headers_for(user))
+        return {item["id"] for item in response.json()}
+    
+    assert search(test_user) == {str(own.id)}
+    assert search(test_doctor) == {str(own.id), str(others.id)}
+    assert search(other_doctor) == set()
+    assert search(test_admin) == {str(own.id), str(others.id)}
@@ -0,0 +1,105 @@
+"""Prescription expiry sweeper tests"""
+import time
+import pytest
+from datetime import datetime, timedelta
+from prometheus_client import REGISTRY
+from app.core.expiry import PrescriptionExpirySweeper
+from app.core.security import create_access_token
+from app.models.audit_log import AuditAction, AuditLog
+from app.models.patient import Patient
+from app.models.prescription import Prescription, PrescriptionStatus
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def patient(db, test_user):
+    """Create a patient record for the test user"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    return patient
+
+
+def prescription(patient, doctor, expiry_date, status=PrescriptionStatus.ACTIVE) -> Prescription:
+    return Prescription(
+        patient_id=patient.id,
+        doctor_id=doctor.id,
+        medication_name="Amoxicillin",
+        dosage="250mg",
+        frequency="3 times daily",
+        duration="10 days",
+        route="oral",
+        status=status,
+        expiry_date=expiry_date
+    )
+
+
+def test_sweep_expires_overdue_in_batches(db, patient, test_doctor):
+    """Test only active prescriptions past expiry expire, one audit entry per batch"""
+    now = datetime.utcnow()
+    overdue = [prescription(patient, test_doctor, now - timedelta(days=day)) for day in range(1, 6)]
+    kept = [
+        prescription(patient, test_doctor, now + timedelta(days=1)),
+        prescription(patient, test_doctor, None),
+        prescription(patient, test_doctor, now - timedelta(days=1), PrescriptionStatus.COMPLETED),
+    ]
+    db.add_all(overdue + kept)
+    db.commit()
+    expired_before = REGISTRY.get_sample_value("prescriptions_expired_total") or 0.0
+    runs_before = REGISTRY.get_sample_value("prescription_expiry_run_duration_seconds_count") or 0.0
+    sweeper = PrescriptionExpirySweeper(session_factory=TestingSessionLocal, batch_size=2)
+    
+    assert sweeper.sweep(now) == 5
+    
+    db.expire_all()
+    assert {p.status for p in overdue} == {PrescriptionStatus.EXPIRED}
+    assert [p.status for p in kept] == [
+        PrescriptionStatus.ACTIVE, PrescriptionStatus.ACTIVE, PrescriptionStatus.COMPLETED
+    ]
+    audits = db.query(AuditLog).filter(AuditLog.resource_type == "prescription").all()
+    assert sorted(audit.description.split()[1] for audit in audits) == ["1", "2", "2"]
+    assert {(audit.action, audit.user_id, audit.resource_id) for audit in audits} == {
+        (AuditAction.UPDATE, None, None)
+    }
+    assert REGISTRY.get_sample_value("prescriptions_expired_total") == expired_before + 5
+    assert REGISTRY.get_sample_value("prescription_expiry_run_duration_seconds_count") == runs_before + 1
+    
+    # Nothing is left to expire, so a second run writes nothing
+    assert sweeper.sweep(now) == 0
+    assert db.query(AuditLog).filter(AuditLog.resource_type == "prescription").count() == 3
+
+
+def test_sweep_invalidates_cached_prescription(client, db, patient, test_doctor):
+    """Test an expired prescription is not served from the read cache as active"""
+    record = prescription(patient, test_doctor, datetime.utcnow() - timedelta(hours=1))
+    db.add(record)
+    db.commit()
+    token = create_access_token(data={"sub": str(test_doctor.id), "role": test_doctor.role.value})
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    assert client.get(f"/api/v1/prescriptions/{record.id}", headers=headers).json()["status"] == "active"
+    
+    PrescriptionExpirySweeper(session_factory=TestingSessionLocal).sweep()
+    
+    assert client.get(f"/api/v1/prescriptions/{record.id}", headers=headers).json()["status"] == "expired"
+
+
+def test_sweeper_runs_in_background(db, patient, test_doctor):
+    """Test the background worker sweeps on start and stops cleanly"""
+    record = prescription(patient, test_doctor, datetime.utcnow() - timedelta(hours=1))
+    db.add(record)
+    db.commit()
+    sweeper = PrescriptionExpirySweeper(session_factory=TestingSessionLocal, interval=60)
+    
+    sweeper.start()
+    try:
+        for _ in range(100):
+            db.expire_all()
+            if db.get(Prescription, record.id).status == PrescriptionStatus.EXPIRED:
+                break
+            time.sleep(0.02)
+    finally:
+        sweeper.stop()
+    
+    assert not sweeper.is_running
+    assert db.get(Prescription, record.id).status == PrescriptionStatus.EXPIRED
@@ -0,0 +1,85 @@
+"""Request metrics tests"""
+import logging
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+from app.main import app
+from app.core.metrics import MetricsMiddleware
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def doctor_headers(test_doctor):
+    """Create authorization headers for test doctor"""
+    token = create_access_token(data={"sub": str(test_doctor.id), "role": test_doctor.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def metrics_middleware(client):
+    """Get the app's metrics middleware"""
+    layer = app.middleware_stack
+    while not isinstance(layer, MetricsMiddleware):
+        layer = layer.app
+    return layer
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_metrics_per_route(client, test_user, doctor_headers):
+    """Test a request is counted under its route template with its queries and size"""
+    patient_id = client.post(
+        "/api/v1/patients/", json={"user_id": str(test_user.id)}, headers=doctor_headers
+    ).json()["id"]
+    route = {"method": "GET", "route": "/api/v1/patients/{patient_id}"}
+    before = {
+        name: sample(name, **route)
+        for name in ("http_request_db_queries_count", "http_request_db_queries_sum", "http_response_size_bytes_sum")
+    }
+    latency_before = sample("http_request_duration_seconds_count", status="200", **route)
+    
+    response = client.get(f"/api/v1/patients/{patient_id}", headers=doctor_headers)
+    
+    assert sample("http_request_duration_seconds_count", status="200", **route) == latency_before + 1
+    assert sample("http_request_db_queries_count", **route) == before["http_request_db_queries_count"] + 1
+    assert sample("http_request_db_queries_sum", **route) > before["http_request_db_queries_sum"]
+    assert sample("http_response_size_bytes_sum", **route) == (
+        before["http_response_size_bytes_sum"] + len(response.content)
+    )
+
+
+def test_unmatched_paths_share_a_label(client):
+    """Test unknown paths are counted under one route label"""
+    before = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+    
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+    
+    assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == before + 2
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics serves the Prometheus text format"""
+    client.get("/health")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+
+
+def test_slow_request_logged_with_sql(client, test_user, test_doctor, doctor_headers, metrics_middleware, monkeypatch, caplog):
+    """Test requests over the threshold are logged with their statements but no parameters"""
+    monkeypatch.setattr(metrics_middleware, "slow_request_seconds", 0)
+    
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        client.get(f"/api/v1/users/{test_user.id}", headers=doctor_headers)
+    
+    message = caplog.records[-1].getMessage()
+    assert message.startswith(f"Slow request GET /api/v1/users/{test_user.id} -> 403")
+    assert "SELECT" in message
+    # The principal lookup's parameter is the doctor's id
+    assert test_doctor.id.hex not in message and str(test_doctor.id) not in message
@@ -0,0 +1,82 @@
+"""Migration tests"""
+import uuid
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from app.db.base import Base
+from app.db.init_db import (
+    SchemaVersionError,
+    alembic_config,
+    check_schema_version,
+    current_revision,
+    head_revision,
+    upgrade_db,
+)
+from app.db.search import include_object
+
+
+@pytest.fixture
+def migration_engine(tmp_path):
+    """Create an empty database for migrations"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_match_models(migration_engine):
+    """Test upgrading to head builds exactly the schema the models declare"""
+    upgrade_db(migration_engine)
+    
+    with migration_engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": False, "include_object": include_object})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_migrations_downgrade(migration_engine):
+    """Test every migration can be reverted"""
+    upgrade_db(migration_engine)
+    with migration_engine.begin() as connection:
+        command.downgrade(alembic_config(connection), "base")
+    
+    assert inspect(migration_engine).get_table_names() == ["alembic_version"]
+
+
+def test_check_schema_version(migration_engine):
+    """Test the startup check only passes once the database is at head"""
+    with pytest.raises(SchemaVersionError):
+        check_schema_version(migration_engine)
+    
+    upgrade_db(migration_engine)
+    
+    check_schema_version(migration_engine)
+    assert current_revision(migration_engine) == head_revision()
+
+
+def test_upgrade_adopts_create_all_schema(migration_engine):
+    """Test databases built by create_all are stamped and migrated instead of recreated"""
+    Base.metadata.create_all(bind=migration_engine)
+    
+    upgrade_db(migration_engine)
+    
+    assert current_revision(migration_engine) == head_revision()
+
+
+def test_audit_daily_counts_backfill(migration_engine):
+    """Test migration 0008 counts the audit events logged before it"""
+    upgrade_db(migration_engine, "0007")
+    with migration_engine.begin() as connection:
+        for hour in (9, 10, 11):
+            connection.exec_driver_sql(
+                "INSERT INTO audit_logs (id, user_id, action, resource_type, status, timestamp) "
+                f"VALUES ('{uuid.uuid4().hex}', NULL, 'READ', 'patient', 'success', '2026-01-05 {hour:02d}:00:00.000000')"
+            )
+    
+    upgrade_db(migration_engine)
+    
+    with migration_engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT day, user_id, action, resource_type, events FROM audit_daily_counts"
+        ).all()
+    assert rows == [("2026-01-05", uuid.UUID(int=0).hex, "READ", "patient", 3)]
@@ -1,7 +1,11 @@
 """Patient tests"""
 import pytest
 from fastapi import status
+from datetime import datetime, timedelta
 from app.models.patient import Patient
+from app.models.user import User
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription
 from app.core.security import create_access_token
 
 
@@ -92,6 +96,21 @@ def test_get_patient(client, test_user, test_doctor, auth_headers, db):
     assert data["blood_type"] == "A+"
 
 
+def test_get_patient_sparse_fields(client, test_user, test_doctor, auth_headers, db):
+    """Test getting only some fields of a patient"""
+    patient = Patient(user_id=test_user.id, blood_type="A+", allergies="Penicillin")
+    db.add(patient)
+    db.commit()
+    
+    response = client.get(
+        f"/api/v1/patients/{patient.id}?fields=blood_type,allergies",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"blood_type": "A+", "allergies": "Penicillin"}
+
+
 def test_get_patient_not_found(client, auth_headers):
     """Test getting nonexistent patient"""
     response = client.get(
@@ -139,3 +158,219 @@ def test_delete_patient(client, test_user, test_doctor, auth_headers, db):
     )
     
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Create authorization headers for test admin"""
+    token = create_access_token(data={"sub": str(test_admin.id), "role": test_admin.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_export_patients_ndjson(client, test_user, test_admin, admin_headers, db):
+    """Test streaming patients as NDJSON records one audit event"""
+    import json
+    from app.core.audit import audit_writer
+    from app.models.audit_log import AuditLog, AuditAction
+    
+    patient = Patient(user_id=test_user.id, blood_type="A+")
+    db.add(patient)
+    db.commit()
+    
+    response = client.get("/api/v1/patients/export", headers=admin_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["id"] == str(patient.id)
+    assert rows[0]["blood_type"] == "A+"
+    
+    audit_writer.flush()
+    exports = db.query(AuditLog).filter(AuditLog.action == AuditAction.EXPORT).all()
+    assert len(exports) == 1
+
+
+def test_export_patients_csv(client, test_user, test_admin, admin_headers, db):
+    """Test streaming patients as CSV"""
+    import csv
+    import io
+    
+    patient = Patient(user_id=test_user.id, gender="F")
+    db.add(patient)
+    db.commit()
+    
+    response = client.get("/api/v1/patients/export", params={"format": "csv"}, headers=admin_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["gender"] == "F"
+    assert rows[0]["allergies"] == ""
+
+
+def test_export_patients_requires_admin(client, auth_headers):
+    """Test non-admins cannot export patients"""
+    response = client.get("/api/v1/patients/export", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_delete_patient_with_records(client, test_user, test_doctor, auth_headers, db):
+    """Test deleting a patient cascades to consultations and prescriptions"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    consultation = Consultation(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        consultation_date=datetime.utcnow(),
+        reason="Checkup"
+    )
+    db.add(consultation)
+    db.commit()
+    
+    db.add(Prescription(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        consultation_id=consultation.id,
+        medication_name="Aspirin",
+        dosage="100mg",
+        frequency="1 time daily",
+        duration="30 days",
+        route="oral"
+    ))
+    db.commit()
+    
+    response = client.delete(
+        f"/api/v1/patients/{patient.id}",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    db.expire_all()
+    assert db.query(Consultation).count() == 0
+    assert db.query(Prescription).count() == 0
+
+
+def test_get_patient_chart(client, test_user, test_doctor, auth_headers, db, query_counter):
+    """Test the patient chart nests consultations and prescriptions within the date window"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    for days_ago in (1, 10, 40):
+        db.add(Consultation(
+            patient_id=patient.id,
+            doctor_id=test_doctor.id,
+            consultation_date=datetime.utcnow() - timedelta(days=days_ago),
+            reason=f"Visit {days_ago}"
+        ))
+        db.add(Prescription(
+            patient_id=patient.id,
+            doctor_id=test_doctor.id,
+            medication_name=f"Medication {days_ago}",
+            dosage="100mg",
+            frequency="1 time daily",
+            duration="30 days",
+            route="oral",
+            prescribed_date=datetime.utcnow() - timedelta(days=days_ago)
+        ))
+    db.commit()
+    
+    # Warm the principal cache so only the handler's queries are counted
+    client.get(f"/api/v1/patients/{patient.id}/chart", headers=auth_headers)
+    query_counter.reset()
+    
+    response = client.get(
+        f"/api/v1/patients/{patient.id}/chart",
+        params={"since": (datetime.utcnow() - timedelta(days=30)).isoformat()},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["id"] == str(patient.id)
+    assert [c["reason"] for c in data["consultations"]] == ["Visit 1", "Visit 10"]
+    assert [p["medication_name"] for p in data["prescriptions"]] == ["Medication 1", "Medication 10"]
+    assert query_counter.count == 3
+
+
+def test_get_patient_chart_forbidden(client, test_user, test_doctor, db):
+    """Test patients cannot view another patient's chart"""
+    patient = Patient(user_id=test_doctor.id)
+    db.add(patient)
+    db.commit()
+    
+    token = create_access_token(data={"sub": str(test_user.id), "role": test_user.role.value})
+    response = client.get(
+        f"/api/v1/patients/{patient.id}/chart",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.fixture
+def front_desk_patients(db):
+    """Create patients with distinct names, contact details and insurance numbers"""
+    people = [
+        ("Maria Smithson", "maria@example.com", "+15550101", "INS-1001"),
+        ("John Smith", "jsmith@example.com", "+15550202", "INS-2002"),
+        ("Ana Blacksmith", "ana@example.com", "+44770303", "XYZ-100_1"),
+    ]
+    patients = []
+    for index, (full_name, email, phone, insurance_number) in enumerate(people):
+        user = User(
+            email=email, username=f"patient{index}", full_name=full_name, hashed_password="x",
+            role="patient", is_active=True, phone=phone
+        )
+        db.add(user)
+        db.flush()
+        patients.append(Patient(user_id=user.id, insurance_number=insurance_number))
+    db.add_all(patients)
+    db.commit()
+    return {full_name: str(patient.id) for (full_name, *_), patient in zip(people, patients)}
+
+
+def test_search_patients(client, auth_headers, front_desk_patients):
+    """Test the typeahead matches names and emails anywhere, numbers by prefix"""
+    def search(q, **params):
+        response = client.get("/api/v1/patients/search", params={"q": q, **params}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return [item["full_name"] for item in response.json()]
+    
+    # Names with a word starting with the text first, then the rest by name
+    assert search("smith") == ["John Smith", "Maria Smithson", "Ana Blacksmith"]
+    assert search("smith", limit=1) == ["John Smith"]
+    assert search("MARIA@") == ["Maria Smithson"]
+    assert search("+4477") == ["Ana Blacksmith"]
+    assert search("INS-2") == ["John Smith"]
+    assert search("0202") == []
+    # Wildcards in the text match literally
+    assert search("100_") == []
+    assert search("XYZ-100_") == ["Ana Blacksmith"]
+    
+    response = client.get("/api/v1/patients/search", params={"q": "John"}, headers=auth_headers)
+    assert response.json()[0] == {
+        "id": front_desk_patients["John Smith"],
+        "user_id": response.json()[0]["user_id"],
+        "full_name": "John Smith",
+        "email": "jsmith@example.com",
+        "phone": "+15550202",
+        "date_of_birth": None,
+        "insurance_number": "INS-2002",
+    }
+
+
+def test_search_patients_validation(client, auth_headers, test_user):
+    """Test short searches and callers without the list permission are refused"""
+    response = client.get("/api/v1/patients/search", params={"q": "jo"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    token = create_access_token(data={"sub": str(test_user.id), "role": test_user.role.value})
+    response = client.get(
+        "/api/v1/patients/search", params={"q": "john"}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,105 @@
+"""Permission mask tests"""
+import pytest
+from fastapi import status
+from app.core.permissions import (
+    PERMISSION_BITS, ROLE_MASKS, ROLE_PERMISSIONS, Permission, has_permission, permission_mask, permissions_from_mask
+)
+from app.core.principals import Principal
+from app.core.security import create_access_token, decode_token, hash_password
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+def test_nurse(db):
+    """Create test nurse"""
+    nurse = User(
+        email="nurse@example.com",
+        username="testnurse",
+        full_name="Test Nurse",
+        hashed_password=hash_password("nursepass123"),
+        role="nurse",
+        is_active=True,
+        is_verified=True
+    )
+    db.add(nurse)
+    db.commit()
+    db.refresh(nurse)
+    return nurse
+
+
+def headers_for(user, **claims) -> dict:
+    token = create_access_token(data={"sub": str(user.id), "role": user.role.value, **claims})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_role_masks_match_table():
+    """Test every role's mask holds exactly its listed permissions"""
+    assert len(set(PERMISSION_BITS.values())) == len(Permission)
+    for role in UserRole:
+        assert set(permissions_from_mask(ROLE_MASKS[role])) == set(ROLE_PERMISSIONS[role])
+        for permission in Permission:
+            assert has_permission(role, permission) == (permission in ROLE_PERMISSIONS[role])
+
+
+def test_permission_bits_are_stable():
+    """Test existing permissions keep the bits carried by issued tokens"""
+    assert PERMISSION_BITS[Permission.CREATE_USER] == 1
+    assert PERMISSION_BITS[Permission.READ_AUDIT_LOG] == 1 << 17
+    assert PERMISSION_BITS[Permission.EXPORT_RECORDS] == 1 << 19
+
+
+def test_principal_can():
+    """Test a principal's checks follow its role mask"""
+    nurse = Principal(
+        id=None, email="nurse@example.com", role=UserRole.NURSE, is_active=True,
+        permissions=ROLE_MASKS[UserRole.NURSE]
+    )
+    
+    assert nurse.can(Permission.READ_PATIENT)
+    assert not nurse.can(Permission.UPDATE_PATIENT)
+
+
+def test_login_token_carries_mask(client, test_doctor):
+    """Test the access token carries the role's permission mask"""
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": test_doctor.email, "password": "doctorpass123"}
+    )
+    
+    payload = decode_token(response.json()["access_token"])
+    assert payload["perms"] == ROLE_MASKS[UserRole.DOCTOR]
+
+
+def test_require_rejects_missing_permission(client, test_nurse):
+    """Test a role without the permission is refused before the handler runs"""
+    response = client.get("/api/v1/patients/", headers=headers_for(test_nurse))
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["detail"] == "Permission required: list_patients"
+
+
+def test_nurse_reads_but_cannot_update_patient(client, test_user, test_doctor, test_nurse):
+    """Test a nurse can read any patient record but not update it"""
+    patient_id = client.post(
+        "/api/v1/patients/", json={"user_id": str(test_user.id)}, headers=headers_for(test_doctor)
+    ).json()["id"]
+    nurse = headers_for(test_nurse)
+    
+    assert client.get(f"/api/v1/patients/{patient_id}", headers=nurse).status_code == status.HTTP_200_OK
+    response = client.put(f"/api/v1/patients/{patient_id}", json={"allergies": "None"}, headers=nurse)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_token_mask_narrows_role(client, test_doctor):
+    """Test a token scoped below its role cannot use the missing permissions"""
+    scoped = permission_mask(Permission.READ_PATIENT)
+    
+    response = client.get("/api/v1/patients/", headers=headers_for(test_doctor, perms=scoped))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    # The role caps the mask: a token cannot grant more than the role holds
+    response = client.get("/api/v1/users/", headers=headers_for(test_doctor, perms=ROLE_MASKS[UserRole.ADMIN]))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    response = client.get("/api/v1/patients/", headers=headers_for(test_doctor))
+    assert response.status_code == status.HTTP_200_OK
@@ -2,9 +2,12 @@
 import pytest
 from fastapi import status
 from datetime import datetime
+from app.models.user import User
 from app.models.patient import Patient
 from app.models.prescription import Prescription
+from app.schemas.prescription import PrescriptionResponse
 from app.core.security import create_access_token
+from app.core.cache import read_cache
 
 
 @pytest.fixture
@@ -71,6 +74,7 @@ def test_list_prescriptions(client, test_user, test_doctor, auth_headers, db):
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert len(data) >= 1
+    assert data[0] == PrescriptionResponse.model_validate(prescription).model_dump(mode="json")
 
 
 def test_get_prescription(client, test_user, test_doctor, auth_headers, db):
@@ -161,3 +165,249 @@ def test_delete_prescription(client, test_user, test_doctor, auth_headers, db):
     )
     
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_list_prescriptions_cursor_pagination(client, test_user, test_doctor, auth_headers, db):
+    """Test paging through prescriptions with keyset cursors"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    for i in range(5):
+        db.add(Prescription(
+            patient_id=patient.id,
+            doctor_id=test_doctor.id,
+            medication_name=f"Medication {i}",
+            dosage="10mg",
+            frequency="1 time daily",
+            duration="30 days",
+            route="oral"
+        ))
+    db.commit()
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/prescriptions/", params=params, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_list_prescriptions_invalid_cursor(client, auth_headers):
+    """Test a malformed cursor is rejected"""
+    response = client.get(
+        "/api/v1/prescriptions/",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_create_prescriptions(client, test_user, test_doctor, auth_headers, db):
+    """Test creating prescriptions in bulk with per-item results"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    item = {
+        "patient_id": str(patient.id),
+        "doctor_id": str(test_doctor.id),
+        "medication_name": "Aspirin",
+        "dosage": "500mg",
+        "frequency": "2 times daily",
+        "duration": "7 days",
+        "route": "oral"
+    }
+    missing_patient = {**item, "patient_id": "00000000-0000-0000-0000-000000000000"}
+    
+    response = client.post(
+        "/api/v1/prescriptions/bulk",
+        json=[item, missing_patient, {**item, "medication_name": "Ibuprofen"}],
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 1
+    assert data["results"][1] == {
+        "index": 1,
+        "id": None,
+        "status": "failed",
+        "error": "Patient not found"
+    }
+    assert db.query(Prescription).count() == 2
+
+
+def test_bulk_update_prescriptions(client, test_user, test_doctor, auth_headers, db):
+    """Test updating prescriptions in bulk"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    prescription = Prescription(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        medication_name="Lisinopril",
+        dosage="10mg",
+        frequency="1 time daily",
+        duration="30 days",
+        route="oral"
+    )
+    db.add(prescription)
+    db.commit()
+    
+    response = client.put(
+        "/api/v1/prescriptions/bulk",
+        json=[
+            {"id": str(prescription.id), "refills": 3},
+            {"id": "00000000-0000-0000-0000-000000000000", "refills": 1}
+        ],
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["results"][1]["error"] == "Prescription not found"
+    
+    db.refresh(prescription)
+    assert prescription.refills == 3
+
+
+def test_bulk_create_prescriptions_empty(client, auth_headers):
+    """Test an empty bulk request is rejected"""
+    response = client.post("/api/v1/prescriptions/bulk", json=[], headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_prescription_query_count(client, test_user, test_doctor, auth_headers, db, query_counter):
+    """Test reading a prescription loads its patient in the same query"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    prescription = Prescription(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        medication_name="Metformin",
+        dosage="500mg",
+        frequency="2 times daily",
+        duration="30 days",
+        route="oral"
+    )
+    db.add(prescription)
+    db.commit()
+    
+    # Warm the principal cache so only the handler's queries are counted
+    client.get(f"/api/v1/prescriptions/{prescription.id}", headers=auth_headers)
+    read_cache.invalidate("prescription", prescription.id)
+    query_counter.reset()
+    
+    response = client.get(
+        f"/api/v1/prescriptions/{prescription.id}",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert query_counter.count == 1
+
+
+def test_get_prescription_cached(client, test_user, test_doctor, auth_headers, db, query_counter):
+    """Test repeated reads are served from the cache but still access checked"""
+    patient = Patient(user_id=test_user.id)
+    db.add(patient)
+    db.commit()
+    
+    prescription = Prescription(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        medication_name="Metformin",
+        dosage="500mg",
+        frequency="2 times daily",
+        duration="30 days",
+        route="oral"
+    )
+    db.add(prescription)
+    db.commit()
+    
+    client.get(f"/api/v1/prescriptions/{prescription.id}", headers=auth_headers)
+    query_counter.reset()
+    
+    response = client.get(f"/api/v1/prescriptions/{prescription.id}", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["medication_name"] == "Metformin"
+    assert "patient_user_id" not in response.json()
+    assert query_counter.count == 0
+    
+    other = User(
+        email="other@example.com",
+        username="otherpatient",
+        full_name="Other Patient",
+        hashed_password="x",
+        role="patient"
+    )
+    db.add(other)
+    db.commit()
+    token = create_access_token(data={"sub": str(other.id), "role": "patient"})
+    
+    response = client.get(
+        f"/api/v1/prescriptions/{prescription.id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_dispense_prescription_invalidates_cache(client, test_user, test_doctor, auth_headers, db):
+    """Test dispensing a prescription is visible on the next read"""
+    pharmacist = User(
+        email="pharmacist@example.com",
+        username="testpharmacist",
+        full_name="Test Pharmacist",
+        hashed_password="x",
+        role="pharmacist"
+    )
+    patient = Patient(user_id=test_user.id)
+    db.add_all([pharmacist, patient])
+    db.commit()
+    
+    prescription = Prescription(
+        patient_id=patient.id,
+        doctor_id=test_doctor.id,
+        medication_name="Amoxicillin",
+        dosage="250mg",
+        frequency="3 times daily",
+        duration="10 days",
+        route="oral"
+    )
+    db.add(prescription)
+    db.commit()
+    
+    response = client.get(f"/api/v1/prescriptions/{prescription.id}", headers=auth_headers)
+    assert response.json()["status"] == "active"
+    
+    token = create_access_token(data={"sub": str(pharmacist.id), "role": "pharmacist"})
+    response = client.post(
+        f"/api/v1/prescriptions/{prescription.id}/dispense",
+        json={"dispensed_by": str(pharmacist.id)},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = client.get(f"/api/v1/prescriptions/{prescription.id}", headers=auth_headers)
+    
+    assert response.json()["status"] == "completed"
+    assert response.json()["dispensed_by"] == str(pharmacist.id)
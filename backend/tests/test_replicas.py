@@ -0,0 +1,140 @@
+"""Read replica routing tests
+
+Two SQLite files stand in for the replicas. They start with the schema but
+none of the primary's rows, so a response shows which database served it.
+"""
+import time
+import uuid
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from app.db.base import Base
+from app.db.replicas import ReplicaRouter, ReplicaSession
+from app.db.session import replica_router
+from app.core.cache import MemoryCacheBackend
+from app.core.security import create_access_token
+from app.models.audit_log import AuditLog, AuditAction
+from app.models.user import User
+from tests.conftest import engine as primary
+
+
+@pytest.fixture
+def replica_engines(tmp_path):
+    """Create two empty stand-in replicas"""
+    engines = [
+        create_engine(f"sqlite:///{tmp_path / f'replica{i}.db'}", connect_args={"check_same_thread": False})
+        for i in range(2)
+    ]
+    for replica in engines:
+        Base.metadata.create_all(bind=replica)
+    yield engines
+    for replica in engines:
+        replica.dispose()
+
+
+@pytest.fixture
+def replicas(replica_engines, monkeypatch):
+    """Route the app's reads to the stand-in replicas, one second behind the primary"""
+    monkeypatch.setattr(replica_router, "replicas", replica_engines)
+    monkeypatch.setattr(replica_router, "recent_writes", MemoryCacheBackend())
+    monkeypatch.setattr(replica_router, "lag_probe", lambda replica: 1.0)
+    monkeypatch.setattr(replica_router, "lag_check_interval", 0)
+    monkeypatch.setattr(replica_router, "_lag", {})
+    return replica_engines
+
+
+def headers_for(user) -> dict:
+    token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_round_robin(replica_engines):
+    """Test reads alternate between replicas"""
+    router = ReplicaRouter(replica_engines, lag_probe=lambda replica: 0.0)
+    
+    chosen = [router.choose() for _ in range(4)]
+    
+    assert chosen == replica_engines * 2
+    assert router.stats() == {"replica": 4, "primary": 0}
+
+
+def test_least_connections(replica_engines):
+    """Test the replica with fewer checked-out connections is preferred"""
+    router = ReplicaRouter(replica_engines, strategy="least_connections", lag_probe=lambda replica: 0.0)
+    
+    with replica_engines[0].connect():
+        chosen = {router.choose() for _ in range(4)}
+    
+    assert chosen == {replica_engines[1]}
+
+
+def test_lagging_replica_is_skipped(replica_engines):
+    """Test replicas beyond the lag limit are skipped and reads fall back to the primary"""
+    lag = {replica_engines[0]: 30.0, replica_engines[1]: 0.5}
+    router = ReplicaRouter(replica_engines, max_lag=5.0, lag_check_interval=0, lag_probe=lag.get)
+    
+    assert {router.choose() for _ in range(4)} == {replica_engines[1]}
+    
+    lag[replica_engines[1]] = 10.0
+    assert router.choose() is None
+    assert router.stats() == {"replica": 4, "primary": 1}
+
+
+def test_failed_lag_check_takes_replica_out(replica_engines):
+    """Test a replica whose lag cannot be measured is not read from"""
+    def probe(replica):
+        if replica is replica_engines[0]:
+            raise ConnectionError("replica down")
+        return 0.0
+    
+    router = ReplicaRouter(replica_engines, lag_probe=probe)
+    
+    assert {router.choose() for _ in range(4)} == {replica_engines[1]}
+
+
+def test_recent_writer_reads_from_primary(replica_engines):
+    """Test a user's reads stay on the primary until the replicas have their write"""
+    router = ReplicaRouter(replica_engines, lag_check_interval=0, lag_probe=lambda replica: 1.0)
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+    
+    router.record_write(writer)
+    
+    assert router.choose(writer) is None
+    assert router.choose(reader) in replica_engines
+    
+    # A replica one second behind has a write made two seconds ago
+    router.recent_writes.set(router._write_key(writer), str(time.time() - 2).encode(), 60)
+    assert router.choose(writer) in replica_engines
+
+
+def test_replica_session_writes_to_primary(db, test_user, replica_engines):
+    """Test a replica session's writes and later reads go to the primary"""
+    session = ReplicaSession(bind=primary)
+    session.replica = replica_engines[0]
+    
+    assert session.query(User).count() == 0
+    session.add(AuditLog(user_id=test_user.id, action=AuditAction.READ, resource_type="patient"))
+    session.commit()
+    
+    assert session.query(User).count() == 1
+    assert session.query(AuditLog).count() == 1
+    session.close()
+    with ReplicaSession(bind=replica_engines[0]) as replica:
+        assert replica.query(AuditLog).count() == 0
+
+
+def test_list_reads_from_replica(client, db, test_user, test_doctor, test_admin, replicas):
+    """Test list handlers read from a replica except right after the caller's own write"""
+    doctor, admin = headers_for(test_doctor), headers_for(test_admin)
+    
+    response = client.get("/api/v1/patients/", headers=doctor)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    
+    response = client.post("/api/v1/patients/", json={"user_id": str(test_user.id)}, headers=doctor)
+    assert response.status_code == status.HTTP_201_CREATED
+    
+    # The doctor sees their new patient; the replicas have not replayed it yet
+    assert len(client.get("/api/v1/patients/", headers=doctor).json()) == 1
+    assert client.get("/api/v1/patients/", headers=admin).json() == []
+    assert replica_router.stats()["primary"] >= 1
@@ -0,0 +1,70 @@
+"""Server profile tests"""
+import logging
+import pytest
+from app.config import settings
+from app.core.server import AsyncAccessLog, engine_pool_limits, pool_limits, sql_echo, worker_count
+
+
+@pytest.mark.parametrize("workers", [1, 3, 4, 9, 17])
+def test_pool_limits_stay_within_budget(monkeypatch, workers):
+    """Test all workers' pools together never exceed the connection budget"""
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 90)
+    
+    pool_size, max_overflow = pool_limits(workers)
+    
+    assert pool_size >= 1
+    assert (pool_size + max_overflow) * workers <= 90
+
+
+@pytest.mark.parametrize("workers", [1, 3, 4, 9, 15])
+def test_async_mode_engines_share_worker_pool(monkeypatch, workers):
+    """Test the sync and async engines of a worker together stay within its share"""
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 30)
+    
+    sync_limits, async_limits = engine_pool_limits(workers, mode="async")
+    
+    assert sum(sync_limits) + sum(async_limits) <= sum(pool_limits(workers))
+    assert sync_limits[0] >= 1 and async_limits[0] >= 1
+    assert engine_pool_limits(workers, mode="sync") == (pool_limits(workers), None)
+
+
+def test_pool_limits_single_process_default():
+    """Test a single process keeps the previous pool of 10 + 20 overflow"""
+    assert pool_limits(1) == (10, 20)
+
+
+def test_worker_count(monkeypatch):
+    """Test an explicit WEB_CONCURRENCY wins and the derived count respects the budget"""
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 6)
+    assert worker_count() == 6
+    
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", None)
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 4)
+    assert worker_count() == 2
+
+
+def test_sql_echo_off_in_production(monkeypatch):
+    """Test DEBUG never turns on SQL echo in production"""
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    
+    assert sql_echo() is False
+
+
+def test_async_access_log_writes_through_queue():
+    """Test access records reach the original handlers via the queue"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(record.getMessage())
+    logger = logging.getLogger("tests.access")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    access_log = AsyncAccessLog("tests.access")
+    
+    access_log.start()
+    assert handler not in logger.handlers
+    logger.info('%s - "%s %s"', "127.0.0.1", "GET", "/health")
+    access_log.stop()
+    
+    assert records == ['127.0.0.1 - "GET /health"']
+    assert logger.handlers == [handler]
@@ -0,0 +1,128 @@
+"""User tests"""
+import pytest
+from fastapi import status
+from app.core.security import create_access_token
+from app.core.principals import PrincipalCache, Principal, principal_cache
+
+
+@pytest.fixture
+def admin_headers(test_admin):
+    """Create authorization headers for test admin"""
+    token = create_access_token(data={"sub": str(test_admin.id), "role": test_admin.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user_headers(test_user):
+    """Create authorization headers for test user"""
+    token = create_access_token(data={"sub": str(test_user.id), "role": test_user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_principal_cached_between_requests(client, test_user, user_headers):
+    """Test repeated requests reuse the cached principal"""
+    client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    
+    stats = principal_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_update_user_invalidates_principal(client, test_user, user_headers):
+    """Test updating a user drops their cached principal"""
+    client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    assert principal_cache.get(test_user.id) is not None
+    
+    response = client.put(
+        f"/api/v1/users/{test_user.id}",
+        json={"full_name": "Renamed User"},
+        headers=user_headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["full_name"] == "Renamed User"
+    assert principal_cache.get(test_user.id) is None
+
+
+def test_delete_user_revokes_access(client, test_user, user_headers, admin_headers):
+    """Test a deleted user's cached principal no longer authenticates"""
+    client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    
+    response = client.delete(f"/api/v1/users/{test_user.id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_principal_cache_evicts_and_expires(test_user, test_doctor, test_admin):
+    """Test the cache honours its size bound and TTL"""
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    for user in (test_user, test_doctor, test_admin):
+        cache.set(Principal.from_user(user))
+    
+    assert cache.get(test_user.id) is None
+    assert cache.get(test_admin.id) is not None
+    
+    expired = PrincipalCache(maxsize=2, ttl=0)
+    expired.set(Principal.from_user(test_user))
+    assert expired.get(test_user.id) is None
+
+
+def test_principal_invalidation_shared_through_backend(test_user):
+    """Test a user deactivated by one worker is no longer served from another's cache"""
+    from app.core.cache import MemoryCacheBackend
+    
+    shared = MemoryCacheBackend()
+    first, second = PrincipalCache(backend=shared), PrincipalCache(backend=shared)
+    first.set(Principal.from_user(test_user))
+    second.set(Principal.from_user(test_user))
+    
+    second.invalidate(test_user.id)
+    
+    assert first.get(test_user.id) is None
+    assert second.get(test_user.id) is None
+    first.set(Principal.from_user(test_user))
+    assert first.get(test_user.id) is not None
+
+
+def test_auth_cache_lookups_run_off_event_loop(client, test_user, user_headers, monkeypatch):
+    """Test the token and principal checks, which may wait on Redis, never run on the event loop"""
+    import asyncio
+    from app.api import deps
+    
+    on_loop = []
+    
+    def record(lookup):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(lookup.__name__)
+            except RuntimeError:
+                pass
+            return lookup(*args)
+        return wrapper
+    
+    monkeypatch.setattr(principal_cache, "get", record(principal_cache.get))
+    monkeypatch.setattr(deps, "decode_token", record(deps.decode_token))
+    
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert on_loop == []
+
+
+def test_get_user_cache_invalidated_on_update(client, test_user, user_headers):
+    """Test a cached user is refreshed after an update"""
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    assert response.json()["full_name"] == "Test User"
+    
+    client.put(
+        f"/api/v1/users/{test_user.id}",
+        json={"full_name": "Renamed User"},
+        headers=user_headers
+    )
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    
+    assert response.json()["full_name"] == "Renamed User"